@@ -0,0 +1,51 @@
+"""Add chat and message indexes
+
+Revision ID: 3f9c2d7a1b64
+Revises: 747ed4b8e121
+Create Date: 2026-10-19 17:41:22.512304
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f9c2d7a1b64"
+down_revision = "747ed4b8e121"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY does not lock the writes of big tables, but it cannot run
+    # inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_message_chat_id_created_at",
+            "message",
+            ["chat_id", "created_at", "id"],
+            schema="app",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_chat_username_created_at",
+            "chat",
+            ["username", "created_at", "id"],
+            schema="app",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_username_created_at",
+            table_name="chat",
+            schema="app",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_message_chat_id_created_at",
+            table_name="message",
+            schema="app",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,171 @@
+"""Partition message by month and add chat archive
+
+Revision ID: 8b1e5c0d9a27
+Revises: 3f9c2d7a1b64
+Create Date: 2026-10-19 19:02:37.118402
+
+"""
+
+import json
+import zlib
+from datetime import datetime
+
+import sqlalchemy as sa
+from db import base_class
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b1e5c0d9a27"
+down_revision = "3f9c2d7a1b64"
+branch_labels = None
+depends_on = None
+
+# Months created ahead of the current one, the archival job keeps them coming
+MONTHS_AHEAD = 3
+
+MESSAGE_COLUMNS = """
+    id VARCHAR(36) NOT NULL,
+    chat_id VARCHAR(36) NOT NULL,
+    role VARCHAR(50) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    CONSTRAINT "fk_message-chat_id-chat" FOREIGN KEY (chat_id)
+        REFERENCES app.chat (id) ON DELETE CASCADE
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chat",
+        sa.Column("archived_at", base_class.DateTimeUTC(), nullable=True),
+        schema="app",
+    )
+    op.create_table(
+        "chat_archive",
+        sa.Column("chat_id", sa.String(length=36), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("last_message_at", base_class.DateTimeUTC(), nullable=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", base_class.DateTimeUTC(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["chat_id"],
+            ["app.chat.id"],
+            name=op.f("fk_chat_archive-chat_id-chat"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("chat_id", name=op.f("pk_chat_archive")),
+        schema="app",
+    )
+
+    # A table cannot be partitioned in place: the rows are copied into a new
+    # partitioned table. The partition key has to be in the primary key.
+    op.execute("ALTER TABLE app.message RENAME TO message_unpartitioned")
+    op.execute(
+        "ALTER TABLE app.message_unpartitioned"
+        " RENAME CONSTRAINT pk_message TO pk_message_unpartitioned"
+    )
+    op.execute(
+        "ALTER TABLE app.message_unpartitioned RENAME CONSTRAINT"
+        ' "fk_message-chat_id-chat" TO "fk_message_unpartitioned-chat_id-chat"'
+    )
+    op.execute("DROP INDEX IF EXISTS app.ix_message_chat_id_created_at")
+    op.execute(
+        f"""
+        CREATE TABLE app.message ({MESSAGE_COLUMNS},
+            CONSTRAINT pk_message PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_message_chat_id_created_at"
+        " ON app.message (chat_id, created_at, id)"
+    )
+    # Rows out of every monthly partition, it should stay empty
+    op.execute("CREATE TABLE app.message_default PARTITION OF app.message DEFAULT")
+    # From the month of the oldest message to MONTHS_AHEAD months from now
+    op.execute(
+        f"""
+        DO $$
+        DECLARE first_day date;
+        BEGIN
+            FOR first_day IN SELECT generate_series(
+                date_trunc('month', coalesce(
+                    (SELECT min(created_at) FROM app.message_unpartitioned), now()
+                )),
+                date_trunc('month', now()) + interval '{MONTHS_AHEAD} months',
+                interval '1 month'
+            )::date LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS app.%I PARTITION OF app.message'
+                    ' FOR VALUES FROM (%L) TO (%L)',
+                    'message_p' || to_char(first_day, 'YYYY_MM'),
+                    first_day,
+                    (first_day + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(
+        "INSERT INTO app.message (id, chat_id, role, content, created_at)"
+        " SELECT id, chat_id, role, content, coalesce(created_at, now())"
+        " FROM app.message_unpartitioned"
+    )
+    op.execute("DROP TABLE app.message_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE app.message RENAME TO message_partitioned")
+    op.execute(
+        "ALTER TABLE app.message_partitioned RENAME CONSTRAINT"
+        ' "fk_message-chat_id-chat" TO "fk_message_partitioned-chat_id-chat"'
+    )
+    op.execute("DROP INDEX app.ix_message_chat_id_created_at")
+    op.execute(
+        f"""
+        CREATE TABLE app.message ({MESSAGE_COLUMNS},
+            CONSTRAINT pk_message_plain PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO app.message (id, chat_id, role, content, created_at)"
+        " SELECT id, chat_id, role, content, created_at FROM app.message_partitioned"
+    )
+    # the archived messages are lost otherwise, zlib is not available in SQL
+    bind = op.get_bind()
+    archives = bind.execute(sa.text("SELECT chat_id, payload FROM app.chat_archive"))
+    for chat_id, payload in archives.all():
+        messages = json.loads(zlib.decompress(payload))
+        if messages:
+            bind.execute(
+                sa.text(
+                    "INSERT INTO app.message (id, chat_id, role, content, created_at)"
+                    " VALUES (:id, :chat_id, :role, :content, :created_at)"
+                ),
+                [
+                    {
+                        "id": id,
+                        "chat_id": chat_id,
+                        "role": role,
+                        "content": content,
+                        # stored in UTC, as the other timestamps
+                        "created_at": datetime.fromisoformat(created_at).replace(
+                            tzinfo=None
+                        ),
+                    }
+                    for id, role, content, created_at in messages
+                ],
+            )
+    op.execute("DROP TABLE app.message_partitioned")
+    op.execute(
+        "ALTER TABLE app.message RENAME CONSTRAINT pk_message_plain TO pk_message"
+    )
+    op.create_index(
+        "ix_message_chat_id_created_at",
+        "message",
+        ["chat_id", "created_at", "id"],
+        schema="app",
+    )
+    op.drop_table("chat_archive", schema="app")
+    op.drop_column("chat", "archived_at", schema="app")
@@ -0,0 +1,47 @@
+import asyncio
+
+from exceptions.token import TokenException
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import FileResponse
+from helpers.profiling import Profiler, get_profile_path, is_authorized, list_profiles
+
+router = APIRouter()
+
+
+def check_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    if not x_admin_token:
+        raise TokenException(TokenException.ErrorCode.No_Credentials)
+    if not is_authorized(x_admin_token):
+        raise TokenException(TokenException.ErrorCode.Invalid_Token)
+
+
+@router.post("/profiling/window", dependencies=[Depends(check_admin_token)])
+async def profile_window(
+    seconds: float = Query(default=10, gt=0, le=300),
+) -> FileResponse:
+    """
+    Profiles the whole worker (every request it serves) for a time window.
+
+    Returns:
+        The stored profile, HTML with pyinstrument or cProfile stats otherwise.
+    """
+    profiler = Profiler(Profiler.new_name(), async_mode="disabled")
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        path = profiler.stop()
+    return FileResponse(path, filename=path.name)
+
+
+@router.get("/profiles", dependencies=[Depends(check_admin_token)])
+async def get_profiles() -> dict:
+    """List the stored profiles, oldest first."""
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(check_admin_token)])
+async def get_profile(name: str) -> FileResponse:
+    """Download a stored profile."""
+    path = get_profile_path(name)
+    return FileResponse(path, filename=path.name)
@@ -0,0 +1,7 @@
+from api.admin.profiling import router as profiling_router
+from fastapi import APIRouter
+
+api_router = APIRouter(prefix="/admin")
+
+# Admin, not versioned
+api_router.include_router(profiling_router, tags=["admin_profiling"])
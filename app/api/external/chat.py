@@ -1,10 +1,29 @@
+import dataclasses
+import gzip
 import logging
-
-from db.deps import get_session
-from fastapi import APIRouter, Body, Depends, File, UploadFile
+from datetime import datetime
+from typing import Literal
+
+from db.deps import get_ro_session, get_session
+from db.session import SingletonDB
+from fastapi import APIRouter, Body, Depends, File, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi_versioning import version
-from schemas.external.message_schema import MessageInput
+from helpers.etag import is_not_modified
+from schemas.external.chat_schema import ChatsInput, ChatsOutput, ChatSummary
+from schemas.external.message_schema import (
+    MessageBatchInput,
+    MessageInput,
+    MessageRead,
+    MessagesInput,
+    MessagesOutput,
+)
+from services.chat_batch_service import ChatBatchService
+from services.chat_history_service import ChatHistoryService
 from services.chat_service import ChatService
+from services.export_service import ExportService, gzip_chunks
+from services.import_service import ImportService
 from services.rag_service import RAGService
 from sqlalchemy.orm import Session
 
@@ -30,7 +49,10 @@ async def message_generate(
     logger.info(f"Received message: {user_message}")
 
     chat_service = ChatService(
-        session=session, username=user_message.username, chat_id=user_message.chat_id
+        session=session,
+        username=user_message.username,
+        chat_id=user_message.chat_id,
+        prompt_template=user_message.prompt_template,
     )
     response = await chat_service.process_user_message(
         user_message=user_message.message
@@ -40,6 +62,29 @@ async def message_generate(
     return {"content": response.content, "chat_id": chat_service.chat_id}
 
 
+@router.post("/chat/batch")
+@version(1, 0)
+async def message_generate_batch(
+    batch: MessageBatchInput = Body(...),
+    concurrency: int | None = Query(default=None, ge=1, le=64),
+) -> StreamingResponse:
+    """
+    Generate the responses to many independent messages, for offline jobs.
+
+    The messages share a batched RAG search and bulk writes, and the LLM is
+    called for `concurrency` of them at a time. An NDJSON line is streamed
+    per message as soon as its response is saved, in completion order.
+
+    Returns:
+        The NDJSON stream of results, matched to the messages by "index".
+    """
+    logger.info(f"Received batch of {len(batch.items)} messages")
+    service = ChatBatchService(SingletonDB.get_db(), concurrency=concurrency)
+    return StreamingResponse(
+        service.iter_ndjson(batch.items), media_type="application/x-ndjson"
+    )
+
+
 @router.post("/chat/upload-pdf")
 @version(1, 0)
 async def upload_pdf(
@@ -52,7 +97,7 @@ async def upload_pdf(
         file: The PDF file to upload
 
     Returns:
-        dict: A dictionary containing the document ID
+        dict: A dictionary containing the document ID and its amount of chunks
     """
     if not file.content_type == "application/pdf":
         raise ValueError("File must be a PDF")
@@ -61,6 +106,131 @@ async def upload_pdf(
 
     chat_service = RAGService()
 
-    document_id = chat_service.add_pdf_to_vector_store(contents)
+    documents = chat_service.add_pdf_to_vector_store(contents)
+
+    return {
+        "document_id": documents[0].metadata["document_id"],
+        "document_len": len(documents),
+    }
+
+
+@router.get("/chats", response_model=ChatsOutput)
+@version(1, 0)
+async def list_chats(
+    request: Request,
+    response: Response,
+    username: str = Query(..., description="Username of the chat participant"),
+    pagination: ChatsInput = Depends(),
+    session: Session = Depends(get_ro_session),
+) -> ChatsOutput | Response:
+    """
+    List the chats of a user, newest first, with cursor pagination.
+
+    Returns:
+        The page of chats, or a 304 if it matches the If-None-Match header.
+    """
+    service = ChatHistoryService(session)
+    etag, total = service.chats_etag(username, pagination)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    chats, next_cursor = service.list_chats(username, pagination)
+    response.headers["ETag"] = etag
+    return ChatsOutput(
+        page_size=pagination.page_size,
+        next_cursor=next_cursor,
+        total=total if pagination.total != "skip" else None,
+        data=[ChatSummary.model_validate(chat) for chat in chats],
+    )
+
+
+@router.get("/chats/{chat_id}/messages", response_model=MessagesOutput)
+@version(1, 0)
+async def list_messages(
+    chat_id: str,
+    request: Request,
+    response: Response,
+    pagination: MessagesInput = Depends(),
+    session: Session = Depends(get_ro_session),
+) -> MessagesOutput | Response:
+    """
+    Page through the messages of a chat, oldest first, with cursor pagination.
+
+    Returns:
+        The page of messages, or a 304 if it matches the If-None-Match header.
+    """
+    service = ChatHistoryService(session)
+    etag, total = service.messages_etag(chat_id, pagination)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    messages, next_cursor = service.list_messages(chat_id, pagination)
+    response.headers["ETag"] = etag
+    return MessagesOutput(
+        page_size=pagination.page_size,
+        next_cursor=next_cursor,
+        total=total if pagination.total != "skip" else None,
+        data=[MessageRead.model_validate(message) for message in messages],
+    )
+
+
+@router.get("/chats/export")
+@version(1, 0)
+async def export_chats(
+    start: datetime | None = Query(
+        default=None, description="Messages created from this date on"
+    ),
+    end: datetime | None = Query(
+        default=None, description="Messages created before this date"
+    ),
+    username: str | None = Query(default=None, description="Only this user chats"),
+    format: Literal["ndjson", "gzip"] = Query(default="ndjson"),
+) -> StreamingResponse:
+    """
+    Stream every chat and its messages as NDJSON: a "chat" line followed by
+    its "message" lines. Memory stays constant whatever the amount of chats.
+
+    Returns:
+        The NDJSON stream, gzipped with format=gzip.
+    """
+    chunks = ExportService(SingletonDB.get_ro_db()).iter_ndjson(
+        start=start, end=end, username=username
+    )
+    if format == "gzip":
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="chats.ndjson.gz"'},
+        )
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
 
-    return {"document_len": len(document_id)}
+@router.post("/chats/import")
+@version(1, 0)
+async def import_chats(
+    session: Session = Depends(get_session),
+    file: UploadFile = File(..., description="NDJSON of the export, maybe gzipped"),
+    batch_size: int | None = Query(default=None, ge=1, le=100_000),
+    method: Literal["auto", "insert", "copy"] | None = Query(default=None),
+) -> dict:
+    """
+    Bulk import chats and messages in the NDJSON format of the export.
+
+    Rows are written in batches, each one in its own transaction: failed
+    batches and invalid lines are reported and the import goes on.
+
+    Returns:
+        dict: The amount of imported rows, the errors and the throughput.
+    """
+    lines = file.file
+    if (file.filename or "").endswith(".gz"):
+        lines = gzip.GzipFile(fileobj=file.file, mode="rb")
+
+    service = ImportService(session, batch_size=batch_size, method=method)
+    # blocking DB writes, kept out of the event loop
+    report = await run_in_threadpool(service.import_lines, lines)
+    return {
+        **dataclasses.asdict(report),
+        "rows": report.rows,
+        "rows_per_second": round(report.rows_per_second, 1),
+    }
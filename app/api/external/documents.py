@@ -0,0 +1,100 @@
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Body, File, UploadFile
+from fastapi_versioning import version
+from schemas.external.document_schema import (
+    BatchSearchInput,
+    BatchSearchOutput,
+    SearchResult,
+)
+from services.rag_service import RAGService
+
+router = APIRouter()
+logger = logging.getLogger(f"app.{__name__}")
+
+
+@router.put("/documents/{document_id}")
+@version(1, 0)
+async def replace_document(
+    document_id: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+) -> dict:
+    """
+    Replace the content of an already indexed PDF document.
+
+    Args:
+        document_id: ID of the document to replace
+        file: The new version of the PDF file
+
+    Returns:
+        dict: A dictionary containing the document ID and its amount of chunks
+    """
+    if not file.content_type == "application/pdf":
+        raise ValueError("File must be a PDF")
+
+    contents = await file.read()
+
+    rag_service = RAGService()
+    documents = rag_service.replace_document(document_id, contents)
+
+    # The old chunks are deleted like in delete_document
+    background_tasks.add_task(rag_service.vector_store.compact_if_needed)
+
+    return {"document_id": document_id, "document_len": len(documents)}
+
+
+@router.delete("/documents/{document_id}")
+@version(1, 0)
+async def delete_document(
+    document_id: str,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """
+    Remove an indexed PDF document from the chat context.
+
+    Args:
+        document_id: ID of the document to remove
+
+    Returns:
+        dict: A dictionary containing the document ID and its removed chunks
+    """
+    rag_service = RAGService()
+    deleted = rag_service.delete_document(document_id)
+
+    # Only index types without remove_ids support leave something to compact
+    background_tasks.add_task(rag_service.vector_store.compact_if_needed)
+
+    return {"document_id": document_id, "deleted_len": deleted}
+
+
+@router.post("/documents/search/batch")
+@version(1, 0)
+async def batch_search(
+    search: BatchSearchInput = Body(...),
+) -> BatchSearchOutput:
+    """
+    Retrieve the closest chunks for many queries in a single vector search.
+
+    Args:
+        search: The queries and the amount of chunks to return per query
+
+    Returns:
+        BatchSearchOutput: The retrieved chunks, one list per query
+    """
+    rag_service = RAGService()
+    results = rag_service.similarity_search_by_queries(search.queries, k=search.k)
+
+    return BatchSearchOutput(
+        results=[
+            [
+                SearchResult(
+                    content=doc.page_content,
+                    document_id=doc.metadata.get("document_id"),
+                    score=score,
+                )
+                for doc, score in query_results
+            ]
+            for query_results in results
+        ]
+    )
@@ -1,7 +1,9 @@
 from api.external.chat import router as chat_router
+from api.external.documents import router as documents_router
 from fastapi import APIRouter
 
 api_router = APIRouter()
 
 # External
 api_router.include_router(chat_router, tags=["external_chat"])
+api_router.include_router(documents_router, tags=["external_documents"])
@@ -0,0 +1,44 @@
+import logging
+
+from db.deps import get_session
+from fastapi import APIRouter, Depends, Query, WebSocket, status
+from fastapi_exceptionshandler import APIError
+from services.chat_connection import ChatConnection, error_frame
+from services.chat_service import ChatService
+from settings.project_settings import project_settings
+from sqlalchemy.orm import Session
+
+router = APIRouter()
+logger = logging.getLogger(f"app.{__name__}")
+
+
+@router.websocket("/chat")
+async def chat_socket(
+    websocket: WebSocket,
+    chat_id: str | None = Query(default=None, description="Chat to go on with"),
+    username: str | None = Query(default=None, description="Username of a new chat"),
+    prompt_template: str | None = Query(default=None),
+    session: Session = Depends(get_session),
+) -> None:
+    """
+    Chat over a WebSocket, the answers are streamed token by token and can be
+    cancelled. The chat and the LLM clients are resolved once per connection
+    instead of once per message, see ChatConnection for the frames.
+    """
+    await websocket.accept()
+    try:
+        service = ChatService(
+            session=session,
+            username=username,
+            chat_id=chat_id,
+            prompt_template=prompt_template,
+        )
+    except APIError as e:
+        logger.info(f"Chat WebSocket rejected: {e}")
+        await websocket.send_json(error_frame(e))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await ChatConnection(
+        websocket, service, queue_size=project_settings.WebSocketQueueSize
+    ).run()
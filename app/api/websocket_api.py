@@ -0,0 +1,7 @@
+from api.websocket.chat import router as chat_router
+from fastapi import APIRouter
+
+api_router = APIRouter(prefix="/ws")
+
+# WebSockets, not versioned: fastapi_versioning only moves the HTTP routes
+api_router.include_router(chat_router, tags=["websocket_chat"])
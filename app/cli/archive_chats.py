@@ -0,0 +1,41 @@
+"""
+Moves the messages of the idle chats to the archive and maintains the
+monthly partitions of the messages. Meant to run daily from a cron, from the
+app directory:
+
+    python -m cli.archive_chats --idle-days 90
+"""
+
+import argparse
+
+from db.session import SingletonDB
+from services.archive_service import ArchiveService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--idle-days", type=int)
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    session = SingletonDB.get_db()()
+    try:
+        report = ArchiveService(
+            session, idle_days=args.idle_days, batch_size=args.batch_size
+        ).run()
+    finally:
+        session.close()
+
+    print(
+        f"{report.chats} chats and {report.messages} messages archived in"
+        f" {report.seconds:.2f}s, {report.raw_bytes} bytes compressed to"
+        f" {report.compressed_bytes}"
+    )
+    print(f"Partitions created: {', '.join(report.created_partitions) or '-'}")
+    print(f"Partitions dropped: {', '.join(report.dropped_partitions) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
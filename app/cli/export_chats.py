@@ -0,0 +1,42 @@
+"""
+Exports the chats and their messages as NDJSON (gzipped if the output ends
+in .gz), from the read-only database. Run from the app directory:
+
+    python -m cli.export_chats --output chats.ndjson.gz --start 2025-01-01
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from db.session import SingletonDB
+from services.export_service import ExportService, gzip_chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", help="File to write, stdout if empty")
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--username")
+    args = parser.parse_args()
+
+    chunks = ExportService(SingletonDB.get_ro_db()).iter_ndjson(
+        start=args.start, end=args.end, username=args.username
+    )
+    if args.output and args.output.endswith(".gz"):
+        chunks = gzip_chunks(chunks)
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
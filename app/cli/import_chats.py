@@ -0,0 +1,55 @@
+"""
+Imports chats and their messages from the NDJSON of the export (gzipped if
+the input ends in .gz). Run from the app directory:
+
+    python -m cli.import_chats chats.ndjson.gz --batch-size 10000
+"""
+
+import argparse
+import gzip
+import json
+import sys
+
+from db.session import SingletonDB
+from services.import_service import ImportService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="File to read, stdin if -")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--method", choices=["auto", "insert", "copy"])
+    args = parser.parse_args()
+
+    if args.input == "-":
+        lines = sys.stdin.buffer
+    elif args.input.endswith(".gz"):
+        lines = gzip.open(args.input, "rb")
+    else:
+        lines = open(args.input, "rb")
+
+    session = SingletonDB.get_db()()
+    try:
+        report = ImportService(
+            session, batch_size=args.batch_size, method=args.method
+        ).import_lines(lines)
+    finally:
+        session.close()
+        lines.close()
+
+    print(
+        f"{report.chats} chats and {report.messages} messages imported in"
+        f" {report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+    for error in report.batch_errors:
+        print(json.dumps({"batch": error.__dict__}), file=sys.stderr)
+    for error in report.line_errors:
+        print(json.dumps({"line": error.__dict__}), file=sys.stderr)
+    if report.batch_errors or report.line_errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Monthly range partitions of the message table (PostgreSQL only), shared by
+the migrations and the archival job.
+"""
+
+import re
+from datetime import date
+
+_partition_name = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> list[date]:
+    """First day of every month from the month of first to the one of last."""
+    months, month = [], month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """Month of a partition from its name, None for the default partition."""
+    match = _partition_name.search(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def create_partition_ddl(schema: str, table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {schema}.{partition_name(table, month)}"
+        f" PARTITION OF {schema}.{table}"
+        f" FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
@@ -10,6 +10,15 @@ class ChatException(APIError):
             status.HTTP_409_CONFLICT,
         )
         Message_Not_Found = "Message not found", status.HTTP_404_NOT_FOUND
+        Prompt_Template_Not_Found = (
+            "Prompt template not found",
+            status.HTTP_404_NOT_FOUND,
+        )
+        Invalid_Message = "Invalid message", status.HTTP_422_UNPROCESSABLE_ENTITY
+        Generation_In_Progress = (
+            "A response is already being generated",
+            status.HTTP_409_CONFLICT,
+        )
         Chat_Internal_Error = (
             "Chat internal error",
             status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -11,3 +11,8 @@ class LLMException(APIError):
         )
         Import_Error = "Import error", status.HTTP_500_INTERNAL_SERVER_ERROR
         LLM_Internal_Error = "LLM Internal error", status.HTTP_500_INTERNAL_SERVER_ERROR
+        LLM_Timeout = "LLM timeout", status.HTTP_504_GATEWAY_TIMEOUT
+        Rate_Limit_Exceeded = (
+            "Too many requests to the LLM provider",
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
@@ -0,0 +1,11 @@
+from fastapi_exceptionshandler import APIError, ErrorCodeBase
+from starlette import status
+
+
+class ProfilingException(APIError):
+    class ErrorCode(ErrorCodeBase):
+        Profiling_In_Progress = (
+            "Another profile is being captured",
+            status.HTTP_409_CONFLICT,
+        )
+        Profile_Not_Found = "Profile not found", status.HTTP_404_NOT_FOUND
@@ -0,0 +1,22 @@
+import hashlib
+from typing import Any
+
+from starlette.requests import Request
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag of the values the response is built from."""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the If-None-Match header of the request matches the ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # weak comparison, the W/ prefix is ignored
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
@@ -0,0 +1,310 @@
+import re
+import time
+from typing import Iterator
+
+from db.session import SingletonDB
+from fastapi_exceptionshandler import APIError
+from helpers.single_flight import SingleFlight
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from providers.rate_limiter import ProviderRateLimiter
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latencies from a few ms (vector search) to a minute (LLM calls with retries)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests",
+    ["method", "route", "version", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+APP_ERRORS = Counter(
+    "app_errors_total",
+    "Errors raised by the endpoints, by exception and error code",
+    ["exception", "error_code"],
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Duration of the successful LLM calls",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "llm_tokens",
+    "Tokens per LLM call, by type (input, output, cached)",
+    ["model", "type"],
+    buckets=TOKEN_BUCKETS,
+)
+VECTOR_SEARCH_DURATION = Histogram(
+    "vector_search_duration_seconds",
+    "Duration of the vector store searches, embeddings included",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+INGESTION_DURATION = Histogram(
+    "rag_ingestion_duration_seconds",
+    "Duration of the ingestion of a document (split, embed and index)",
+    buckets=LATENCY_BUCKETS,
+)
+INGESTED_PAGES = Counter("rag_ingested_pages_total", "Pages ingested")
+INGESTED_CHUNKS = Counter("rag_ingested_chunks_total", "Chunks ingested")
+INGESTION_THROUGHPUT = Histogram(
+    "rag_ingestion_throughput",
+    "Pages or chunks ingested per second, per document",
+    ["unit"],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1_000, 5_000),
+)
+IMPORTED_ROWS = Counter(
+    "chat_imported_rows_total", "Rows written by the bulk imports", ["table"]
+)
+IMPORT_THROUGHPUT = Histogram(
+    "chat_import_throughput",
+    "Rows written per second, per bulk import",
+    buckets=(100, 500, 1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000),
+)
+CHAT_SOCKETS = Gauge("chat_websocket_connections", "Open chat WebSockets")
+CHAT_SOCKET_TURNS = Counter(
+    "chat_websocket_turns_total",
+    "Turns of the chat WebSockets, by outcome (done, cancelled, error)",
+    ["outcome"],
+)
+
+_version = re.compile(r"/v(\d+_\d+)(?:/|$)")
+
+
+class StateCollector(Collector):
+    """
+    Gauges read at scrape time, so keeping them up to date costs nothing on
+    the request path: vector store size, DB connection pools, chat cache, LLM
+    rate limiters and deduplicated calls.
+    """
+
+    def describe(self) -> list:
+        # Without it, register() calls collect() to get the metric names and
+        # imports the vector store at import time
+        return []
+
+    def collect(self) -> Iterator[GaugeMetricFamily | CounterMetricFamily]:
+        # Imported here, the vector store pulls faiss and langchain
+        from repositories.chat_cache import chat_cache
+        from repositories.vector_store import FAISSVectorStore
+
+        store = FAISSVectorStore.instance
+        chunks = GaugeMetricFamily(
+            "vector_store_chunks", "Live chunks in the vector store"
+        )
+        documents = GaugeMetricFamily(
+            "vector_store_documents", "Documents in the vector store"
+        )
+        tombstones = GaugeMetricFamily(
+            "vector_store_tombstones", "Deleted vectors waiting for a compaction"
+        )
+        if store is not None:
+            chunks.add_metric([], store.index.ntotal - len(store.tombstones))
+            documents.add_metric([], len(store.document_labels))
+            tombstones.add_metric([], len(store.tombstones))
+        yield from (chunks, documents, tombstones)
+
+        pool_metrics = {
+            "size": GaugeMetricFamily(
+                "db_pool_size", "Connections of the pool", labels=["pool"]
+            ),
+            "checkedout": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections in use", labels=["pool"]
+            ),
+            "checkedin": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle connections", labels=["pool"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow", "Connections over the pool size", labels=["pool"]
+            ),
+        }
+        sessions = {
+            "rw": SingletonDB.session_instance,
+            "ro": SingletonDB.session_ro_instance,
+        }
+        for name, session in sessions.items():
+            engine = session.kw.get("bind") if session else None
+            if engine is None:
+                continue
+            for stat, metric in pool_metrics.items():
+                # NullPool (the default here) keeps no connections to report
+                if callable(getattr(engine.pool, stat, None)):
+                    metric.add_metric([name], getattr(engine.pool, stat)())
+        yield from pool_metrics.values()
+
+        lookups = CounterMetricFamily(
+            "chat_cache_lookups", "Lookups of the chat cache", labels=["result"]
+        )
+        lookups.add_metric(["hit"], chat_cache.stats.hits)
+        lookups.add_metric(["miss"], chat_cache.stats.misses)
+        removals = CounterMetricFamily(
+            "chat_cache_removals",
+            "Entries removed from the chat cache",
+            labels=["reason"],
+        )
+        removals.add_metric(["eviction"], chat_cache.stats.evictions)
+        removals.add_metric(["invalidation"], chat_cache.stats.invalidations)
+        entries = GaugeMetricFamily("chat_cache_entries", "Chats in the chat cache")
+        entries.add_metric([], len(chat_cache))
+        yield from (lookups, removals, entries)
+
+        queued = GaugeMetricFamily(
+            "llm_limiter_queue_depth",
+            "LLM calls waiting for the rate limiter",
+            labels=["provider"],
+        )
+        max_queued = GaugeMetricFamily(
+            "llm_limiter_max_queue_depth",
+            "Highest amount of LLM calls waiting for the rate limiter",
+            labels=["provider"],
+        )
+        acquired = CounterMetricFamily(
+            "llm_limiter_acquired",
+            "LLM calls let through by the rate limiter",
+            labels=["provider"],
+        )
+        rejected = CounterMetricFamily(
+            "llm_limiter_rejected",
+            "LLM calls rejected by the rate limiter",
+            labels=["provider"],
+        )
+        wait = CounterMetricFamily(
+            "llm_limiter_wait_seconds",
+            "Time waited for the rate limiter by the LLM calls let through",
+            labels=["provider"],
+        )
+        max_wait = GaugeMetricFamily(
+            "llm_limiter_max_wait_seconds",
+            "Longest wait for the rate limiter",
+            labels=["provider"],
+        )
+        for provider, limiter in list(ProviderRateLimiter.instances.items()):
+            stats = limiter.stats
+            queued.add_metric([provider], stats.queue_depth)
+            max_queued.add_metric([provider], stats.max_queue_depth)
+            acquired.add_metric([provider], stats.acquired)
+            rejected.add_metric([provider], stats.rejected)
+            wait.add_metric([provider], stats.total_wait)
+            max_wait.add_metric([provider], stats.max_wait)
+        yield from (queued, max_queued, acquired, rejected, wait, max_wait)
+
+        calls = CounterMetricFamily(
+            "single_flight_calls",
+            "Deduplicated calls, executed or shared with an identical one",
+            labels=["name", "result"],
+        )
+        in_flight = GaugeMetricFamily(
+            "single_flight_in_flight", "Deduplicated calls running", labels=["name"]
+        )
+        for name, flight in list(SingleFlight.instances.items()):
+            calls.add_metric([name, "executed"], flight.executed)
+            calls.add_metric([name, "shared"], flight.shared)
+            in_flight.add_metric([name], flight.in_flight())
+        yield from (calls, in_flight)
+
+
+REGISTRY.register(StateCollector())
+
+
+def observe_llm_call(model_name: str, seconds: float) -> None:
+    LLM_REQUEST_DURATION.labels(model_name).observe(seconds)
+
+
+def observe_llm_tokens(
+    model_name: str, input_tokens: int, output_tokens: int, cached_tokens: int
+) -> None:
+    LLM_TOKENS.labels(model_name, "input").observe(input_tokens)
+    LLM_TOKENS.labels(model_name, "output").observe(output_tokens)
+    if cached_tokens:
+        LLM_TOKENS.labels(model_name, "cached").observe(cached_tokens)
+
+
+def observe_ingestion(seconds: float, pages: int, chunks: int) -> None:
+    INGESTION_DURATION.observe(seconds)
+    INGESTED_PAGES.inc(pages)
+    INGESTED_CHUNKS.inc(chunks)
+    if seconds > 0:
+        INGESTION_THROUGHPUT.labels("pages").observe(pages / seconds)
+        INGESTION_THROUGHPUT.labels("chunks").observe(chunks / seconds)
+
+
+def observe_import(seconds: float, chats: int, messages: int) -> None:
+    IMPORTED_ROWS.labels("chat").inc(chats)
+    IMPORTED_ROWS.labels("message").inc(messages)
+    if seconds > 0:
+        IMPORT_THROUGHPUT.observe((chats + messages) / seconds)
+
+
+def observe_socket_turn(outcome: str) -> None:
+    CHAT_SOCKET_TURNS.labels(outcome).inc()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Request latency by route template and API version."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the matched route keeps the label cardinality bounded
+            route = scope.get("route")
+            version = _version.search(scope["path"])
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                version.group(1) if version else "",
+                status,
+            ).observe(time.perf_counter() - start)
+
+
+class ErrorMetricsMiddleware:
+    """
+    Counts the exceptions raised by the endpoints. It must be inside
+    APIExceptionMiddleware, which turns them into responses.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.app(scope, receive, send)
+        except APIError as e:
+            APP_ERRORS.labels(type(e).__name__, e.get_error_code()).inc()
+            raise
+        except Exception as e:
+            APP_ERRORS.labels(type(e).__name__, "Unhandled").inc()
+            raise
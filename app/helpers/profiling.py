@@ -0,0 +1,138 @@
+import cProfile
+import hmac
+import logging
+import time
+import uuid
+from pathlib import Path
+
+from exceptions.profiling import ProfilingException
+from helpers.tracing import request_id
+from settings.project_settings import project_settings
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import pyinstrument
+except ImportError:  # pragma: no cover - falls back to cProfile
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+
+class Profiler:
+    """
+    Sampling profile with pyinstrument (HTML flamegraph-like report) when it
+    is installed, deterministic cProfile otherwise (.prof, for snakeviz).
+
+    Only one profile runs at a time: both profilers hook the whole thread,
+    which is the event loop one.
+    """
+
+    active = False
+
+    def __init__(self, name: str, async_mode: str = "enabled") -> None:
+        self.name = name
+        if pyinstrument is not None:
+            self._profiler = pyinstrument.Profiler(
+                interval=project_settings.ProfilingInterval, async_mode=async_mode
+            )
+        else:
+            self._profiler = cProfile.Profile()
+
+    @classmethod
+    def new_name(cls) -> str:
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{request_id() or uuid.uuid4().hex}"
+
+    @staticmethod
+    def profiles_dir() -> Path:
+        path = Path(project_settings.ProfilingDir)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.{'html' if pyinstrument is not None else 'prof'}"
+
+    def start(self) -> None:
+        if Profiler.active:
+            raise ProfilingException(ProfilingException.ErrorCode.Profiling_In_Progress)
+        Profiler.active = True
+        try:
+            self._profiler.enable() if pyinstrument is None else self._profiler.start()
+        except BaseException:
+            Profiler.active = False
+            raise
+
+    def stop(self) -> Path:
+        """Stops the profile and stores it in ProfilingDir."""
+        try:
+            if pyinstrument is None:
+                self._profiler.disable()
+            else:
+                self._profiler.stop()
+        finally:
+            Profiler.active = False
+
+        path = self.profiles_dir() / self.filename
+        if pyinstrument is None:
+            self._profiler.dump_stats(path)
+        else:
+            path.write_text(self._profiler.output_html(), encoding="utf-8")
+        logger.info(f"Profile stored in {path}")
+        return path
+
+
+def is_authorized(token: str | None) -> bool:
+    expected = project_settings.ProfilingToken
+    return bool(expected and token) and hmac.compare_digest(token, expected)
+
+
+def list_profiles() -> list[str]:
+    return sorted(p.name for p in Profiler.profiles_dir().iterdir() if p.is_file())
+
+
+def get_profile_path(name: str) -> Path:
+    # only names listed in the directory, no path traversal
+    if name not in list_profiles():
+        raise ProfilingException(ProfilingException.ErrorCode.Profile_Not_Found)
+    return Profiler.profiles_dir() / name
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests with an `X-Profile: <ProfilingToken>` header, the
+    stored profile name is returned in the X-Profile-Name response header.
+    Requests arriving while another profile runs are not profiled.
+
+    Only added when Profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or Profiler.active:
+            await self.app(scope, receive, send)
+            return
+
+        token = dict(scope["headers"]).get(PROFILE_HEADER.encode())
+        if not is_authorized(token.decode() if token else None):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = Profiler(Profiler.new_name())
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "X-Profile-Name", profiler.filename
+                )
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
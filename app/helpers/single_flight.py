@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        # Callers waiting for the task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight, the
+    next calls with the same key wait for it and get its result (or error)
+    instead of running again. Nothing is cached once the call finishes.
+
+    The call runs in its own task, so a cancelled caller (the first one
+    included) never cancels it for the others. It is only cancelled when
+    every caller has gone.
+    """
+
+    # Every instance by name, to export their counters
+    instances: dict[str, "SingleFlight"] = {}
+
+    def __init__(self, name: str) -> None:
+        self._calls: dict[str, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+        self.instances[name] = self
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._calls[key] = call
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            # shield, a cancelled caller must not cancel the shared call
+            result: Any = await asyncio.shield(call.task)
+            return result
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                logger.debug(f"Every caller of {key} left, cancelling the call")
+                call.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,127 @@
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from settings.project_settings import project_settings
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette_context import context
+from starlette_context.header_keys import HeaderKeys
+
+try:
+    from opentelemetry import trace
+
+    tracer: Any = trace.get_tracer("app")
+except ImportError:  # pragma: no cover - OpenTelemetry is optional
+    tracer = None
+
+logger = logging.getLogger(__name__)
+
+SPANS_KEY = "spans"
+
+
+@dataclass
+class Span:
+    """Timing of a stage of a request, in milliseconds."""
+
+    name: str
+    duration: float = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    otel_span: Any = field(default=None, repr=False)
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+        if self.otel_span is not None:
+            self.otel_span.set_attributes(
+                {k: v for k, v in attributes.items() if v is not None}
+            )
+
+
+def request_id() -> str | None:
+    return context.get(HeaderKeys.request_id) if context.exists() else None
+
+
+def request_spans() -> list[Span]:
+    """Spans recorded so far in the current request."""
+    return context.get(SPANS_KEY, []) if context.exists() else []
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Times a stage of the current request. The span is kept in the request
+    context (for the Server-Timing header), logged when TraceLogSpans is set
+    and, if OpenTelemetry is installed, also exported as an OpenTelemetry span
+    tagged with the request id.
+    """
+    span = Span(name, attributes=attributes)
+    req_id = request_id()
+    start = time.perf_counter()
+    if tracer is None:
+        try:
+            yield span
+        finally:
+            span.duration = (time.perf_counter() - start) * 1000
+            _record(span, req_id)
+        return
+
+    with tracer.start_as_current_span(name) as otel_span:
+        span.otel_span = otel_span
+        span.set_attributes(**attributes, **{"request.id": req_id})
+        try:
+            yield span
+        finally:
+            span.duration = (time.perf_counter() - start) * 1000
+            _record(span, req_id)
+
+
+def _record(span: Span, req_id: str | None) -> None:
+    if context.exists():
+        if SPANS_KEY not in context:
+            context[SPANS_KEY] = []
+        context[SPANS_KEY].append(span)
+    if project_settings.TraceLogSpans:
+        logger.info(
+            f"span={span.name} request_id={req_id} duration_ms={span.duration:.2f}"
+            f" attributes={span.attributes}"
+        )
+
+
+def server_timing(spans: list[Span]) -> str:
+    entries = []
+    for span in spans:
+        entry = f"{span.name};dur={span.duration:.2f}"
+        if model_name := span.attributes.get("llm.model"):
+            entry += f';desc="{model_name}"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header with the spans of the request. It must be
+    inside RawContextMiddleware, which holds the request context.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = Span("total", (time.perf_counter() - start) * 1000)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", server_timing([*request_spans(), total])
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
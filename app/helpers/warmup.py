@@ -0,0 +1,74 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from settings.project_settings import project_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _llm_clients() -> None:
+    from providers.llm_provider import LLMProvider
+
+    LLMProvider()
+
+
+def _vector_store() -> None:
+    from services.rag_service import RAGService
+
+    RAGService()
+
+
+def _pdf_loader() -> None:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: F401
+    from langchain_community.document_loaders import PyPDFLoader  # noqa: F401
+
+
+def _tokenizer() -> None:
+    from utils.tokens import count_tokens
+
+    count_tokens("warm up")
+
+
+# The heavy dependencies are imported on first use so CLIs, alembic and tests
+# start fast. The service loads them here, before it takes any request.
+WARM_UP_STEPS: dict[str, Callable[[], None]] = {
+    "llm_clients": _llm_clients,
+    "vector_store": _vector_store,
+    "pdf_loader": _pdf_loader,
+    "tokenizer": _tokenizer,
+}
+
+
+def warm_up(steps: list[str] | None = None) -> dict[str, float]:
+    """
+    Runs the warm-up steps, a failing step is logged and skipped so it never
+    stops the service from starting.
+
+    :returns: the seconds taken by every step
+    """
+    timings = {}
+    for name in steps or WARM_UP_STEPS:
+        start = time.perf_counter()
+        try:
+            WARM_UP_STEPS[name]()
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+        timings[name] = time.perf_counter() - start
+    logger.info(
+        "Warm-up done: "
+        + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in timings.items())
+    )
+    return timings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if project_settings.WarmUp:
+        # in a thread, the loop keeps handling signals while it runs. The
+        # server only takes requests once the startup is complete.
+        await run_in_threadpool(warm_up, project_settings.WarmUpSteps)
+    yield
@@ -1,10 +1,17 @@
 import logging
 
+from api.admin_api import api_router as api_router_admin
 from api.external_api import api_router as api_router_external
+from api.websocket_api import api_router as api_router_websocket
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from fastapi_exceptionshandler import APIExceptionHandler, APIExceptionMiddleware
 from fastapi_versioning import VersionedFastAPI
+from helpers.metrics import ErrorMetricsMiddleware, MetricsMiddleware, metrics_endpoint
+from helpers.profiling import ProfilingMiddleware
+from helpers.tracing import ServerTimingMiddleware
+from helpers.warmup import lifespan
 from pydantic import ValidationError
 from settings.project_settings import project_settings
 from starlette.middleware.cors import CORSMiddleware
@@ -15,26 +22,58 @@ app_original = FastAPI(
     title="MSChatBot",
     description="ChatBot Microservice",
     root_path=project_settings.RootPath,
+    # orjson serializes the response content several times faster than json
+    default_response_class=ORJSONResponse,
 )
 
 # ==== Include external routes
 app_original.include_router(api_router_external)
 
 # ==== Version
-app = VersionedFastAPI(app_original, root_path=project_settings.RootPath)
+app = VersionedFastAPI(
+    app_original,
+    root_path=project_settings.RootPath,
+    default_response_class=ORJSONResponse,
+    # Only the lifespan of the parent app runs, not the versioned ones
+    lifespan=lifespan,
+)
+
+
+# ==== WebSockets
+app.include_router(api_router_websocket)
 
 
 # ==== Logging
 logger = logging.getLogger("app")
 logger.addHandler(logging.StreamHandler())
 
+# ==== Metrics
+if project_settings.Metrics:
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# ==== Profiling
+if project_settings.Profiling:
+    app.include_router(api_router_admin)
+
 # ==== Middlewares
+if project_settings.Metrics:
+    # Inner to APIExceptionMiddleware, it sees the exceptions before they
+    # are turned into responses
+    app.add_middleware(ErrorMetricsMiddleware)
 app.add_middleware(
     APIExceptionMiddleware,
     capture_unhandled=True,
     log_error=True,
     logger_name="app.exceptions",
 )
+if project_settings.ServerTiming:
+    # Inner to RawContextMiddleware, it reads the spans of the request context
+    app.add_middleware(ServerTimingMiddleware)
+if project_settings.Metrics:
+    app.add_middleware(MetricsMiddleware)
+if project_settings.Profiling:
+    # Inner to RawContextMiddleware, profiles are named after the request id
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(RawContextMiddleware, plugins=(plugins.RequestIdPlugin(),))
 app.add_middleware(
     CORSMiddleware,
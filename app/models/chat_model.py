@@ -1,17 +1,25 @@
 import enum
 import uuid
+from datetime import datetime
 
-from db.base_class import Base
-from sqlalchemy import Enum, ForeignKey, String, Text
+from db.base_class import Base, DateTimeUTC
+from sqlalchemy import Enum, ForeignKey, Index, Integer, LargeBinary, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
 class Chat(Base):
+    __table_args__ = (
+        # chats of a user, walked by (created_at, id) cursors
+        Index("ix_chat_username_created_at", "username", "created_at", "id"),
+    )
+
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
 
     username: Mapped[str] = mapped_column(String(50), nullable=True)
+    # Set while the messages are in the archive, see ChatArchive
+    archived_at: Mapped[datetime | None] = mapped_column(DateTimeUTC, nullable=True)
 
     messages: Mapped[list["Message"]] = relationship(
         "Message", back_populates="chat", cascade="all, delete-orphan", uselist=True
@@ -24,6 +32,12 @@ class MessageRole(enum.StrEnum):
 
 
 class Message(Base):
+    __table_args__ = (
+        # messages of a chat in order, walked by (created_at, id) cursors. Also
+        # covers the count/max(created_at) of the chat ETag without the table.
+        Index("ix_message_chat_id_created_at", "chat_id", "created_at", "id"),
+    )
+
     updated_at = None
 
     id: Mapped[str] = mapped_column(
@@ -42,5 +56,27 @@ class Message(Base):
         )
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Partition key of the table on PostgreSQL, where the primary key is
+    # (id, created_at). The mapping keeps id alone, ids are unique anyway.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTimeUTC, nullable=False, default=func.now()
+    )
 
     chat: Mapped["Chat"] = relationship("Chat", back_populates="messages")
+
+
+class ChatArchive(Base):
+    """
+    Messages of an idle chat, moved out of the message table as a single
+    compressed row: a zlib compressed JSON list of [id, role, content,
+    created_at]. The chat row itself stays in place.
+    """
+
+    updated_at = None
+
+    chat_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey(Chat.id, ondelete="CASCADE"), primary_key=True
+    )
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTimeUTC, nullable=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
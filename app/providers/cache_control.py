@@ -0,0 +1,46 @@
+from typing import Callable
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+
+def stable_prefix_length(messages: list[BaseMessage]) -> int:
+    """Amount of leading system messages, the part of the prompt worth caching."""
+    length = 0
+    while length < len(messages) and isinstance(messages[length], SystemMessage):
+        length += 1
+    return length
+
+
+def ephemeral_cache_control(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """Marks the end of the stable prefix for providers with explicit breakpoints."""
+    prefix = stable_prefix_length(messages)
+    if not prefix:
+        return messages
+
+    last = messages[prefix - 1]
+    marked = last.model_copy(
+        update={
+            "content": [
+                {
+                    "type": "text",
+                    "text": last.content,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        }
+    )
+    return [*messages[: prefix - 1], marked, *messages[prefix:]]
+
+
+# Providers whose prompt cache needs explicit markers in the messages. Gemini
+# (google_genai) and DeepSeek cache prefixes implicitly, the layout is enough.
+CACHE_CONTROL_HOOKS: dict[str, Callable[[list[BaseMessage]], list[BaseMessage]]] = {
+    "anthropic": ephemeral_cache_control,
+}
+
+
+def apply_cache_control(
+    provider: str | None, messages: list[BaseMessage]
+) -> list[BaseMessage]:
+    hook = CACHE_CONTROL_HOOKS.get(provider or "")
+    return hook(messages) if hook else messages
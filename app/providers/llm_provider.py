@@ -1,41 +1,257 @@
 import logging
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator
 
 from exceptions.llm import LLMException
-from langchain.chat_models import init_chat_model
-from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage
+from helpers.metrics import observe_llm_tokens
+from helpers.tracing import Span, trace_span
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from providers.cache_control import apply_cache_control
+from providers.llm_router import LLMRouter
+from providers.rate_limiter import ProviderRateLimiter
 from settings.llm_settings import llm_settings
+from settings.llm_supported_models import MODEL_SPECS
+from utils.tokens import count_message_tokens, count_tokens
+
+if TYPE_CHECKING:
+    # Slow import (it pulls langsmith), the models are built on first use
+    from langchain_core.language_models.chat_models import BaseChatModel
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LLMUsage:
+    model_name: str
+    input_tokens: int
+    output_tokens: int
+    # USD, None if the model has no pricing in MODEL_SPECS
+    cost: float | None = None
+    # Input tokens served from the provider prompt cache
+    cached_tokens: int = 0
+    # True if the tokens were counted locally instead of reported by the provider
+    estimated: bool = False
+
+
 class LLMProvider:
-    def __init__(self) -> None:
-        self.llm: BaseChatModel = self.get_llm()
+    # Chat models are built once per process, by model name
+    _llms: dict[str, "BaseChatModel"] = {}
 
-    def get_message_response(self, history: list[BaseMessage]) -> BaseMessage:
-        try:
-            response: BaseMessage = self.llm.invoke(history)
-            return response
-        except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            raise LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+    def __init__(self, llms: list[tuple[str, "BaseChatModel"]] | None = None) -> None:
+        """
+        :param llms: (name, model) pairs in order of preference, by default the
+            main model and the fallback ones from the settings. Useful to plug
+            local fake chat models.
+        """
+        self._from_settings = llms is None
+        self.llms = llms or [
+            (name, self.get_llm(name)) for name in llm_settings.modelNames
+        ]
+        self.llm: "BaseChatModel" = self.llms[0][1]
+        self.candidates: dict[str, "BaseChatModel"] = dict(self.llms)
+        self.last_usage: LLMUsage | None = None
+
+    async def aget_message_response(self, history: list[BaseMessage]) -> BaseMessage:
+        """
+        Gets the response through the router (timeouts, retries, failover and
+        rate limits), starting with the model that best fits the size of the
+        prompt.
+        """
+        prompt_tokens = count_message_tokens(history)
+        model_name = self.select_model(prompt_tokens)
+
+        router = self._router(model_name, prompt_tokens)
+        with trace_span("llm.call") as span:
+            response = await router.ainvoke(history)
+
+            self._record_usage(
+                span,
+                self._get_usage(
+                    router.model_name or model_name, prompt_tokens, response
+                ),
+            )
+        return response
+
+    async def astream_message_response(
+        self, history: list[BaseMessage]
+    ) -> AsyncIterator[AIMessageChunk]:
+        """
+        Streams the response as it is generated, with the model selection and
+        the rate limiting of aget_message_response. The router only fails over
+        before the first chunk. The usage is recorded once the stream ends.
+        """
+        prompt_tokens = count_message_tokens(history)
+        model_name = self.select_model(prompt_tokens)
+
+        router = self._router(model_name, prompt_tokens)
+        response = AIMessageChunk(content="")
+        with trace_span("llm.stream") as span:
+            stream = router.astream(history)
+            async with aclosing(stream):
+                async for chunk in stream:
+                    response += chunk
+                    yield chunk
+
+            self._record_usage(
+                span,
+                self._get_usage(
+                    router.model_name or model_name, prompt_tokens, response
+                ),
+            )
+
+    def _record_usage(self, span: Span, usage: LLMUsage) -> None:
+        self.last_usage = usage
+        span.set_attributes(
+            **{
+                "llm.model": usage.model_name,
+                "llm.input_tokens": usage.input_tokens,
+                "llm.output_tokens": usage.output_tokens,
+                "llm.cached_tokens": usage.cached_tokens,
+                "llm.cost": usage.cost,
+                "llm.estimated_usage": usage.estimated,
+            }
+        )
+        observe_llm_tokens(
+            usage.model_name,
+            usage.input_tokens,
+            usage.output_tokens,
+            usage.cached_tokens,
+        )
+        logger.info(f"LLM usage: {usage}")
+
+    def select_model(self, prompt_tokens: int) -> str:
+        """
+        Chooses the cheap model for short prompts, the main model when the
+        prompt fits its context and the long context model otherwise.
+        """
+        main_model = self.llms[0][0]
+        short_model = llm_settings.shortPromptModelName
+        long_model = llm_settings.longContextModelName
+        needed = prompt_tokens + self._completion_reserve
+
+        if (
+            short_model
+            and prompt_tokens <= llm_settings.shortPromptMaxTokens
+            and self._fits(short_model, needed)
+            and self._has_model(short_model)
+        ):
+            return short_model
+
+        if self._fits(main_model, needed):
+            return main_model
+
+        if (
+            long_model
+            and self._fits(long_model, needed)
+            and self._has_model(long_model)
+        ):
+            logger.info(f"Prompt of {prompt_tokens} tokens routed to {long_model}")
+            return long_model
 
-    def get_llm(self) -> BaseChatModel:
+        # Nothing fits, the provider decides
+        return main_model
+
+    def get_llm(self, model_name: str | None = None) -> "BaseChatModel":
+        model_name = model_name or llm_settings.modelName
+        if model_name in self._llms:
+            return self._llms[model_name]
+
+        provider = llm_settings.get_provider(model_name)
         try:
+            # Imported on first use, langchain.chat_models is the slowest import
+            # of the service and not every process calls a model
+            from langchain.chat_models import init_chat_model
+
             llm = init_chat_model(
-                model=llm_settings.modelName,
-                model_provider=llm_settings.modelProvider,
+                model=model_name,
+                model_provider=provider,
                 temperature=llm_settings.temperature,
                 max_tokens=llm_settings.maxTokens,
-                api_key=llm_settings.apiKey,
+                api_key=llm_settings.get_api_key(provider),
             )
+            self._llms[model_name] = llm
             return llm
         except ImportError as e:
-            logger.error(
-                f"Error importing model provider {llm_settings.modelProvider}: {e}"
-            )
+            logger.error(f"Error importing model provider {provider}: {e}")
             raise LLMException(LLMException.ErrorCode.Import_Error)
         except ValueError as e:
-            logger.error(f"Error initializing model {llm_settings.modelName}: {e}")
+            logger.error(f"Error initializing model {model_name}: {e}")
             raise LLMException(LLMException.ErrorCode.Model_Initialization_Error)
+
+    @property
+    def _completion_reserve(self) -> int:
+        return llm_settings.maxTokens or llm_settings.completionTokensReserve or 0
+
+    def _has_model(self, model_name: str) -> bool:
+        # Injected models are never mixed with the ones of the settings
+        if model_name not in self.candidates and self._from_settings:
+            self.candidates[model_name] = self.get_llm(model_name)
+        return model_name in self.candidates
+
+    def _fits(self, model_name: str, tokens: int) -> bool:
+        spec = MODEL_SPECS.get(model_name)
+        return spec is None or tokens <= spec.context_window
+
+    def _router(self, model_name: str, prompt_tokens: int) -> LLMRouter:
+        """Router over the selected model, limited by the provider of each model."""
+        tokens = prompt_tokens + self._completion_reserve
+        return LLMRouter(
+            self._route(model_name),
+            prepare=self._prepare_messages,
+            limit=lambda name: ProviderRateLimiter.for_provider(
+                llm_settings.get_provider(name)
+            ).acquire(tokens),
+        )
+
+    def _route(self, model_name: str) -> list[tuple[str, "BaseChatModel"]]:
+        """Selected model first, then the configured ones as fallbacks."""
+        return [(model_name, self.candidates[model_name])] + [
+            (name, llm) for name, llm in self.llms if name != model_name
+        ]
+
+    def _prepare_messages(
+        self, model_name: str, history: list[BaseMessage]
+    ) -> list[BaseMessage]:
+        return apply_cache_control(llm_settings.get_provider(model_name), history)
+
+    def _get_usage(
+        self, model_name: str, prompt_tokens: int, response: BaseMessage
+    ) -> LLMUsage:
+        usage_metadata = (
+            response.usage_metadata if isinstance(response, AIMessage) else None
+        )
+        if usage_metadata:
+            usage = LLMUsage(
+                model_name=model_name,
+                input_tokens=usage_metadata["input_tokens"],
+                output_tokens=usage_metadata["output_tokens"],
+                cached_tokens=self._get_cached_tokens(response),
+            )
+        else:
+            usage = LLMUsage(
+                model_name=model_name,
+                input_tokens=prompt_tokens,
+                output_tokens=count_tokens(str(response.content)),
+                estimated=True,
+            )
+
+        if spec := MODEL_SPECS.get(model_name):
+            usage.cost = (
+                usage.input_tokens * spec.input_price
+                + usage.output_tokens * spec.output_price
+            ) / 1_000_000
+        return usage
+
+    def _get_cached_tokens(self, response: AIMessage) -> int:
+        details = (response.usage_metadata or {}).get("input_token_details") or {}
+        if cached := details.get("cache_read"):
+            return cached
+
+        # Providers whose LangChain integration only reports it in the metadata
+        token_usage = response.response_metadata.get("token_usage") or {}
+        return (
+            token_usage.get("prompt_cache_hit_tokens")  # DeepSeek
+            or (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            or 0
+        )
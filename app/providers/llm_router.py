@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, nullcontext
+from typing import TYPE_CHECKING, AsyncIterator, Callable
+
+from exceptions.llm import LLMException
+from helpers.metrics import observe_llm_call
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from settings.llm_settings import llm_settings
+
+if TYPE_CHECKING:
+    # Slow import (it pulls langsmith), the models are built on first use
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of the latest successful call latencies of a model."""
+
+    def __init__(self, size: int = 200) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float | None:
+        if len(self.samples) < llm_settings.hedgeMinSamples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)]
+
+
+class LLMRouter:
+    """
+    Routes a prompt over several chat models, in order of preference.
+
+    Every call has a timeout and is retried with jittered exponential backoff,
+    then the next model is tried. Every attempt, retries included, waits for
+    the rate limiter of the provider of the model it calls. With hedging enabled, the second model is
+    also fired once the p95 latency of the first one has elapsed, and the
+    first answer wins.
+    """
+
+    # Shared by every router so the percentiles survive between requests
+    latencies: dict[str, LatencyTracker] = {}
+
+    def __init__(
+        self,
+        llms: list[tuple[str, "BaseChatModel"]],
+        prepare: Callable[[str, list[BaseMessage]], list[BaseMessage]] | None = None,
+        limit: Callable[[str], AbstractAsyncContextManager] | None = None,
+    ) -> None:
+        """
+        :param llms: (name, model) pairs in order of preference
+        :param prepare: adapts the messages to a model before calling it
+        :param limit: rate limiter slot to call a model, by model name. When
+            the limiter rejects the call, the model fails without retries.
+        """
+        if not llms:
+            raise LLMException(LLMException.ErrorCode.Model_Not_Found)
+        self.llms = llms
+        self.prepare = prepare
+        self.limit = limit
+        # Name of the model that gave the last answer
+        self.model_name: str | None = None
+
+    async def ainvoke(self, history: list[BaseMessage]) -> BaseMessage:
+        remaining = self.llms
+        error: LLMException | None = None
+
+        if llm_settings.hedgeRequests and len(self.llms) > 1:
+            try:
+                self.model_name, response = await self._invoke_hedged(history)
+                return response
+            except LLMException as e:
+                error = e
+                remaining = self.llms[2:]
+
+        for name, llm in remaining:
+            try:
+                self.model_name, response = await self._invoke_with_retries(
+                    name, llm, history
+                )
+                return response
+            except LLMException as e:
+                logger.warning(f"Model {name} failed: {e}")
+                error = e
+
+        raise error or LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+
+    async def astream(
+        self, history: list[BaseMessage]
+    ) -> AsyncIterator[BaseMessageChunk]:
+        """
+        Streams the answer of the first model that starts one. Retries and
+        failover only happen until the first chunk, the chunks already sent
+        cannot be taken back. Streams are not hedged.
+        """
+        error = LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+        for name, llm in self.llms:
+            messages = self.prepare(name, history) if self.prepare else history
+            for attempt in range(llm_settings.maxRetries + 1):
+                if attempt:
+                    backoff = llm_settings.retryBackoff * 2 ** (attempt - 1)
+                    await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+
+                # the slot is held until the stream ends
+                async with AsyncExitStack() as slot:
+                    try:
+                        await slot.enter_async_context(self._limit(name))
+                    except LLMException as e:
+                        error = e
+                        break
+
+                    start = time.perf_counter()
+                    stream = llm.astream(messages)
+                    try:
+                        chunk = await self._next_chunk(stream)
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"Model {name} timed out (attempt {attempt + 1})"
+                        )
+                        error = LLMException(LLMException.ErrorCode.LLM_Timeout)
+                        await stream.aclose()
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error generating response with {name}: {e}")
+                        error = LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+                        await stream.aclose()
+                        continue
+
+                    self.model_name = name
+                    try:
+                        while chunk is not None:
+                            yield chunk
+                            chunk = await self._next_chunk(stream)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"Model {name} timed out while streaming")
+                        raise LLMException(LLMException.ErrorCode.LLM_Timeout)
+                    except Exception as e:
+                        logger.error(f"Error streaming response with {name}: {e}")
+                        raise LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+                    finally:
+                        await stream.aclose()
+                    observe_llm_call(name, time.perf_counter() - start)
+                    return
+            logger.warning(f"Model {name} failed: {error}")
+
+        raise error
+
+    @staticmethod
+    async def _next_chunk(
+        stream: AsyncIterator[BaseMessageChunk],
+    ) -> BaseMessageChunk | None:
+        """Next chunk of the stream, None at its end. The timeout is per chunk."""
+        try:
+            return await asyncio.wait_for(
+                stream.__anext__(), timeout=llm_settings.timeout
+            )
+        except StopAsyncIteration:
+            return None
+
+    async def _invoke_hedged(
+        self, history: list[BaseMessage]
+    ) -> tuple[str, BaseMessage]:
+        (primary_name, primary), (secondary_name, secondary) = self.llms[:2]
+        primary_task = asyncio.create_task(
+            self._invoke_with_retries(primary_name, primary, history)
+        )
+        tasks = {primary_task}
+        delay = self._tracker(primary_name).percentile(0.95)
+        try:
+            await asyncio.wait(tasks, timeout=delay or llm_settings.hedgeDefaultDelay)
+            # also fired if the primary already failed, it is the failover
+            if not primary_task.done() or primary_task.exception() is not None:
+                logger.info(f"Hedging {primary_name} with {secondary_name}")
+                tasks.add(
+                    asyncio.create_task(
+                        self._invoke_with_retries(secondary_name, secondary, history)
+                    )
+                )
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error or LLMException(LLMException.ErrorCode.LLM_Internal_Error)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _invoke_with_retries(
+        self, name: str, llm: "BaseChatModel", history: list[BaseMessage]
+    ) -> tuple[str, BaseMessage]:
+        error_code = LLMException.ErrorCode.LLM_Internal_Error
+        messages = self.prepare(name, history) if self.prepare else history
+        for attempt in range(llm_settings.maxRetries + 1):
+            if attempt:
+                backoff = llm_settings.retryBackoff * 2 ** (attempt - 1)
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+
+            # a rejection of the limiter is raised, the model is not retried
+            async with self._limit(name):
+                start = time.perf_counter()
+                try:
+                    response: BaseMessage = await asyncio.wait_for(
+                        llm.ainvoke(messages), timeout=llm_settings.timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Model {name} timed out (attempt {attempt + 1})")
+                    error_code = LLMException.ErrorCode.LLM_Timeout
+                    continue
+                except Exception as e:
+                    logger.error(f"Error generating response with {name}: {e}")
+                    error_code = LLMException.ErrorCode.LLM_Internal_Error
+                    continue
+
+            elapsed = time.perf_counter() - start
+            self._tracker(name).add(elapsed)
+            observe_llm_call(name, elapsed)
+            return name, response
+
+        raise LLMException(error_code)
+
+    def _limit(self, name: str) -> AbstractAsyncContextManager:
+        return self.limit(name) if self.limit else nullcontext()
+
+    def _tracker(self, name: str) -> LatencyTracker:
+        if name not in self.latencies:
+            self.latencies[name] = LatencyTracker()
+        return self.latencies[name]
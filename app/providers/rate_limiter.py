@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from exceptions.llm import LLMException
+from settings.llm_settings import RateLimit, llm_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Continuously refilled bucket of `rate_per_minute` units."""
+
+    def __init__(self, rate_per_minute: int) -> None:
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate = rate_per_minute / 60
+        self.updated_at = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available, takes them if it is 0."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+        # a single request bigger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0
+        return (amount - self.tokens) / self.rate
+
+
+@dataclass
+class LimiterStats:
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    acquired: int = 0
+    rejected: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.acquired if self.acquired else 0
+
+
+class ProviderRateLimiter:
+    """
+    Limits the calls to a LLM provider: requests per minute, tokens per minute
+    and concurrent calls. Callers over the limits wait in a bounded queue;
+    when the queue is full, or the wait is too long, they are rejected with
+    a 429 instead of piling up against the provider rate limits.
+    """
+
+    # One limiter per provider for the whole process
+    instances: dict[str, "ProviderRateLimiter"] = {}
+
+    def __init__(self, provider: str, limit: RateLimit) -> None:
+        self.provider = provider
+        self.limit = limit
+        self.stats = LimiterStats()
+
+        self._semaphore = asyncio.Semaphore(limit.maxConcurrency or 2**31)
+        self._budget_lock = asyncio.Lock()
+        self._requests = (
+            TokenBucket(limit.requestsPerMinute) if limit.requestsPerMinute else None
+        )
+        self._tokens = (
+            TokenBucket(limit.tokensPerMinute) if limit.tokensPerMinute else None
+        )
+
+    @classmethod
+    def for_provider(cls, provider: str | None) -> "ProviderRateLimiter":
+        provider = provider or "default"
+        if provider not in cls.instances:
+            cls.instances[provider] = cls(
+                provider, llm_settings.get_rate_limit(provider)
+            )
+        return cls.instances[provider]
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int) -> AsyncIterator[None]:
+        """Waits for a slot to call the provider with a prompt of `tokens` tokens."""
+        if self.stats.queue_depth >= self.limit.maxQueueSize:
+            self._reject("queue is full")
+
+        self.stats.queue_depth += 1
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth, self.stats.queue_depth
+        )
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self._acquire(tokens), timeout=self.limit.maxQueueWait
+            )
+        except asyncio.TimeoutError:
+            self._reject("wait is too long")
+        finally:
+            self.stats.queue_depth -= 1
+
+        waited = time.perf_counter() - start
+        self.stats.acquired += 1
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    async def _acquire(self, tokens: int) -> None:
+        await self._semaphore.acquire()
+        try:
+            # the lock keeps the budget waits in arrival order
+            async with self._budget_lock:
+                await self._wait_budget(self._requests, 1)
+                await self._wait_budget(self._tokens, tokens)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def _wait_budget(self, bucket: TokenBucket | None, amount: float) -> None:
+        while bucket and (wait := bucket.wait_time(amount)):
+            await asyncio.sleep(wait)
+
+    def _reject(self, reason: str) -> None:
+        self.stats.rejected += 1
+        logger.warning(f"LLM call to {self.provider} rejected, {reason}")
+        raise LLMException(LLMException.ErrorCode.Rate_Limit_Exceeded)
@@ -6,14 +6,18 @@ Q: Why not use the ABC module?
 A: Because there would be many decorators and the messages they return are not so explicit.
 """
 
+import io
 import os
+from datetime import datetime
 from abc import abstractmethod
 from functools import wraps
 from typing import Any, Callable, Literal, Optional, cast, no_type_check
 
 from schemas.types import Model, ModelType
+from sqlalchemy import func, insert, select, text, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from utils.paginate import decode_cursor, encode_cursor
 
 
 # region Decorators
@@ -52,6 +56,15 @@ def only_tests(method_or_func: classmethod | staticmethod | Callable[..., Any])
 # endregion
 
 
+def _csv_field(value: Any) -> str:
+    """CSV field for COPY: unquoted empty is NULL, strings are always quoted."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
 class ModelRepository:
     model: Any = cast(Model, None)
     field_not_found: Exception | None = None
@@ -180,6 +193,48 @@ class ModelRepository:
         except SQLAlchemyError:
             return False
 
+    @model_required
+    def insert_rows(self, rows: list[dict]) -> int:
+        """
+        Inserts rows with a single Core executemany, no ORM objects are built.
+        It does not commit, errors are raised to the caller.
+
+        :param rows: values of the rows, by column name
+        :returns: the amount of inserted rows
+        """
+        if rows:
+            self.session.execute(insert(self.model), rows)
+        return len(rows)
+
+    @model_required
+    def copy_rows(self, rows: list[dict], columns: list[str]) -> int:
+        """
+        Inserts rows with PostgreSQL COPY, the fastest path for big batches.
+        It does not commit, errors are raised to the caller.
+
+        :param rows: values of the rows, by column name
+        :param columns: columns to copy, missing values are copied as NULL
+        :returns: the amount of inserted rows
+        """
+        if not rows:
+            return 0
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(_csv_field(row.get(c)) for c in columns) + "\n")
+        buffer.seek(0)
+
+        table = self.model.__table__.fullname
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+        return len(rows)
+
     @model_required
     def count(self) -> int:
         """
@@ -236,6 +291,104 @@ class ModelRepository:
         offset = self._calc_offset(page, page_size)
         return query.limit(page_size).offset(offset).all()
 
+    @model_required
+    def paginate_cursor(
+        self,
+        filters: list | None = None,
+        cursor: str | None = None,
+        page_size: int = 10,
+        sort_field: str | None = None,
+        sort: Literal["ASC", "DESC"] = "ASC",
+    ) -> tuple[list[ModelType], str | None]:
+        """Gets a page of records after a cursor (keyset pagination).
+
+        Unlike paginate, the cost does not grow with the depth of the page: the
+        cursor holds the sort value and id of the last row of the previous page,
+        so the query seeks the (sort_field, id) index instead of skipping rows.
+        The sort field should not be nullable, rows with NULL are not reachable.
+
+        Args:
+            filters: a list of query filters to be applied
+            cursor: next_cursor of the previous page, None for the first page
+            page_size: number of records per page
+            sort_field: field to be used for sorting, the id if not provided
+            sort: sorting order (ASC or DESC)
+
+        Returns: the models of the page and the cursor of the next one, None
+            if this is the last page
+        """
+        if page_size < 1:
+            raise ValueError("Page_size must be greater than 0")
+        if sort_field and not hasattr(self.model, sort_field):
+            raise self.field_not_found  # type: ignore
+
+        order_column = getattr(self.model, sort_field or "id")
+        id_column = self.model.id
+        query = self.session.query(self.model)
+
+        if filters:
+            query = query.filter(*filters)
+
+        if cursor:
+            sort_value, pk = decode_cursor(cursor)
+            key = tuple_(order_column, id_column)
+            query = query.filter(
+                key > tuple_(sort_value, pk)
+                if sort == "ASC"
+                else key < tuple_(sort_value, pk)
+            )
+
+        if sort == "ASC":
+            query = query.order_by(order_column, id_column)
+        else:
+            query = query.order_by(order_column.desc(), id_column.desc())
+
+        # one more row tells whether there is a next page, without a count
+        rows = query.limit(page_size + 1).all()
+        if len(rows) <= page_size:
+            return rows, None
+
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, encode_cursor(getattr(last, sort_field or "id"), last.id)
+
+    @model_required
+    def estimated_count(self, filters: list | None = None) -> int:
+        """
+        Estimated number of rows that match the filters, from the planner
+        statistics on PostgreSQL so nothing is scanned. Other databases fall
+        back to an exact count.
+        """
+        if self.session.get_bind().dialect.name != "postgresql":
+            return self.filter_count(filters) if filters else self.count()
+
+        query = select(func.count()).select_from(self.model)
+        if filters:
+            query = query.where(*filters)
+        compiled = query.compile(
+            dialect=self.session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = self.session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        # the aggregate node returns one row, its child is the filtered scan
+        node = plan[0]["Plan"]
+        while node.get("Plans") and node["Node Type"] == "Aggregate":
+            node = node["Plans"][0]
+        return int(node["Plan Rows"])
+
+    @model_required
+    def total_count(
+        self,
+        filters: list | None = None,
+        mode: Literal["skip", "estimated", "exact"] = "skip",
+    ) -> int | None:
+        """Total of a paginated listing: skipped (None), estimated or exact."""
+        if mode == "estimated":
+            return self.estimated_count(filters)
+        if mode == "exact":
+            return self.filter_count(filters) if filters else self.count()
+        return None
+
     @model_required
     def already_exists(self, pk: int | None = None, **kwargs: dict) -> bool:
         """
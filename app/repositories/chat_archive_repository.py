@@ -0,0 +1,130 @@
+import json
+import zlib
+from datetime import datetime, timezone
+
+from exceptions.chat import ChatException
+from models.chat_model import Chat, ChatArchive, Message, MessageRole
+from repositories.base import ModelRepository
+from repositories.chat_cache import chat_cache
+from sqlalchemy import delete, insert, select, update
+
+
+class ChatArchiveRepository(ModelRepository):
+    """
+    Cold storage of the messages of idle chats. The messages are moved in and
+    out with Core statements, they are never loaded as ORM objects. Nothing
+    is committed here.
+    """
+
+    model: ChatArchive = ChatArchive
+    field_not_found = ChatException(ChatException.ErrorCode.Chat_Not_Found)
+
+    compression_level = 6
+
+    def messages(self, chat_id: str) -> list[Message]:
+        """
+        Archived messages of a chat, in order. They are built from the archive
+        and not added to the session.
+        """
+        payload = self.session.scalar(
+            select(ChatArchive.payload).where(ChatArchive.chat_id == chat_id)
+        )
+        if payload is None:
+            return []
+        return [
+            Message(
+                id=id,
+                chat_id=chat_id,
+                role=MessageRole(role),
+                content=content,
+                created_at=datetime.fromisoformat(created_at),
+            )
+            for id, role, content, created_at in self._decode(payload)
+        ]
+
+    def archive(self, chat_ids: list[str]) -> tuple[int, int, int]:
+        """
+        Moves the messages of the chats to the archive, one compressed row per
+        chat, and flags the chats as archived.
+
+        :returns: the amount of messages, and the bytes of their JSON before
+            and after the compression
+        """
+        rows = self.session.execute(
+            select(
+                Message.chat_id,
+                Message.id,
+                Message.role,
+                Message.content,
+                Message.created_at,
+            )
+            .where(Message.chat_id.in_(chat_ids))
+            .order_by(Message.chat_id, Message.created_at, Message.id)
+        )
+        by_chat: dict[str, list] = {chat_id: [] for chat_id in chat_ids}
+        for chat_id, id, role, content, created_at in rows:
+            by_chat[chat_id].append(
+                [id, MessageRole(role).value, content, created_at.isoformat()]
+            )
+
+        archives, raw_bytes = [], 0
+        for chat_id, messages in by_chat.items():
+            payload = json.dumps(messages, ensure_ascii=False).encode()
+            raw_bytes += len(payload)
+            archives.append(
+                {
+                    "chat_id": chat_id,
+                    "message_count": len(messages),
+                    "last_message_at": datetime.fromisoformat(messages[-1][3])
+                    if messages
+                    else None,
+                    "payload": zlib.compress(payload, self.compression_level),
+                }
+            )
+
+        self.insert_rows(archives)
+        self.session.execute(delete(Message).where(Message.chat_id.in_(chat_ids)))
+        self.session.execute(
+            update(Chat)
+            .where(Chat.id.in_(chat_ids))
+            .values(archived_at=datetime.now(timezone.utc))
+        )
+        chat_cache.invalidate(*chat_ids)
+        return (
+            sum(a["message_count"] for a in archives),
+            raw_bytes,
+            sum(len(a["payload"]) for a in archives),
+        )
+
+    def restore(self, chat: Chat) -> int:
+        """
+        Moves the messages of an archived chat back to the message table.
+
+        :returns: the amount of restored messages
+        """
+        chat.archived_at = None
+        chat_cache.invalidate(chat.id)
+        archive: ChatArchive | None = self.get(chat.id)
+        if not archive:
+            return 0
+
+        messages = [
+            {
+                "id": id,
+                "chat_id": chat.id,
+                "role": role,
+                "content": content,
+                "created_at": datetime.fromisoformat(created_at),
+            }
+            for id, role, content, created_at in self._decode(archive.payload)
+        ]
+        if messages:
+            self.session.execute(insert(Message), messages)
+        self.session.delete(archive)
+        # the collection was loaded empty while the chat was archived
+        self.session.expire(chat, ["messages"])
+        return len(messages)
+
+    @staticmethod
+    def _decode(payload: bytes) -> list[list]:
+        return json.loads(zlib.decompress(payload))
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from models.chat_model import Message
+from settings.db_settings import db_settings
+
+
+@dataclass
+class CachedChat:
+    id: str
+    username: str | None
+    archived: bool
+    # Every message of the chat, in order, None when the chat has more than
+    # the window. Copies detached from any session.
+    messages: list[Message] | None
+    expires_at: float = 0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+@dataclass
+class ChatCache:
+    """
+    In-process TTL/LRU cache of the chats and their latest messages, so a
+    turn validates the chat and builds the history without reading it again.
+
+    The writes of this process update or invalidate the entries, the TTL
+    bounds how stale they can be after the writes of other workers.
+    """
+
+    max_size: int
+    ttl: float
+    # Chats with more messages only cache their existence
+    window: int
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        self._entries: OrderedDict[str, CachedChat] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: str) -> CachedChat | None:
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    del self._entries[chat_id]
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(chat_id)
+            self.stats.hits += 1
+            return entry
+
+    def put(self, entry: CachedChat) -> None:
+        if not self.max_size:
+            return
+        if entry.messages is not None and len(entry.messages) > self.window:
+            entry.messages = None
+        entry.expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[entry.id] = entry
+            self._entries.move_to_end(entry.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def append_message(self, chat_id: str, message: Message) -> None:
+        """
+        Adds a message written by this process to the window of its chat.
+
+        :param message: a snapshot, not bound to any session
+        """
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is None or entry.messages is None:
+                return
+            entry.messages.append(message)
+            if len(entry.messages) > self.window:
+                entry.messages = None
+
+    def invalidate(self, *chat_ids: str) -> None:
+        with self._lock:
+            for chat_id in chat_ids:
+                if self._entries.pop(chat_id, None) is not None:
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def snapshot(message: Message) -> Message:
+    """Copy of a message that outlives its session (and its commits)."""
+    return Message(
+        id=message.id,
+        chat_id=message.chat_id,
+        role=message.role,
+        content=message.content,
+        created_at=message.created_at,
+    )
+
+
+chat_cache = ChatCache(
+    max_size=db_settings.ChatCacheSize,
+    ttl=db_settings.ChatCacheTTL,
+    window=db_settings.ChatCacheWindow,
+)
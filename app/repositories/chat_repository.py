@@ -1,6 +1,15 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Literal
+
 from exceptions.chat import ChatException
 from models.chat_model import Chat, Message
 from repositories.base import ModelRepository
+from repositories.chat_archive_repository import ChatArchiveRepository
+from repositories.chat_cache import CachedChat, chat_cache, snapshot
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+from utils.paginate import decode_cursor, encode_cursor
 
 
 class ChatRepository(ModelRepository):
@@ -8,26 +17,189 @@ class ChatRepository(ModelRepository):
     field_not_found = ChatException(ChatException.ErrorCode.Chat_Not_Found)
     already_exists_error = ChatException(ChatException.ErrorCode.Already_Exist)
 
+    def __init__(self, session: Session):
+        super().__init__(session)
+        self.archive = ChatArchiveRepository(session)
+
+    def get_cached(self, chat_id: str) -> CachedChat:
+        """
+        The chat and, for short chats, its messages from the chat cache. A miss
+        reads them with one query and fills the cache.
+        """
+        entry = chat_cache.get(chat_id)
+        if entry is not None:
+            return entry
+
+        # the chat and its messages in a single query
+        chat: Chat = self.session.get(
+            Chat, chat_id, options=[joinedload(Chat.messages)]
+        )
+        if not chat:
+            raise self.field_not_found
+        messages = None if chat.archived_at else chat.messages
+        entry = CachedChat(
+            id=chat.id,
+            username=chat.username,
+            archived=chat.archived_at is not None,
+            messages=[snapshot(m) for m in messages] if messages is not None else None,
+        )
+        chat_cache.put(entry)
+        return entry
+
+    def create(self, **kwargs: dict) -> Chat:
+        chat: Chat = super().create(**kwargs)
+        chat_cache.put(
+            CachedChat(id=chat.id, username=chat.username, archived=False, messages=[])
+        )
+        return chat
+
     def get_chat_messages_by_id(self, chat_id: str) -> list[Message]:
+        """Messages of the chat, read from the archive if it is archived."""
+        entry = self.get_cached(chat_id)
+        if entry.messages is not None:
+            return list(entry.messages)
+
         chat: Chat = self.get(chat_id)
         if not chat:
             raise self.field_not_found
+        if chat.archived_at:
+            return self.archived_messages(chat)
         return chat.messages or []
 
+    def archived_messages(self, chat: Chat) -> list[Message]:
+        """
+        Archived messages of the chat, plus the ones written to the message
+        table after the archival (bulk imports), in order.
+        """
+        messages = self.archive.messages(chat.id) + list(chat.messages)
+        return sorted(messages, key=lambda m: (m.created_at, m.id))
+
     def create_message(self, chat_id: str, role: str, content: str) -> Message:
-        chat: Chat = self.get(chat_id)
-        if not chat:
-            raise self.field_not_found
+        """
+        Adds a message to the chat without loading the chat messages. Its id
+        and date are set here so the cached window can follow the write.
+        """
+        if self.get_cached(chat_id).archived:
+            self._restore(chat_id)
 
-        message = Message(role=role, content=content, chat_id=chat.id)
-        chat.messages.append(message)
-        self.update_instance(chat)
+        message = Message(
+            id=str(uuid.uuid4()),
+            chat_id=chat_id,
+            role=role,
+            content=content,
+            created_at=datetime.now(timezone.utc),
+        )
+        # taken before the commit expires the message
+        cached = snapshot(message)
+        self.session.add(message)
+        try:
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            chat_cache.invalidate(chat_id)
+            raise
+        chat_cache.append_message(chat_id, cached)
         return message
 
     def add_chat_messages(self, chat_id: str, messages: list[Message]) -> None:
         chat: Chat = self.get(chat_id)
         if not chat:
             raise self.field_not_found
+        if chat.archived_at:
+            self.archive.restore(chat)
 
         chat.messages.extend(messages)
         self.update_instance(chat)
+        chat_cache.invalidate(chat_id)
+
+    def _restore(self, chat_id: str) -> None:
+        # an archived chat that goes on is brought back to the message table
+        chat: Chat = self.get(chat_id)
+        if chat and chat.archived_at:
+            self.archive.restore(chat)
+
+    def page_by_username(
+        self,
+        username: str,
+        cursor: str | None = None,
+        page_size: int = 10,
+        sort: Literal["ASC", "DESC"] = "DESC",
+    ) -> tuple[list[Chat], str | None]:
+        """Page of the chats of a user, by creation date."""
+        return self.paginate_cursor(
+            filters=[Chat.username == username],
+            cursor=cursor,
+            page_size=page_size,
+            sort_field="created_at",
+            sort=sort,
+        )
+
+    def page_archived_messages(
+        self,
+        chat: Chat,
+        cursor: str | None = None,
+        page_size: int = 10,
+        sort: Literal["ASC", "DESC"] = "ASC",
+    ) -> tuple[list[Message], str | None]:
+        """
+        Page of the messages of an archived chat, with the same cursors as
+        MessageRepository.page_by_chat. The whole chat is decompressed, the
+        archive holds one row per chat.
+        """
+        messages = self.archived_messages(chat)
+        if sort == "DESC":
+            messages.reverse()
+        if cursor:
+            sort_value, pk = decode_cursor(cursor)
+            if sort == "ASC":
+                messages = [
+                    m for m in messages if (m.created_at, m.id) > (sort_value, pk)
+                ]
+            else:
+                messages = [
+                    m for m in messages if (m.created_at, m.id) < (sort_value, pk)
+                ]
+
+        if len(messages) <= page_size:
+            return messages, None
+        last = messages[page_size - 1]
+        return messages[:page_size], encode_cursor(last.created_at, last.id)
+
+    def archived_fingerprint(self, chat: Chat) -> tuple[int, str | None]:
+        """Same as MessageRepository.chat_fingerprint, for an archived chat."""
+        messages = self.archived_messages(chat)
+        last = messages[-1].created_at if messages else None
+        return len(messages), last.isoformat() if last else None
+
+    def idle_chat_ids(self, before: datetime, limit: int) -> list[str]:
+        """Chats not archived whose last message, or creation, is before a date."""
+        last_message = (
+            select(func.max(Message.created_at))
+            .where(Message.chat_id == Chat.id)
+            .scalar_subquery()
+        )
+        return (
+            self.session.execute(
+                select(Chat.id)
+                .where(
+                    Chat.archived_at.is_(None),
+                    func.coalesce(last_message, Chat.created_at) < before,
+                )
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    def username_fingerprint(self, username: str) -> tuple:
+        """Changes whenever a chat of the user is created, updated or deleted."""
+        return (
+            self.session.query(
+                func.count(Chat.id),
+                func.max(Chat.created_at),
+                func.max(Chat.updated_at),
+            )
+            .filter(Chat.username == username)
+            .one()
+            .tuple()
+        )
@@ -0,0 +1,123 @@
+import logging
+from datetime import date
+from typing import Literal
+
+from db.partitions import (
+    add_months,
+    create_partition_ddl,
+    month_range,
+    month_start,
+    partition_month,
+    partition_name,
+)
+from exceptions.chat import ChatException
+from models.chat_model import Message
+from repositories.base import ModelRepository
+from sqlalchemy import func, text
+
+logger = logging.getLogger(__name__)
+
+
+class MessageRepository(ModelRepository):
+    model: Message = Message
+    field_not_found = ChatException(ChatException.ErrorCode.Message_Not_Found)
+
+    def page_by_chat(
+        self,
+        chat_id: str,
+        cursor: str | None = None,
+        page_size: int = 10,
+        sort: Literal["ASC", "DESC"] = "ASC",
+    ) -> tuple[list[Message], str | None]:
+        """Page of the messages of a chat, in creation order."""
+        return self.paginate_cursor(
+            filters=[Message.chat_id == chat_id],
+            cursor=cursor,
+            page_size=page_size,
+            sort_field="created_at",
+            sort=sort,
+        )
+
+    def chat_fingerprint(self, chat_id: str) -> tuple[int, str | None]:
+        """
+        Amount of messages of the chat and the date of the last one. Messages
+        are never edited, so they only change when this does. It is answered
+        from the (chat_id, created_at) index only.
+        """
+        count, last = (
+            self.session.query(func.count(Message.id), func.max(Message.created_at))
+            .filter(Message.chat_id == chat_id)
+            .one()
+        )
+        return count, last.isoformat() if last else None
+
+    def is_partitioned(self) -> bool:
+        """The table is partitioned by month on PostgreSQL only."""
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    def partitions(self) -> list[str]:
+        """Names of the partitions of the table, the default one included."""
+        table = Message.__table__
+        return (
+            self.session.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits"
+                    " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+                    " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+                    " JOIN pg_namespace ns ON ns.oid = parent.relnamespace"
+                    " WHERE parent.relname = :table AND ns.nspname = :schema"
+                    " ORDER BY child.relname"
+                ),
+                {"table": table.name, "schema": table.schema or "public"},
+            )
+            .scalars()
+            .all()
+        )
+
+    def ensure_partitions(self, months_ahead: int) -> list[str]:
+        """
+        Creates the partitions of the current month and the next ones, so new
+        messages never land in the default partition.
+
+        :returns: the names of the created partitions
+        """
+        if not self.is_partitioned():
+            return []
+
+        table = Message.__table__
+        existing = set(self.partitions())
+        today = month_start(date.today())
+        created = []
+        for month in month_range(today, add_months(today, months_ahead)):
+            name = partition_name(table.name, month)
+            if name not in existing:
+                self.session.execute(
+                    text(create_partition_ddl(table.schema, table.name, month))
+                )
+                created.append(name)
+        return created
+
+    def drop_empty_partitions(self, before: date) -> list[str]:
+        """
+        Drops the empty partitions of the months ended before a date. Once the
+        chats of a month are archived its partition is empty, and dropping it
+        is cheaper than vacuuming the deleted rows.
+
+        :returns: the names of the dropped partitions
+        """
+        if not self.is_partitioned():
+            return []
+
+        schema = Message.__table__.schema
+        dropped = []
+        for name in self.partitions():
+            month = partition_month(name)
+            if not month or add_months(month, 1) > before:
+                continue
+            empty = not self.session.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {schema}.{name})")
+            ).scalar()
+            if empty:
+                self.session.execute(text(f"DROP TABLE {schema}.{name}"))
+                dropped.append(name)
+        return dropped
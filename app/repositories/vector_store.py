@@ -1,20 +1,61 @@
+import logging
+import threading
+
 import faiss
+import numpy as np
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
+from settings.rag_settings import rag_settings
+
+logger = logging.getLogger(__name__)
 
 
 class FAISSVectorStore:
+    """
+    In-process FAISS vector store.
+
+    Every chunk is added with a stable int64 label (the index is wrapped in an
+    IDMap2), so the chunks of a single document can be removed with
+    `remove_ids` without touching the rest of the corpus. Index types that do
+    not support removal get their labels tombstoned instead; tombstoned vectors
+    are skipped at search time until `compact` rebuilds the index.
+    """
+
+    instance: "FAISSVectorStore | None" = None
+    # get_instance is called from the threadpool too
+    _instance_lock = threading.Lock()
+
     def __init__(
         self,
         embeddings: Embeddings,
+        index_factory: str | None = None,
     ) -> None:
         self.embeddings: Embeddings = embeddings
-        self.index = faiss.IndexFlatL2(len(embeddings.embed_query("hello world")))
+        self.index_factory: str = index_factory or rag_settings.faissIndexFactory
+        self.dimension = len(embeddings.embed_query("hello world"))
+        self.index = faiss.index_factory(self.dimension, self.index_factory)
         self.docstore = InMemoryDocstore()
+        self.index_to_docstore_id: dict[int, str] = {}
+        self.document_labels: dict[str, list[int]] = {}
+        self.tombstones: set[int] = set()
 
+        self._next_label = 0
+        self._lock = threading.RLock()
         self._store = None
 
+    @classmethod
+    def get_instance(cls, embeddings: Embeddings) -> "FAISSVectorStore":
+        """Returns the vector store shared by the whole process."""
+        if cls.instance:
+            return cls.instance
+
+        with cls._instance_lock:
+            if not cls.instance:
+                cls.instance = cls(embeddings=embeddings)
+        return cls.instance
+
     @property
     def store(self) -> FAISS:
         if not self._store:
@@ -22,10 +63,182 @@ class FAISSVectorStore:
                 embedding_function=self.embeddings,
                 index=self.index,
                 docstore=self.docstore,
-                index_to_docstore_id={},
+                index_to_docstore_id=self.index_to_docstore_id,
             )
         return self._store
 
+    @staticmethod
+    def chunk_id(document_id: str, ordinal: int) -> str:
+        return f"{document_id}:{ordinal}"
+
+    def has_document(self, document_id: str) -> bool:
+        return document_id in self.document_labels
+
+    def get_chunks(self, document_id: str, ordinals: list[int]) -> dict[int, Document]:
+        """
+        Gets chunks of a document by their ordinal, without any vector search.
+
+        :param document_id: id of the document
+        :param ordinals: positions of the chunks inside the document
+        :returns: the found chunks by ordinal, missing ordinals are skipped
+        """
+        chunks = {}
+        for ordinal in ordinals:
+            doc = self.docstore.search(self.chunk_id(document_id, ordinal))
+            if isinstance(doc, Document):
+                chunks[ordinal] = doc
+        return chunks
+
+    def add_documents(
+        self,
+        document_id: str,
+        documents: list[Document],
+        vectors: np.ndarray | None = None,
+    ) -> list[str]:
+        """
+        Embeds and indexes the chunks of a document.
+
+        :param document_id: id shared by all the chunks of the document
+        :param documents: the chunks, in document order
+        :param vectors: embeddings of the chunks, computed when missing
+        :returns: the docstore ids of the added chunks
+        """
+        if vectors is None:
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embeddings.embed_documents(texts)
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        ids = [self.chunk_id(document_id, i) for i in range(len(documents))]
+        chunks = {
+            id_: Document(id=id_, page_content=doc.page_content, metadata=doc.metadata)
+            for id_, doc in zip(ids, documents)
+        }
+
+        with self._lock:
+            if self.has_document(document_id):
+                raise ValueError(f"Document '{document_id}' is already indexed")
+
+            labels = list(range(self._next_label, self._next_label + len(ids)))
+            self._next_label += len(ids)
+
+            self.index.add_with_ids(vectors, np.asarray(labels, dtype=np.int64))
+            self.docstore.add(chunks)
+            self.index_to_docstore_id.update(zip(labels, ids))
+            self.document_labels[document_id] = labels
+
+        return ids
+
+    def delete_document(self, document_id: str) -> int:
+        """
+        Removes every chunk of a document from the index and the docstore.
+
+        :param document_id: id of the document to remove
+        :returns: the number of removed chunks, 0 if the document was not indexed
+        """
+        with self._lock:
+            labels = self.document_labels.pop(document_id, None)
+            if not labels:
+                return 0
+
+            try:
+                self.index.remove_ids(np.asarray(labels, dtype=np.int64))
+            except RuntimeError:
+                # e.g. HNSW indexes, the vectors stay until the next compaction
+                self.tombstones.update(labels)
+
+            self.docstore.delete([self.index_to_docstore_id.pop(i) for i in labels])
+
+        return len(labels)
+
+    def replace_document(
+        self, document_id: str, documents: list[Document]
+    ) -> list[str]:
+        """Replaces the chunks of a document with the given ones."""
+        with self._lock:
+            self.delete_document(document_id)
+            return self.add_documents(document_id, documents)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4
+    ) -> list[tuple[Document, float]]:
+        """Returns the k closest chunks to the query and their L2 distance."""
+        vector = np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        return self.search_by_vectors(vector, k)[0]
+
+    def batch_similarity_search_with_score(
+        self, queries: list[str], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Searches many queries at once: all of them are embedded in a single
+        call and looked up with a single multi-query `index.search`.
+
+        :param queries: the queries to search
+        :param k: number of chunks to return per query
+        :returns: the closest chunks and their L2 distance, per query and in order
+        """
+        if not queries:
+            return []
+        vectors = np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+        return self.search_by_vectors(vectors, k)
+
+    def search_by_vectors(
+        self, vectors: np.ndarray, k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """Returns the k closest chunks for every row of the `vectors` matrix."""
+        with self._lock:
+            # over-fetch so tombstoned vectors do not eat the top k
+            fetch_k = min(k + len(self.tombstones), self.index.ntotal)
+            if fetch_k < 1:
+                return [[] for _ in range(len(vectors))]
+            scores, labels = self.index.search(vectors, fetch_k)
+
+            results = []
+            for row_scores, row_labels in zip(scores, labels):
+                row: list[tuple[Document, float]] = []
+                for score, label in zip(row_scores, row_labels):
+                    if label == -1 or label in self.tombstones:
+                        continue
+                    doc = self.docstore.search(self.index_to_docstore_id[int(label)])
+                    if isinstance(doc, Document):
+                        row.append((doc, float(score)))
+                    if len(row) == k:
+                        break
+                results.append(row)
+
+        return results
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def needs_compaction(self) -> bool:
+        if not self.tombstones or not self.index.ntotal:
+            return False
+        return (
+            len(self.tombstones) / self.index.ntotal >= rag_settings.compactionThreshold
+        )
+
+    def compact(self) -> None:
+        """Rebuilds the index without the tombstoned vectors."""
+        with self._lock:
+            if not self.tombstones:
+                return
+
+            labels = np.asarray(sorted(self.index_to_docstore_id), dtype=np.int64)
+            index = faiss.index_factory(self.dimension, self.index_factory)
+            if len(labels):
+                index.add_with_ids(self.index.reconstruct_batch(labels), labels)
+
+            logger.info(
+                f"Compacted vector store, {len(self.tombstones)} vectors dropped"
+            )
+            self.index = index
+            self.tombstones.clear()
+            self._store = None
+
+    def compact_if_needed(self) -> None:
+        if self.needs_compaction():
+            self.compact()
+
 
 # from langchain_chroma import Chroma
 
@@ -1,7 +1,20 @@
+from functools import lru_cache
+
 from humps import camelize, decamelize
 from pydantic import BaseModel
 
 
+# Aliases are computed once per field name, shared by every schema
+@lru_cache(maxsize=None)
+def to_camel(name: str) -> str:
+    return camelize(name)
+
+
+@lru_cache(maxsize=None)
+def to_snake(name: str) -> str:
+    return decamelize(name)
+
+
 class BaseSchema(BaseModel):
     """Base Schema"""
 
@@ -16,9 +29,9 @@ class BaseSchema(BaseModel):
 
 class CamelModel(BaseSchema):
     class Config:
-        alias_generator = camelize
+        alias_generator = to_camel
 
 
 class SnakeModel(BaseSchema):
     class Config:
-        alias_generator = decamelize
+        alias_generator = to_snake
@@ -1,6 +1,9 @@
+from datetime import datetime
+
 from models.chat_model import MessageRole
 from pydantic import ConfigDict, Field
 from schemas.base import CamelModel
+from schemas.external.pagination import CursorInputPagination, CursorOutputPagination
 
 
 class MessageBase(CamelModel):
@@ -61,3 +64,28 @@ class ChatRead(ChatBase):
     )
 
     model_config = ConfigDict(use_enum_values=True)
+
+
+class ChatSummary(ChatBase):
+    id: str = Field(
+        description="Unique identifier for the chat",
+        examples=["123e4567-e89b-12d3-a456-426614174000"],
+    )
+    created_at: datetime | None = Field(
+        default=None, description="Date the chat was started"
+    )
+    updated_at: datetime | None = Field(
+        default=None, description="Date the chat was last updated"
+    )
+    archived_at: datetime | None = Field(
+        default=None,
+        description="Date the messages were archived, the chat can still go on",
+    )
+
+
+class ChatsInput(CursorInputPagination):
+    pass
+
+
+class ChatsOutput(CursorOutputPagination):
+    data: list[ChatSummary] = Field(default=[], description="Chats of the page.")
@@ -0,0 +1,44 @@
+from pydantic import Field
+from schemas.base import CamelModel
+
+
+class BatchSearchInput(CamelModel):
+    queries: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Queries to search in the indexed documents",
+        examples=[["What is the refund policy?", "How do I reset my password?"]],
+    )
+    k: int = Field(
+        default=4,
+        ge=1,
+        le=100,
+        description="Amount of chunks to return per query",
+        examples=[4],
+    )
+
+
+class SearchResult(CamelModel):
+    content: str = Field(
+        ...,
+        description="Content of the retrieved chunk",
+        examples=["Refunds are accepted within 30 days."],
+    )
+    document_id: str | None = Field(
+        default=None,
+        description="ID of the document the chunk belongs to",
+        examples=["123e4567-e89b-12d3-a456-426614174000"],
+    )
+    score: float = Field(
+        ...,
+        description="L2 distance to the query, lower is more similar",
+        examples=[0.42],
+    )
+
+
+class BatchSearchOutput(CamelModel):
+    results: list[list[SearchResult]] = Field(
+        default_factory=list,
+        description="Retrieved chunks, one list per query in the same order",
+    )
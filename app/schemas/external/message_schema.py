@@ -1,6 +1,11 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import Query
 from models.chat_model import MessageRole
 from pydantic import ConfigDict, Field
 from schemas.base import CamelModel
+from schemas.external.pagination import CursorInputPagination, CursorOutputPagination
 
 
 class MessageInput(CamelModel):
@@ -15,6 +20,41 @@ class MessageInput(CamelModel):
     chat_id: str | None = Field(
         default=None, description="ID of the chat this message belongs to"
     )
+    prompt_template: str | None = Field(
+        default=None,
+        description="Name of the prompt template (tenant or language) to answer with",
+        examples=["es", "en"],
+    )
+
+
+class MessageBatchInput(CamelModel):
+    items: list[MessageInput] = Field(
+        ...,
+        min_length=1,
+        max_length=1_000,
+        description="Independent messages, each one answered as /chat would",
+    )
+
+
+class MessageBatchResult(CamelModel):
+    index: int = Field(..., description="Position of the message in the batch")
+    chat_id: str | None = Field(
+        default=None, description="ID of the chat the message was added to"
+    )
+    content: str | None = Field(default=None, description="The generated response")
+    error_code: str | None = Field(default=None, description="Set if it failed")
+    message: str | None = Field(default=None, description="Detail of the error")
+
+
+class MessageSocketInput(CamelModel):
+    type: Literal["message", "cancel"] = Field(
+        ..., description="A message to answer, or the cancel of the current answer"
+    )
+    message: str | None = Field(
+        default=None,
+        description="The input message to generate a response for",
+        examples=["Hello, how can I help you?"],
+    )
 
 
 class MessageBase(CamelModel):
@@ -44,5 +84,27 @@ class MessageRead(MessageBase):
         description="Unique identifier for the message",
         examples=["123e4567-e89b-12d3-a456-426614174001"],
     )
+    role: MessageRole | None = Field(
+        default=None,
+        description="Role of the message sender",
+        examples=[MessageRole.HumanMessage, MessageRole.AIMessage],
+    )
+    created_at: datetime | None = Field(
+        default=None, description="Date the message was sent"
+    )
 
     model_config = ConfigDict(use_enum_values=True)
+
+
+class MessagesInput(CursorInputPagination):
+    sort: Literal["ASC", "DESC"] | None = Field(
+        Query(
+            default="ASC",
+            description="Order of the messages by date. Value must be in UPPERCASE",
+            examples=["ASC", "DESC"],
+        )
+    )
+
+
+class MessagesOutput(CursorOutputPagination):
+    data: list[MessageRead] = Field(default=[], description="Messages of the page.")
@@ -1,9 +1,11 @@
 from typing import Literal
 
 from fastapi import Query
+from fastapi.exceptions import RequestValidationError
 from pydantic import Field, field_validator
 from pydantic.alias_generators import to_snake
 from schemas.base import CamelModel
+from utils.paginate import decode_cursor
 
 
 class OutputPagination(CamelModel):
@@ -83,3 +85,112 @@ class InputPagination(CamelModel):
         if field is not None:
             return to_snake(field)
         return field
+
+
+class CursorOutputPagination(CamelModel):
+    page_size: int | None = Field(
+        default=10,
+        ge=1,
+        description="Amount of items that the current page will have.",
+        examples=[10],
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor of the next page, null when this is the last page.",
+    )
+    total: int | None = Field(
+        default=None,
+        description="Total amount of registers taken into account the used filters,"
+        " null when it was not requested.",
+    )
+    total_estimated: bool = Field(
+        default=False, description="Whether the total is an estimation."
+    )
+
+    # this field is overwritten by the child classes
+    data: list = Field(default=[], description="The items that will be listed.")
+
+
+class CursorInputPagination(CamelModel):
+    """
+    Keyset pagination: the pages are walked with the nextCursor of the previous
+    one, so deep pages cost the same as the first one.
+    """
+
+    cursor: str | None = Field(
+        Query(
+            default=None,
+            description="nextCursor of the previous page, empty for the first page.",
+        )
+    )
+    page_size: int | None = Field(
+        Query(
+            default=10,
+            ge=1,
+            le=1000,
+            description="Amount of items that the current page will have.",
+            examples=[10],
+        )
+    )
+    sort_field: str | None = Field(
+        Query(
+            default=None,
+            include_in_schema=False,
+            description="Field that will be used to order the result. It must be the same for every page of a walk.",
+            examples=["created_at"],
+        )
+    )
+    sort: Literal["ASC", "DESC"] | None = Field(
+        Query(
+            default="DESC",
+            include_in_schema=False,
+            description="Order that will be applied to the provided sortField. Value must be in UPPERCASE",
+            examples=["ASC", "DESC"],
+        )
+    )
+    total: Literal["skip", "estimated", "exact"] | None = Field(
+        Query(
+            default="skip",
+            description="How the total is computed: skipped, estimated from the DB statistics or counted.",
+            examples=["skip", "estimated", "exact"],
+        )
+    )
+
+    def pagination_params(self) -> dict:
+        return {
+            "cursor": self.cursor,
+            "page_size": self.page_size,
+            "sort_field": self.sort_field,
+            "sort": self.sort,
+        }
+
+    # NOTE: if @classmethod goes first, validator does not work.
+    @field_validator("sort_field", mode="after")
+    @classmethod
+    def validate_sort_field(cls, field: str | None) -> str | None:
+        """Converts the field to snake case"""
+        if field is not None:
+            return to_snake(field)
+        return field
+
+    @field_validator("cursor", mode="after")
+    @classmethod
+    def validate_cursor(cls, cursor: str | None) -> str | None:
+        """Rejects cursors that were not issued by the API"""
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                # Pydantic re-raises it as is. A ValidationError raised while
+                # building a Depends() model would be a 500, this is a 422.
+                raise RequestValidationError(
+                    [
+                        {
+                            "type": "value_error",
+                            "loc": ("query", "cursor"),
+                            "msg": str(e),
+                            "input": cursor,
+                        }
+                    ]
+                )
+        return cursor or None
@@ -0,0 +1,90 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from repositories.chat_repository import ChatRepository
+from repositories.message_repository import MessageRepository
+from settings.db_settings import db_settings
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveReport:
+    chats: int = 0
+    messages: int = 0
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    seconds: float = 0
+    created_partitions: list[str] = field(default_factory=list)
+    dropped_partitions: list[str] = field(default_factory=list)
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0
+
+
+class ArchiveService:
+    """
+    Maintenance job of the messages, meant to run daily from a cron:
+
+    1. creates the monthly partitions of the next months,
+    2. moves the messages of the chats idle for `idle_days` to the archive,
+       `batch_size` chats per transaction,
+    3. drops the partitions left empty by the archival.
+
+    Archived chats keep their chat row, reads go to the archive and a new
+    message brings the chat back (see ChatRepository).
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        idle_days: int | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        self.session = session
+        self.chat_repository = ChatRepository(session)
+        self.message_repository = MessageRepository(session)
+        self.idle_days = idle_days or db_settings.ArchiveIdleDays
+        self.batch_size = batch_size or db_settings.ArchiveBatchSize
+
+    def run(self) -> ArchiveReport:
+        report = ArchiveReport()
+        start = time.perf_counter()
+
+        report.created_partitions = self.message_repository.ensure_partitions(
+            db_settings.PartitionMonthsAhead
+        )
+        self.session.commit()
+
+        before = datetime.now(timezone.utc) - timedelta(days=self.idle_days)
+        while chat_ids := self.chat_repository.idle_chat_ids(before, self.batch_size):
+            try:
+                messages, raw, compressed = self.chat_repository.archive.archive(
+                    chat_ids
+                )
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+            report.chats += len(chat_ids)
+            report.messages += messages
+            report.raw_bytes += raw
+            report.compressed_bytes += compressed
+
+        report.dropped_partitions = self.message_repository.drop_empty_partitions(
+            before.date()
+        )
+        self.session.commit()
+        report.seconds = time.perf_counter() - start
+
+        logger.info(
+            f"Archived {report.chats} chats and {report.messages} messages in"
+            f" {report.seconds:.2f}s ({report.compression_ratio:.1f}x compression),"
+            f" partitions created {report.created_partitions}"
+            f" and dropped {report.dropped_partitions}"
+        )
+        return report
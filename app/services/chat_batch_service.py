@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+import orjson
+from exceptions.chat import ChatException
+from fastapi.concurrency import run_in_threadpool
+from fastapi_exceptionshandler import APIError
+from langchain_core.documents import Document
+from models.chat_model import Message, MessageRole
+from providers.llm_provider import LLMProvider
+from repositories.chat_cache import chat_cache
+from repositories.chat_repository import ChatRepository
+from repositories.message_repository import MessageRepository
+from schemas.external.message_schema import MessageBatchResult, MessageInput
+from services.prompt_builder import PromptBuilder
+from services.prompt_templates import prompt_templates
+from services.rag_service import RAGService
+from settings.db_settings import db_settings
+from settings.llm_settings import llm_settings
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Turn:
+    index: int
+    chat_id: str
+    # The history of the chat, then the message of the item
+    messages: list[Message]
+    builder: PromptBuilder
+
+    @property
+    def query(self) -> str:
+        return self.messages[-1].content
+
+
+class ChatBatchService:
+    """
+    Answers many independent messages, for offline workloads. Every message
+    is a /chat turn, but the batch shares the expensive steps:
+
+    - the new chats and the user messages are written with one INSERT each,
+    - the RAG context of every message comes from one batched vector search,
+    - the LLM is called for `concurrency` messages at a time,
+    - the answers are written `write_size` rows per INSERT.
+
+    Results are yielded in completion order, as soon as the answer is saved.
+    A message sees the history of its chat from before the batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        concurrency: int | None = None,
+        write_size: int | None = None,
+        flush_interval: float | None = None,
+    ) -> None:
+        # The generator outlives the request dependencies, it owns its session
+        self.session_factory = session_factory
+        self.concurrency = concurrency or llm_settings.batchConcurrency
+        self.write_size = write_size or db_settings.ChatBatchWriteSize
+        self.flush_interval = flush_interval or db_settings.ChatBatchFlushInterval
+        # Built before the response starts, their errors are still HTTP errors
+        self.llm_service = LLMProvider()
+        self.rag_service = RAGService()
+
+    async def iter_ndjson(self, items: list[MessageInput]) -> AsyncIterator[bytes]:
+        async for result in self.process(items):
+            yield orjson.dumps(
+                result.model_dump(by_alias=True), option=orjson.OPT_APPEND_NEWLINE
+            )
+
+    async def process(
+        self, items: list[MessageInput]
+    ) -> AsyncIterator[MessageBatchResult]:
+        session: Session = self.session_factory()
+        start = time.perf_counter()
+        failed = 0
+        try:
+            chats, turns, errors = self._start_turns(ChatRepository(session), items)
+            failed += len(errors)
+            for result in errors:
+                yield result
+
+            if turns and not self._save(
+                session, chats, [t.messages[-1] for t in turns]
+            ):
+                failed += len(turns)
+                for turn in turns:
+                    yield self._error(turn.index, self._internal_error())
+                return
+
+            # CPU bound (embeddings and index search), kept out of the event loop
+            contexts = await run_in_threadpool(
+                self.rag_service.search_documents_batch, [t.query for t in turns]
+            )
+            async for result in self._answer(session, turns, contexts):
+                failed += result.error_code is not None
+                yield result
+        finally:
+            session.close()
+            logger.info(
+                f"Batch of {len(items)} messages answered in"
+                f" {time.perf_counter() - start:.2f}s, {failed} failed"
+            )
+
+    def _start_turns(
+        self, repository: ChatRepository, items: list[MessageInput]
+    ) -> tuple[list[dict], list[_Turn], list[MessageBatchResult]]:
+        """
+        Resolves the chat, history and prompt template of every item.
+
+        :returns: the rows of the new chats, the turns to answer and the
+            results of the items that cannot be answered
+        """
+        now = datetime.now(timezone.utc)
+        chats: list[dict] = []
+        turns: list[_Turn] = []
+        errors: list[MessageBatchResult] = []
+        histories: dict[str, list[Message]] = {}
+        builders: dict[str | None, PromptBuilder] = {}
+        for index, item in enumerate(items):
+            try:
+                if item.prompt_template not in builders:
+                    builders[item.prompt_template] = PromptBuilder(
+                        template=prompt_templates.get(item.prompt_template)
+                    )
+                if item.chat_id is None:
+                    chat_id = str(uuid.uuid4())
+                    chats.append(
+                        {
+                            "id": chat_id,
+                            "username": item.username,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+                    histories[chat_id] = []
+                elif (chat_id := item.chat_id) not in histories:
+                    # from the chat cache, or one query per chat
+                    histories[chat_id] = repository.get_chat_messages_by_id(chat_id)
+            except APIError as e:
+                errors.append(self._error(index, e))
+                continue
+
+            message = Message(
+                id=str(uuid.uuid4()),
+                chat_id=chat_id,
+                role=MessageRole.HumanMessage,
+                content=item.message,
+                created_at=now,
+            )
+            turns.append(
+                _Turn(
+                    index=index,
+                    chat_id=chat_id,
+                    messages=histories[chat_id] + [message],
+                    builder=builders[item.prompt_template],
+                )
+            )
+        return chats, turns, errors
+
+    async def _answer(
+        self, session: Session, turns: list[_Turn], contexts: list[list[Document]]
+    ) -> AsyncIterator[MessageBatchResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def answer(turn: _Turn, context: list[Document]) -> str | APIError:
+            async with semaphore:
+                try:
+                    history = turn.builder.build(turn.messages, context=context)
+                    response = await self.llm_service.aget_message_response(history)
+                    return response.text()
+                except APIError as e:
+                    return e
+                except Exception as e:
+                    logger.error(f"Error procesando mensaje: {e}")
+                    return self._internal_error()
+
+        tasks = {
+            asyncio.create_task(answer(turn, context)): turn
+            for turn, context in zip(turns, contexts)
+        }
+        pending = set(tasks)
+        answers: list[tuple[_Turn, str]] = []
+        oldest = 0.0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.flush_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    turn, content = tasks.pop(task), task.result()
+                    if isinstance(content, APIError):
+                        yield self._error(turn.index, content, turn)
+                        continue
+                    if not answers:
+                        oldest = time.monotonic()
+                    answers.append((turn, content))
+
+                if answers and (
+                    not pending
+                    or len(answers) >= self.write_size
+                    or time.monotonic() - oldest >= self.flush_interval
+                ):
+                    for result in self._save_answers(session, answers):
+                        yield result
+                    answers = []
+        finally:
+            # the client went away, the answers still running are dropped
+            for task in pending:
+                task.cancel()
+
+    def _save_answers(
+        self, session: Session, answers: list[tuple[_Turn, str]]
+    ) -> list[MessageBatchResult]:
+        now = datetime.now(timezone.utc)
+        messages = [
+            Message(
+                id=str(uuid.uuid4()),
+                chat_id=turn.chat_id,
+                role=MessageRole.AIMessage,
+                content=content,
+                created_at=now,
+            )
+            for turn, content in answers
+        ]
+        if not self._save(session, [], messages):
+            return [
+                self._error(turn.index, self._internal_error(), turn)
+                for turn, _ in answers
+            ]
+        return [
+            MessageBatchResult(index=turn.index, chat_id=turn.chat_id, content=content)
+            for turn, content in answers
+        ]
+
+    @staticmethod
+    def _save(session: Session, chats: list[dict], messages: list[Message]) -> bool:
+        """Writes the rows in a single transaction, False if it failed."""
+        try:
+            ChatRepository(session).insert_rows(chats)
+            MessageRepository(session).insert_rows(
+                [
+                    {
+                        "id": message.id,
+                        "chat_id": message.chat_id,
+                        "role": message.role.value,
+                        "content": message.content,
+                        "created_at": message.created_at,
+                    }
+                    for message in messages
+                ]
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            # the first line of DB errors, without the statement and parameters
+            logger.error(f"Batch rows could not be saved: {str(e).splitlines()[0]}")
+            return False
+        chat_cache.invalidate(*{message.chat_id for message in messages})
+        return True
+
+    @staticmethod
+    def _internal_error() -> ChatException:
+        return ChatException(ChatException.ErrorCode.Chat_Internal_Error)
+
+    @staticmethod
+    def _error(
+        index: int, error: APIError, turn: _Turn | None = None
+    ) -> MessageBatchResult:
+        """The result of a failed item, with the chat only if it was saved."""
+        return MessageBatchResult(
+            index=index,
+            chat_id=turn.chat_id if turn else None,
+            error_code=error.get_error_code(),
+            message=str(error),
+        )
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from contextlib import aclosing, suppress
+
+from exceptions.chat import ChatException
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi_exceptionshandler import APIError, APIExceptionHandler
+from helpers.metrics import CHAT_SOCKETS, observe_socket_turn
+from pydantic import ValidationError
+from schemas.external.message_schema import MessageSocketInput
+from services.chat_service import ChatService
+
+logger = logging.getLogger(__name__)
+
+
+def error_frame(error: APIError) -> dict:
+    """An error as a frame, with the body of the HTTP error responses."""
+    return {
+        "type": "error",
+        APIExceptionHandler.error_label: error.get_error_code(),
+        APIExceptionHandler.message_label: str(error),
+    }
+
+
+class ChatConnection:
+    """
+    A chat over a WebSocket. The ChatService (chat, LLM clients and prompt
+    builder) is built once and serves every turn of the connection, and the
+    history window comes from the chat cache, kept warm by its own writes.
+
+    JSON frames, the client sends:
+        {"type": "message", "message": "..."}  answer a message
+        {"type": "cancel"}                     stop the current answer
+    and receives:
+        {"type": "chat", "chatId": "..."}      once connected
+        {"type": "token", "content": "..."}    while the answer is generated
+        {"type": "done", "content": "..."}     with the whole answer
+        {"type": "cancelled", "content": "..."} with the part kept in the chat
+        {"type": "error", "errorCode": "...", "message": "..."}
+
+    One answer is generated at a time: a message sent meanwhile is rejected.
+    """
+
+    def __init__(
+        self, websocket: WebSocket, service: ChatService, queue_size: int
+    ) -> None:
+        self.websocket = websocket
+        self.service = service
+        # Frames waiting to be sent. When a slow client fills it the
+        # generation waits, and the LLM stream is read at the client pace.
+        self.outbox: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.generation: asyncio.Task | None = None
+        self.closed = False
+
+    async def run(self) -> None:
+        """Serves the connection until the client leaves."""
+        sender = asyncio.create_task(self._send_frames())
+        try:
+            with CHAT_SOCKETS.track_inprogress():
+                await self._send({"type": "chat", "chatId": self.service.chat_id})
+                await self._receive_frames()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # nothing is sent anymore, a generation waiting for room goes on
+            self.closed = True
+            sender.cancel()
+            await self._cancel_generation()
+
+    async def _receive_frames(self) -> None:
+        while True:
+            text = await self.websocket.receive_text()
+            try:
+                frame = MessageSocketInput.model_validate_json(text)
+            except ValidationError:
+                frame = None
+            if frame is None or (frame.type == "message" and not frame.message):
+                await self._send_error(ChatException.ErrorCode.Invalid_Message)
+                continue
+
+            if frame.type == "cancel":
+                await self._cancel_generation()
+            elif self.generation is not None and not self.generation.done():
+                await self._send_error(ChatException.ErrorCode.Generation_In_Progress)
+            else:
+                self.generation = asyncio.create_task(self._generate(frame.message))
+
+    async def _generate(self, message: str) -> None:
+        content = ""
+        stream = self.service.stream_user_message(message)
+        try:
+            async with aclosing(stream):
+                async for text in stream:
+                    content += text
+                    await self._send({"type": "token", "content": text})
+        except asyncio.CancelledError:
+            observe_socket_turn("cancelled")
+            await self._send({"type": "cancelled", "content": content})
+            raise
+        except APIError as e:
+            observe_socket_turn("error")
+            await self._send(error_frame(e))
+            return
+        observe_socket_turn("done")
+        await self._send({"type": "done", "content": content})
+
+    async def _cancel_generation(self) -> None:
+        if self.generation is None or self.generation.done():
+            return
+        self.generation.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.generation
+
+    async def _send_error(self, error_code: ChatException.ErrorCode) -> None:
+        await self._send(error_frame(ChatException(error_code)))
+
+    async def _send(self, frame: dict) -> None:
+        if not self.closed:
+            await self.outbox.put(frame)
+
+    async def _send_frames(self) -> None:
+        while True:
+            frame = await self.outbox.get()
+            try:
+                await self.websocket.send_json(frame)
+            except Exception as e:
+                # the receiver sees the disconnection and closes the connection
+                logger.info(f"Chat WebSocket send failed: {e}")
+                self.closed = True
+                return
@@ -0,0 +1,77 @@
+from helpers.etag import make_etag
+from models.chat_model import Chat, Message
+from repositories.chat_repository import ChatRepository
+from repositories.message_repository import MessageRepository
+from schemas.external.pagination import CursorInputPagination
+from sqlalchemy.orm import Session
+
+
+class ChatHistoryService:
+    """
+    Read side of the chats, meant for the read-only session. The ETags are
+    computed from a fingerprint query on the indexes, so a client with an up
+    to date page gets a 304 before any page is loaded or serialized.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.chat_repository = ChatRepository(session)
+        self.message_repository = MessageRepository(session)
+
+    def chats_etag(
+        self, username: str, pagination: CursorInputPagination
+    ) -> tuple[str, int]:
+        """ETag of a page of the chats of a user, and the amount of chats."""
+        fingerprint = self.chat_repository.username_fingerprint(username)
+        etag = make_etag("chats", username, *fingerprint, *self._params(pagination))
+        return etag, fingerprint[0]
+
+    def list_chats(
+        self, username: str, pagination: CursorInputPagination
+    ) -> tuple[list[Chat], str | None]:
+        return self.chat_repository.page_by_username(
+            username,
+            cursor=pagination.cursor,
+            page_size=pagination.page_size or 10,
+            sort=pagination.sort or "DESC",
+        )
+
+    def messages_etag(
+        self, chat_id: str, pagination: CursorInputPagination
+    ) -> tuple[str, int]:
+        """ETag of a page of the messages of a chat, and the amount of messages."""
+        chat = self._get_chat(chat_id)
+        if chat.archived_at:
+            fingerprint = self.chat_repository.archived_fingerprint(chat)
+        else:
+            fingerprint = self.message_repository.chat_fingerprint(chat_id)
+        etag = make_etag("messages", chat_id, *fingerprint, *self._params(pagination))
+        return etag, fingerprint[0]
+
+    def list_messages(
+        self, chat_id: str, pagination: CursorInputPagination
+    ) -> tuple[list[Message], str | None]:
+        chat = self._get_chat(chat_id)
+        params = dict(
+            cursor=pagination.cursor,
+            page_size=pagination.page_size or 10,
+            sort=pagination.sort or "ASC",
+        )
+        # archived chats are read from the archive, not restored
+        if chat.archived_at:
+            return self.chat_repository.page_archived_messages(chat, **params)
+        return self.message_repository.page_by_chat(chat_id, **params)
+
+    def _get_chat(self, chat_id: str) -> Chat:
+        chat = self.chat_repository.get(chat_id)
+        if not chat:
+            raise self.chat_repository.field_not_found
+        return chat
+
+    @staticmethod
+    def _params(pagination: CursorInputPagination) -> tuple:
+        return (
+            pagination.cursor,
+            pagination.page_size,
+            pagination.sort,
+            pagination.total,
+        )
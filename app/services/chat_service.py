@@ -1,12 +1,23 @@
+import hashlib
+import json
 import logging
+from contextlib import aclosing
+from typing import AsyncIterator
 
 from exceptions.chat import ChatException
+from exceptions.llm import LLMException
+from helpers.single_flight import SingleFlight
+from helpers.tracing import trace_span
+from langchain_core.documents import Document
 from langchain_core.messages import BaseMessage
 from models.chat_model import Chat, MessageRole
+from providers.cache_control import stable_prefix_length
 from providers.llm_provider import LLMProvider
 from repositories.chat_repository import ChatRepository
 from services.document_service import DocumentService
 from services.message_transformer import MessageTransformer
+from services.prompt_builder import PromptBuilder
+from services.prompt_templates import prompt_templates
 from services.rag_service import RAGService
 from sqlalchemy.orm import Session
 
@@ -14,15 +25,22 @@ logger = logging.getLogger(__name__)
 
 
 class ChatService:
+    # Identical prompts in flight share one LLM call, for the whole process
+    llm_calls = SingleFlight("llm")
+
     def __init__(
         self,
         session: Session,
         chat_id: str | None = None,
         username: str | None = None,
+        prompt_template: str | None = None,
     ):
         self.repository = ChatRepository(session)
         self.llm_service = LLMProvider()
         self.transformer = MessageTransformer()
+        self.prompt_builder = PromptBuilder(
+            self.transformer, template=prompt_templates.get(prompt_template)
+        )
         self.document_service = DocumentService()
         self.rag_service = RAGService()
         self.username: str | None = username
@@ -30,49 +48,112 @@ class ChatService:
 
     async def process_user_message(self, user_message: str) -> BaseMessage:
         try:
-            # 1. Guardar mensaje del usuario
+            history = self._prepare_turn(user_message)
+
+            # 4. Obtener respuesta del LLM
+            with trace_span("llm"):
+                ai_response = await self._get_ai_response(history)
+
+            # 5. Guardar respuesta de la IA
+            self._save_ai_message(ai_response.content)
+
+            return ai_response
+
+        except LLMException as e:
+            # e.g. timeouts or rate limits, the client can act on them
+            logger.error(f"Error procesando mensaje: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error procesando mensaje: {e}")
+            raise ChatException(ChatException.ErrorCode.Chat_Internal_Error)
+
+    async def stream_user_message(self, user_message: str) -> AsyncIterator[str]:
+        """
+        The turn of process_user_message, yielding the response text as it is
+        generated. When the stream stops early (cancelled, failed or closed),
+        the partial response is saved: the history keeps what the user saw.
+        """
+        content = ""
+        try:
+            history = self._prepare_turn(user_message)
+
+            # closed here and not when collected, so a cancel frees the model
+            # stream and the rate limiter slot right away
+            stream = self.llm_service.astream_message_response(history)
+            with trace_span("llm"):
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        if text := chunk.text():
+                            content += text
+                            yield text
+
+        except LLMException as e:
+            logger.error(f"Error procesando mensaje: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error procesando mensaje: {e}")
+            raise ChatException(ChatException.ErrorCode.Chat_Internal_Error)
+        finally:
+            if content:
+                self._save_ai_message(content)
+
+    def _prepare_turn(self, user_message: str) -> list[BaseMessage]:
+        """Saves the user message and builds the history to send to the LLM."""
+        # 1. Guardar mensaje del usuario
+        with trace_span("db.user_message"):
             self.repository.create_message(
                 chat_id=self._chat_id,
                 role=MessageRole.HumanMessage,
                 content=user_message,
             )
 
-            # 2. Buscar contexto relevante en los documentos
-            context_text = self.rag_service.similarity_search_by_query(
-                query=user_message
-            )
-            logger.debug(f"Contexto encontrado: {context_text}")
-
-            # 3. Construir historial para LLM
-            history = self._build_history(context=context_text)
-            logger.debug(f"Historial construido: {history}")
+        # 2. Buscar contexto relevante en los documentos
+        with trace_span("rag.search") as span:
+            context = self.rag_service.search_documents(query=user_message)
+            span.set_attributes(**{"rag.documents": len(context)})
+        logger.debug(f"Contexto encontrado: {context}")
 
-            # 4. Obtener respuesta del LLM
-            ai_response = self.llm_service.get_message_response(history=history)
+        # 3. Construir historial para LLM
+        with trace_span("history.build") as span:
+            history = self._build_history(context=context)
+            span.set_attributes(**{"history.messages": len(history)})
+        logger.debug(f"Historial construido: {history}")
+        return history
 
-            # 5. Guardar respuesta de la IA
+    def _save_ai_message(self, content: str) -> None:
+        with trace_span("db.ai_message"):
             self.repository.create_message(
                 chat_id=self._chat_id,
                 role=MessageRole.AIMessage,
-                content=ai_response.content,
+                content=content,
             )
 
-            return ai_response
+    async def _get_ai_response(self, history: list[BaseMessage]) -> BaseMessage:
+        # Only chats without previous messages (system messages + user message),
+        # their prompt depends on nothing but the question and the RAG context.
+        if len(history) - stable_prefix_length(history) > 1:
+            return await self.llm_service.aget_message_response(history=history)
 
-        except Exception as e:
-            logger.error(f"Error procesando mensaje: {e}")
-            raise ChatException(ChatException.ErrorCode.Chat_Internal_Error)
+        return await self.llm_calls.do(
+            self._history_key(history),
+            lambda: self.llm_service.aget_message_response(history=history),
+        )
 
-    def _build_history(self, context: str | None) -> list[BaseMessage]:
+    @staticmethod
+    def _history_key(history: list[BaseMessage]) -> str:
+        payload = json.dumps([(m.type, m.content) for m in history])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _build_history(self, context: list[Document] | None) -> list[BaseMessage]:
         db_messages = self.repository.get_chat_messages_by_id(self._chat_id)
-        history = [self.transformer.get_system_message(context=context)]
-        history.extend(self.transformer.to_langchain_messages(db_messages))
-        return history
+        return self.prompt_builder.build(db_messages, context=context)
 
     def _ensure_chat_exists(self, chat_id: str | None, username: str | None) -> str:
         if chat_id is None:
             chat: Chat = self.repository.create(username=username)
             return chat.id
+        # from the chat cache, the turn reads it again for free
+        self.repository.get_cached(chat_id)
         return chat_id
 
     @property
@@ -1,17 +1,24 @@
 import tempfile
+from typing import Literal
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
+from utils.tokens import get_encoding
 
 
 class DocumentService:
+    """
+    Loads and splits PDFs. The loader (langchain_community and pypdf) and the
+    splitter are imported on first use, they are not needed to serve chats.
+    """
+
     def pdf_to_documents(
         self,
         file_path: str | None = None,
         file_bytes: bytes | None = None,
         chunk_size: int = 1000,
         chunk_overlap: int = 100,
+        splitter: Literal["character", "token"] = "character",
+        tokenizer_model: str | None = None,
     ) -> list[Document]:
         if not file_path and not file_bytes:
             raise ValueError("Debe proporcionar un archivo PDF o bytes del archivo.")
@@ -20,6 +27,11 @@ class DocumentService:
             documents = self._load_by_path(file_path)
         else:
             documents = self._load_by_bytes(file_bytes)
+
+        if splitter == "token":
+            return self._split_documents_by_tokens(
+                documents, chunk_size, chunk_overlap, tokenizer_model
+            )
         return self._split_documents(documents, chunk_size, chunk_overlap)
 
     def _load_by_bytes(self, file_bytes: bytes | None) -> list[Document]:
@@ -31,17 +43,56 @@ class DocumentService:
             tmp.flush()
             pdf_path = tmp.name
 
-        loader = PyPDFLoader(pdf_path)
-        return loader.load()
+        return self._load_by_path(pdf_path)
 
     def _load_by_path(self, file_path: str) -> list[Document]:
+        from langchain_community.document_loaders import PyPDFLoader
+
         loader = PyPDFLoader(file_path)
         return loader.load()
 
     def _split_documents(
         self, documents: list[Document], chunk_size: int, chunk_overlap: int
     ) -> list[Document]:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
         )
         return splitter.split_documents(documents)
+
+    def _split_documents_by_tokens(
+        self,
+        documents: list[Document],
+        chunk_size: int,
+        chunk_overlap: int,
+        model_name: str | None = None,
+    ) -> list[Document]:
+        """
+        Splits the documents in windows of `chunk_size` tokens. Every page is
+        encoded once and the windows are sliced from the character offsets of
+        its tokens, so overlapping windows are never re-tokenized.
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap debe ser menor que chunk_size.")
+
+        encoding = get_encoding(model_name)
+        step = chunk_size - chunk_overlap
+
+        chunks = []
+        for document in documents:
+            tokens = encoding.encode(document.page_content, disallowed_special=())
+            if not tokens:
+                continue
+            text, offsets = encoding.decode_with_offsets(tokens)
+
+            for start in range(0, len(tokens), step):
+                end = min(start + chunk_size, len(tokens))
+                end_char = offsets[end] if end < len(tokens) else len(text)
+                content = text[offsets[start] : end_char]
+                if content.strip():
+                    metadata = {**document.metadata, "start_index": offsets[start]}
+                    chunks.append(Document(page_content=content, metadata=metadata))
+                if end == len(tokens):
+                    break
+        return chunks
@@ -0,0 +1,159 @@
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator
+
+import orjson
+from models.chat_model import Chat, Message
+from repositories.chat_repository import ChatRepository
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+
+class ExportService:
+    """
+    Streams the chats and their messages as NDJSON, one line per chat
+    followed by one line per message. Rows come from a server-side cursor
+    in batches of `batch_size`, so memory stays constant whatever the size
+    of the tables. Archived chats follow, one at a time.
+    """
+
+    batch_size = 1_000
+
+    def __init__(self, session_factory: sessionmaker) -> None:
+        # The generator outlives the request dependencies, it owns its session
+        self.session_factory = session_factory
+
+    def iter_ndjson(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        username: str | None = None,
+    ) -> Iterator[bytes]:
+        """
+        :param start: messages created from this date on
+        :param end: messages created before this date
+        :param username: only the chats of this user
+        """
+        query = (
+            select(
+                Chat.id,
+                Chat.username,
+                Chat.created_at,
+                Message.id,
+                Message.role,
+                Message.content,
+                Message.created_at,
+            )
+            .join(Chat, Chat.id == Message.chat_id)
+            .where(Chat.archived_at.is_(None))
+            # the (chat_id, created_at, id) index of the messages
+            .order_by(Message.chat_id, Message.created_at, Message.id)
+        )
+        if start:
+            query = query.where(Message.created_at >= start)
+        if end:
+            query = query.where(Message.created_at < end)
+        if username:
+            query = query.where(Chat.username == username)
+
+        session: Session = self.session_factory()
+        try:
+            result = session.execute(
+                query.execution_options(stream_results=True, yield_per=self.batch_size)
+            )
+            current_chat = None
+            lines: list[bytes] = []
+            for chat_id, user, chat_date, msg_id, role, content, msg_date in result:
+                if chat_id != current_chat:
+                    current_chat = chat_id
+                    lines.append(
+                        self._line(
+                            type="chat",
+                            id=chat_id,
+                            username=user,
+                            createdAt=chat_date,
+                        )
+                    )
+                lines.append(
+                    self._line(
+                        type="message",
+                        id=msg_id,
+                        chatId=chat_id,
+                        role=role,
+                        content=content,
+                        createdAt=msg_date,
+                    )
+                )
+                if len(lines) >= self.batch_size:
+                    yield b"".join(lines)
+                    lines = []
+            if lines:
+                yield b"".join(lines)
+
+            yield from self._iter_archived(session, start, end, username)
+        finally:
+            session.close()
+
+    def _iter_archived(
+        self,
+        session: Session,
+        start: datetime | None,
+        end: datetime | None,
+        username: str | None,
+    ) -> Iterator[bytes]:
+        start, end = _utc(start), _utc(end)
+        repository = ChatRepository(session)
+        query = session.query(Chat).filter(Chat.archived_at.is_not(None))
+        if username:
+            query = query.filter(Chat.username == username)
+
+        for chat in query.order_by(Chat.id).yield_per(self.batch_size):
+            messages = [
+                m
+                for m in repository.archived_messages(chat)
+                if (not start or m.created_at >= start)
+                and (not end or m.created_at < end)
+            ]
+            if not messages:
+                continue
+            lines = [
+                self._line(
+                    type="chat",
+                    id=chat.id,
+                    username=chat.username,
+                    createdAt=chat.created_at,
+                )
+            ]
+            lines.extend(
+                self._line(
+                    type="message",
+                    id=m.id,
+                    chatId=chat.id,
+                    role=m.role,
+                    content=m.content,
+                    createdAt=m.created_at,
+                )
+                for m in messages
+            )
+            # the chats are not kept in the identity map
+            session.expunge(chat)
+            yield b"".join(lines)
+
+    @staticmethod
+    def _line(**record: object) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value and not value.tzinfo:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzips a stream of chunks without holding it in memory."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
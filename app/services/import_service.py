@@ -0,0 +1,199 @@
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable
+
+from helpers.metrics import observe_import
+from models.chat_model import Chat, MessageRole
+from repositories.base import ModelRepository
+from repositories.chat_cache import chat_cache
+from repositories.chat_repository import ChatRepository
+from repositories.message_repository import MessageRepository
+from settings.db_settings import db_settings
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHAT_COLUMNS = ["id", "username", "created_at", "updated_at"]
+MESSAGE_COLUMNS = ["id", "chat_id", "role", "content", "created_at"]
+
+
+@dataclass
+class BatchError:
+    table: str
+    # 1-based line numbers of the input covered by the batch
+    first_line: int
+    last_line: int
+    rows: int
+    error: str
+
+
+@dataclass
+class LineError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    chats: int = 0
+    messages: int = 0
+    failed_rows: int = 0
+    seconds: float = 0
+    batch_errors: list[BatchError] = field(default_factory=list)
+    line_errors: list[LineError] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return self.chats + self.messages
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0
+
+
+@dataclass
+class _Batch:
+    repository: ModelRepository
+    columns: list[str]
+    rows: list[dict] = field(default_factory=list)
+    first_line: int = 0
+    last_line: int = 0
+
+
+class ImportService:
+    """
+    Imports conversation histories in the NDJSON format of the export: a
+    "chat" line followed by its "message" lines. Rows are written in batches
+    through SQLAlchemy Core (or COPY on PostgreSQL), without building ORM
+    objects nor loading the chats. Every batch is its own transaction: a
+    failed batch is rolled back and reported, and the import goes on.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: int | None = None,
+        method: str | None = None,
+    ) -> None:
+        self.session = session
+        self.batch_size = batch_size or db_settings.ImportBatchSize
+        method = method or db_settings.ImportMethod
+        if method == "auto":
+            dialect = session.get_bind().dialect.name
+            method = "copy" if dialect == "postgresql" else "insert"
+        self.method = method
+
+    def import_lines(self, lines: Iterable[bytes | str]) -> ImportReport:
+        report = ImportReport()
+        chats = _Batch(ChatRepository(self.session), CHAT_COLUMNS)
+        messages = _Batch(MessageRepository(self.session), MESSAGE_COLUMNS)
+        now = datetime.now(timezone.utc)
+
+        start = time.perf_counter()
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if record["type"] == "chat":
+                    batch, row = chats, self._chat_row(record, now)
+                elif record["type"] == "message":
+                    batch, row = messages, self._message_row(record, now)
+                else:
+                    raise ValueError(f"Unknown record type {record['type']}")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                report.line_errors.append(LineError(number, str(e)))
+                continue
+
+            if not batch.rows:
+                batch.first_line = number
+            batch.last_line = number
+            batch.rows.append(row)
+            if len(batch.rows) >= self.batch_size:
+                # the chats of the messages go first, for the foreign key
+                if batch is messages:
+                    self._flush(chats, report)
+                self._flush(batch, report)
+
+        self._flush(chats, report)
+        self._flush(messages, report)
+        report.seconds = time.perf_counter() - start
+
+        observe_import(report.seconds, report.chats, report.messages)
+        logger.info(
+            f"Imported {report.chats} chats and {report.messages} messages in"
+            f" {report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s),"
+            f" {len(report.batch_errors)} failed batches,"
+            f" {len(report.line_errors)} invalid lines"
+        )
+        return report
+
+    def _flush(self, batch: _Batch, report: ImportReport) -> None:
+        if not batch.rows:
+            return
+        try:
+            if self.method == "copy":
+                batch.repository.copy_rows(batch.rows, batch.columns)
+            else:
+                batch.repository.insert_rows(batch.rows)
+            self.session.commit()
+            if batch.repository.model is not Chat:
+                chat_cache.invalidate(*{row["chat_id"] for row in batch.rows})
+        except Exception as e:
+            self.session.rollback()
+            table = batch.repository.model.__tablename__
+            # the first line of DB errors, without the statement and parameters
+            error = str(e).splitlines()[0]
+            logger.warning(
+                f"Import batch of {table} (lines {batch.first_line}-"
+                f"{batch.last_line}) failed: {error}"
+            )
+            report.failed_rows += len(batch.rows)
+            report.batch_errors.append(
+                BatchError(
+                    table=table,
+                    first_line=batch.first_line,
+                    last_line=batch.last_line,
+                    rows=len(batch.rows),
+                    error=error,
+                )
+            )
+        else:
+            if batch.repository.model is Chat:
+                report.chats += len(batch.rows)
+            else:
+                report.messages += len(batch.rows)
+        batch.rows = []
+
+    @staticmethod
+    def _chat_row(record: dict, now: datetime) -> dict:
+        created_at = _parse_date(record.get("createdAt")) or now
+        return {
+            "id": record.get("id") or str(uuid.uuid4()),
+            "username": record.get("username"),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    @staticmethod
+    def _message_row(record: dict, now: datetime) -> dict:
+        if not isinstance(record["content"], str):
+            raise TypeError("content must be a string")
+        return {
+            "id": record.get("id") or str(uuid.uuid4()),
+            "chat_id": record["chatId"],
+            "role": MessageRole(record["role"]).value,
+            "content": record["content"],
+            "created_at": _parse_date(record.get("createdAt")) or now,
+        }
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    date = datetime.fromisoformat(value)
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
@@ -0,0 +1,49 @@
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+from models.chat_model import Message
+from services.message_transformer import MessageTransformer
+from services.prompt_templates import PromptTemplate, prompt_templates
+
+
+class PromptBuilder:
+    """
+    Builds the messages sent to the LLM, from the most stable content to the
+    most volatile one: instructions -> corpus context -> history -> query.
+
+    Providers cache prompts by prefix (Gemini implicit caching, DeepSeek prefix
+    cache), so the instructions always hit and the context also does while the
+    retrieved chunks do not change. Chunks are laid out in document order, not
+    relevance order, so the same set of chunks always renders the same text.
+    """
+
+    def __init__(
+        self,
+        transformer: MessageTransformer | None = None,
+        template: PromptTemplate | None = None,
+    ) -> None:
+        self.transformer = transformer or MessageTransformer()
+        self.template = template or prompt_templates.get()
+
+    def build(
+        self, db_messages: list[Message], context: list[Document] | None = None
+    ) -> list[BaseMessage]:
+        """
+        :param db_messages: chat messages, the last one is the user query
+        :param context: chunks retrieved for the query
+        """
+        history: list[BaseMessage] = [
+            self.template.instructions_message,
+            self.template.context_message(self.context_text(context)),
+        ]
+        history.extend(self.transformer.to_langchain_messages(db_messages))
+        return history
+
+    def context_text(self, context: list[Document] | None) -> str:
+        chunks = sorted(
+            (d for d in context or [] if d.page_content),
+            key=lambda d: (
+                d.metadata.get("document_id") or "",
+                d.metadata.get("chunk_index") or 0,
+            ),
+        )
+        return "\n\n".join(d.page_content for d in chunks)
@@ -0,0 +1,104 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from exceptions.chat import ChatException
+from langchain_core.messages import SystemMessage
+from settings.llm_settings import llm_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    System prompts of a tenant or language. The messages that do not depend on
+    the request are built once, when the template is loaded.
+    """
+
+    name: str
+    instructions: str
+    context_prompt: str
+    no_context_prompt: str
+
+    instructions_message: SystemMessage = field(init=False, repr=False)
+    no_context_message: SystemMessage = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "instructions_message", SystemMessage(self.instructions)
+        )
+        object.__setattr__(
+            self, "no_context_message", SystemMessage(self.no_context_prompt)
+        )
+
+    def context_message(self, context: str | None) -> SystemMessage:
+        if not context:
+            return self.no_context_message
+        return SystemMessage(self.context_prompt + context)
+
+
+BUILTIN_TEMPLATES = [
+    PromptTemplate(
+        name="es",
+        instructions=(
+            """ Por favor, responde a las preguntas de manera clara y concisa."""
+            """ Si no tienes suficiente información, indica que no puedes responder."""
+            """ Si la pregunta es ambigua, pide aclaraciones."""
+            """ Si la pregunta es sobre un tema que no conoces, indica que no tienes información al respecto."""
+            """ Si la pregunta es sobre un tema que no está relacionado con el contexto, indica que no puedes responder."""
+        ),
+        context_prompt=""" El contexto es el siguiente: """,
+        no_context_prompt=""" Si no hay contexto, responde de manera general pero resumida.""",
+    ),
+    PromptTemplate(
+        name="en",
+        instructions=(
+            """ Please answer the questions clearly and concisely."""
+            """ If you do not have enough information, say that you cannot answer."""
+            """ If the question is ambiguous, ask for clarification."""
+            """ If the question is about a topic you do not know, say that you have no information about it."""
+            """ If the question is not related to the context, say that you cannot answer."""
+        ),
+        context_prompt=""" The context is the following: """,
+        no_context_prompt=""" If there is no context, answer in a general but brief way.""",
+    ),
+]
+
+
+class PromptTemplateRegistry:
+    """Prompt templates by name, loaded once for the whole process."""
+
+    def __init__(self, templates: list[PromptTemplate], default: str) -> None:
+        self.templates = {template.name: template for template in templates}
+        self.default = default
+
+    @classmethod
+    def from_settings(cls) -> "PromptTemplateRegistry":
+        templates = list(BUILTIN_TEMPLATES)
+        if llm_settings.promptTemplatesPath:
+            templates.extend(cls.load_dir(Path(llm_settings.promptTemplatesPath)))
+        return cls(templates, default=llm_settings.promptTemplate or "es")
+
+    @staticmethod
+    def load_dir(path: Path) -> list[PromptTemplate]:
+        """
+        Loads every <name>.json file of the directory, with the keys
+        instructions, context_prompt and no_context_prompt.
+        """
+        templates = []
+        for file in sorted(path.glob("*.json")):
+            data = json.loads(file.read_text(encoding="utf-8"))
+            templates.append(PromptTemplate(name=file.stem, **data))
+            logger.info(f"Loaded prompt template '{file.stem}' from {file}")
+        return templates
+
+    def get(self, name: str | None = None) -> PromptTemplate:
+        template = self.templates.get(name or self.default)
+        if template is None:
+            raise ChatException(ChatException.ErrorCode.Prompt_Template_Not_Found)
+        return template
+
+
+prompt_templates = PromptTemplateRegistry.from_settings()
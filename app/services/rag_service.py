@@ -1,48 +1,227 @@
 import logging
+import time
+import uuid
+from functools import lru_cache
 
 from langchain_core.documents import Document
-from langchain_core.embeddings import DeterministicFakeEmbedding
 from exceptions.rag import RAGException
-from repositories.vector_store import FAISSVectorStore
+from helpers.metrics import VECTOR_SEARCH_DURATION, observe_ingestion
+from helpers.tracing import trace_span
 from services.document_service import DocumentService
+from services.rerank_service import RerankService
 from langchain_core.embeddings import Embeddings
-
-fake_embeddings = DeterministicFakeEmbedding(size=4096)
+from settings.rag_settings import rag_settings
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """Embeddings of the vector store, built on first use."""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    return DeterministicFakeEmbedding(size=4096)
+
+
 class RAGService:
     def __init__(
         self,
     ) -> None:
+        # Imported here, the vector store pulls faiss and langchain_community
+        from repositories.vector_store import FAISSVectorStore
+
         self.document_service = DocumentService()
-        self.embedding: Embeddings = fake_embeddings
-        self.vector_store = FAISSVectorStore(embeddings=self.embedding)
+        self.embedding: Embeddings = get_embeddings()
+        self.vector_store = FAISSVectorStore.get_instance(embeddings=self.embedding)
+        self.rerank_service = RerankService()
 
     def add_pdf_to_vector_store(
         self,
         file: bytes | None = None,
+        document_id: str | None = None,
     ) -> list[Document]:
-        split_documents = self.document_service.pdf_to_documents(
-            file_bytes=file,
-            chunk_size=1000,
-            chunk_overlap=200,
-        )
+        document_id = document_id or str(uuid.uuid4())
+        start = time.perf_counter()
+        split_documents = self._split_pdf(file, document_id)
         logger.info(f"Adding {len(split_documents)} documents to vector store")
-        if not split_documents:
-            raise RAGException(RAGException.ErrorCode.Documents_Not_Found)
-        self.vector_store.store.add_documents(split_documents)
+        self.vector_store.add_documents(document_id, split_documents)
+        self._observe_ingestion(start, split_documents)
         return split_documents
 
+    def replace_document(self, document_id: str, file: bytes | None) -> list[Document]:
+        if not self.vector_store.has_document(document_id):
+            raise RAGException(RAGException.ErrorCode.Document_Not_Found)
+
+        # The new file is split before touching the index, so a broken upload
+        # leaves the previous version of the document in place.
+        start = time.perf_counter()
+        split_documents = self._split_pdf(file, document_id)
+        logger.info(
+            f"Replacing document {document_id} with {len(split_documents)} documents"
+        )
+        self.vector_store.replace_document(document_id, split_documents)
+        self._observe_ingestion(start, split_documents)
+        return split_documents
+
+    def delete_document(self, document_id: str) -> int:
+        deleted = self.vector_store.delete_document(document_id)
+        if not deleted:
+            raise RAGException(RAGException.ErrorCode.Document_Not_Found)
+        logger.info(f"Deleted {deleted} documents of {document_id} from vector store")
+        return deleted
+
     def similarity_search_by_query(self, query: str) -> str:
-        documents = self.vector_store.store.similarity_search(query)
+        documents = self.search_documents(query)
         return self._documents_to_string(documents)
 
+    def search_documents(self, query: str, k: int | None = None) -> list[Document]:
+        k = k or rag_settings.searchTopK
+        with (
+            trace_span("rag.vector_search"),
+            VECTOR_SEARCH_DURATION.labels("search").time(),
+        ):
+            candidates = self.vector_store.similarity_search(
+                query, k * self.rerank_service.fetch_factor
+            )
+        with trace_span("rag.rerank"):
+            documents = self.rerank_service.rerank(query, candidates, k)
+        return self._expand_neighbours(documents)
+
+    def search_documents_batch(
+        self, queries: list[str], k: int | None = None
+    ) -> list[list[Document]]:
+        """
+        search_documents of many queries, embedded in a single call and looked
+        up with a single search of the index. Repeated queries are searched once.
+
+        :returns: the documents of every query, in the order of the queries
+        """
+        k = k or rag_settings.searchTopK
+        unique = list(dict.fromkeys(queries))
+        if not unique:
+            return []
+        with (
+            trace_span("rag.vector_search", **{"rag.queries": len(unique)}),
+            VECTOR_SEARCH_DURATION.labels("batch").time(),
+        ):
+            candidates = self.vector_store.batch_similarity_search_with_score(
+                unique, k * self.rerank_service.fetch_factor
+            )
+        documents: dict[str, list[Document]] = {}
+        with trace_span("rag.rerank"):
+            for query, scored in zip(unique, candidates):
+                ranked = self.rerank_service.rerank(query, [d for d, _ in scored], k)
+                documents[query] = self._expand_neighbours(ranked)
+        return [documents[query] for query in queries]
+
+    def similarity_search_by_queries(
+        self, queries: list[str], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        with VECTOR_SEARCH_DURATION.labels("batch").time():
+            return self.vector_store.batch_similarity_search_with_score(queries, k)
+
     def retrieve_str_documents(self, query: str) -> str:
-        retriever = self.vector_store.store.as_retriever()
-        documents = retriever.invoke(query)
+        documents = self.search_documents(query)
         return self._documents_to_string(documents)
 
+    def _observe_ingestion(self, start: float, documents: list[Document]) -> None:
+        pages = {d.metadata.get("page") for d in documents}
+        observe_ingestion(time.perf_counter() - start, len(pages), len(documents))
+
+    def _split_pdf(self, file: bytes | None, document_id: str) -> list[Document]:
+        if rag_settings.splitter == "token":
+            split_documents = self.document_service.pdf_to_documents(
+                file_bytes=file,
+                chunk_size=rag_settings.tokenChunkSize,
+                chunk_overlap=rag_settings.tokenChunkOverlap,
+                splitter="token",
+                tokenizer_model=rag_settings.tokenizerModel,
+            )
+        else:
+            split_documents = self.document_service.pdf_to_documents(
+                file_bytes=file,
+                chunk_size=rag_settings.chunkSize,
+                chunk_overlap=rag_settings.chunkOverlap,
+            )
+        if not split_documents:
+            raise RAGException(RAGException.ErrorCode.Documents_Not_Found)
+
+        for ordinal, document in enumerate(split_documents):
+            document.metadata["document_id"] = document_id
+            document.metadata["chunk_index"] = ordinal
+        return split_documents
+
+    def _expand_neighbours(self, documents: list[Document]) -> list[Document]:
+        """
+        Adds the chunks surrounding every hit and merges the contiguous ones
+        into a single span, so the LLM gets coherent passages while the index
+        keeps small chunks. Spans are ordered by their best ranked hit.
+        """
+        window = rag_settings.expansionWindow
+        if not window:
+            return documents
+
+        ordinals: dict[str, set[int]] = {}
+        ranks: dict[tuple[str, int], int] = {}
+        spans: list[tuple[int, Document]] = []
+        for rank, document in enumerate(documents):
+            document_id = document.metadata.get("document_id")
+            index = document.metadata.get("chunk_index")
+            if document_id is None or index is None:
+                spans.append((rank, document))
+                continue
+            ordinals.setdefault(document_id, set()).update(
+                range(max(index - window, 0), index + window + 1)
+            )
+            ranks.setdefault((document_id, index), rank)
+
+        for document_id, document_ordinals in ordinals.items():
+            chunks = self.vector_store.get_chunks(
+                document_id, sorted(document_ordinals)
+            )
+            run: list[Document] = []
+            for ordinal in sorted(chunks):
+                if run and ordinal != run[-1].metadata["chunk_index"] + 1:
+                    spans.append(self._merge_run(document_id, run, ranks))
+                    run = []
+                run.append(chunks[ordinal])
+            if run:
+                spans.append(self._merge_run(document_id, run, ranks))
+
+        return [span for _, span in sorted(spans, key=lambda s: s[0])]
+
+    def _merge_run(
+        self, document_id: str, run: list[Document], ranks: dict[tuple[str, int], int]
+    ) -> tuple[int, Document]:
+        text = run[0].page_content
+        for previous, chunk in zip(run, run[1:]):
+            text += self._join_chunks(previous, chunk)
+
+        first, last = run[0].metadata["chunk_index"], run[-1].metadata["chunk_index"]
+        rank = min(
+            ranks.get((document_id, i), len(ranks)) for i in range(first, last + 1)
+        )
+        metadata = {
+            **run[0].metadata,
+            "chunk_index": first,
+            "chunk_end_index": last,
+        }
+        return rank, Document(page_content=text, metadata=metadata)
+
+    def _join_chunks(self, previous: Document, chunk: Document) -> str:
+        """Returns the text of `chunk` to append after `previous`, minus the overlap."""
+        if previous.metadata.get("page") != chunk.metadata.get("page"):
+            return "\n" + chunk.page_content
+
+        start = chunk.metadata.get("start_index")
+        previous_start = previous.metadata.get("start_index")
+        if start is None or previous_start is None:
+            return " " + chunk.page_content
+
+        overlap = previous_start + len(previous.page_content) - start
+        if overlap <= 0:
+            return " " + chunk.page_content
+        return chunk.page_content[overlap:]
+
     def _documents_to_string(self, documents: list[Document]) -> str:
-        return "".join(d.page_content for d in documents if d.page_content)
+        return "\n\n".join(d.page_content for d in documents if d.page_content)
@@ -0,0 +1,138 @@
+import abc
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+
+from langchain_core.documents import Document
+from settings.rag_settings import rag_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Reranker(abc.ABC):
+    """
+    Scores the relevance of chunks for a query, higher scores rank first.
+    Scores must only depend on the (query, chunk) pair so they can be cached.
+    """
+
+    name: str = "base"
+
+    @abc.abstractmethod
+    def score(self, query: str, documents: list[Document]) -> list[float]: ...
+
+
+class LexicalReranker(Reranker):
+    """
+    In-process scorer that works offline: term coverage of the query plus a
+    saturated term frequency, with accents and case folded.
+    """
+
+    name = "lexical"
+    _word = re.compile(r"\w+")
+
+    def score(self, query: str, documents: list[Document]) -> list[float]:
+        query_terms = set(self._tokenize(query))
+        if not query_terms:
+            return [0.0] * len(documents)
+
+        scores = []
+        for document in documents:
+            frequencies = Counter(self._tokenize(document.page_content))
+            matched = [frequencies[t] for t in query_terms if t in frequencies]
+            coverage = len(matched) / len(query_terms)
+            saturation = sum(tf / (tf + 1.2) for tf in matched) / len(query_terms)
+            scores.append(coverage + saturation)
+        return scores
+
+    def _tokenize(self, text: str) -> list[str]:
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        return [t for t in self._word.findall(text) if len(t) > 1]
+
+
+RERANKERS: dict[str, type[Reranker]] = {
+    LexicalReranker.name: LexicalReranker,
+}
+
+
+class RerankService:
+    """
+    Reorders the over-fetched candidates of a similarity search and keeps the
+    best k. If scoring does not fit in the time budget the raw vector search
+    order is kept, so reranking never makes a request slower than the budget.
+    """
+
+    # Shared by every instance, keyed by (query hash, chunk content hash): the
+    # ids of the chunks are reused when a document is replaced
+    _cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    batch_size = 16
+
+    def __init__(self, reranker: Reranker | None = None) -> None:
+        if reranker is None and rag_settings.reranker:
+            reranker = RERANKERS[rag_settings.reranker]()
+        self.reranker = reranker
+
+    @property
+    def fetch_factor(self) -> int:
+        return rag_settings.rerankFetchFactor if self.reranker else 1
+
+    def rerank(self, query: str, documents: list[Document], k: int) -> list[Document]:
+        if not self.reranker or len(documents) < 2:
+            return documents[:k]
+
+        deadline = time.perf_counter() + rag_settings.rerankTimeBudgetMs / 1000
+        query_hash = hashlib.sha1(query.encode()).hexdigest()
+        scores = self._cached_scores(query_hash, documents)
+
+        pending = [i for i, score in enumerate(scores) if score is None]
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            batch_scores = self.reranker.score(query, [documents[i] for i in batch])
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+                self._cache_score(query_hash, documents[i], score)
+
+            # scores computed so far stay cached for the next request
+            if time.perf_counter() > deadline:
+                logger.warning(
+                    f"Rerank time budget exceeded, keeping the vector search order"
+                    f" of {len(documents)} documents"
+                )
+                return documents[:k]
+
+        # sorted is stable, ties keep the vector search order
+        order = sorted(
+            range(len(documents)), key=lambda i: scores[i] or 0.0, reverse=True
+        )
+        return [documents[i] for i in order[:k]]
+
+    def _cached_scores(
+        self, query_hash: str, documents: list[Document]
+    ) -> list[float | None]:
+        with self._cache_lock:
+            scores = []
+            for document in documents:
+                key = self._cache_key(query_hash, document)
+                score = self._cache.get(key)
+                if score is not None:
+                    self._cache.move_to_end(key)
+                scores.append(score)
+            return scores
+
+    def _cache_score(self, query_hash: str, document: Document, score: float) -> None:
+        key = self._cache_key(query_hash, document)
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > rag_settings.rerankCacheSize:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _cache_key(query_hash: str, document: Document) -> tuple[str, str]:
+        return query_hash, hashlib.sha1(document.page_content.encode()).hexdigest()
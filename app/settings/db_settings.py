@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +16,27 @@ class DBSettings(BaseSettings):
     DBSchema: Optional[str] = None
     # ===== DB Connection String
     DBConnectionString: Optional[str] = None
+    # ===== Bulk import
+    ImportBatchSize: Optional[int] = 5_000
+    # "copy" only works on PostgreSQL, "auto" uses it there and INSERT elsewhere
+    ImportMethod: Optional[Literal["auto", "insert", "copy"]] = "auto"
+    # ===== Archive
+    # Chats without messages for this many days are moved to the archive
+    ArchiveIdleDays: Optional[int] = 90
+    ArchiveBatchSize: Optional[int] = 200
+    # Monthly partitions of the messages created ahead (PostgreSQL)
+    PartitionMonthsAhead: Optional[int] = 3
+    # ===== Chat cache
+    # Chats kept in memory per worker, 0 disables the cache
+    ChatCacheSize: Optional[int] = 10_000
+    # Seconds an entry lives, bounds the staleness after writes of other workers
+    ChatCacheTTL: Optional[float] = 30
+    # Chats with up to this many messages also cache them
+    ChatCacheWindow: Optional[int] = 100
+    # ===== Chat batch
+    # Answers written per INSERT, and seconds an answer may wait for it
+    ChatBatchWriteSize: Optional[int] = 200
+    ChatBatchFlushInterval: Optional[float] = 1
 
 
 db_settings = DBSettings()
@@ -2,13 +2,25 @@ import logging
 from typing import Optional
 
 from exceptions.llm import LLMException
-from pydantic import model_validator
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from settings.llm_supported_models import SUPPORTED_MODELS
 
 logger = logging.getLogger(__name__)
 
 
+class RateLimit(BaseModel):
+    """Limits of the calls to a LLM provider, None means unlimited."""
+
+    requestsPerMinute: Optional[int] = None
+    tokensPerMinute: Optional[int] = None
+    maxConcurrency: Optional[int] = None
+    # Calls waiting for a slot, the next ones are rejected with a 429
+    maxQueueSize: int = 100
+    # Seconds a call may wait for a slot before being rejected with a 429
+    maxQueueWait: float = 30
+
+
 class LLMSettings(BaseSettings):
     """
     Settings for the LLM (Large Language Model) integration.
@@ -24,6 +36,44 @@ class LLMSettings(BaseSettings):
     apiKey: Optional[str] = None
     modelProvider: Optional[str] = None
 
+    # ===== Routing
+    # Models tried, in order, when the main model fails
+    fallbackModels: Optional[list[str]] = []
+    # API keys by provider, the ones not listed use apiKey
+    providerApiKeys: Optional[dict[str, str]] = {}
+    # Seconds before a single call is considered failed
+    timeout: Optional[float] = 30
+    maxRetries: Optional[int] = 2
+    # Base seconds of the exponential backoff between retries
+    retryBackoff: Optional[float] = 0.5
+    # Fire the first fallback model once the p95 latency of the main one elapses
+    hedgeRequests: Optional[bool] = False
+    hedgeDefaultDelay: Optional[float] = 5
+    hedgeMinSamples: Optional[int] = 20
+
+    # ===== Model selection by prompt size
+    # Cheaper model used for prompts up to shortPromptMaxTokens
+    shortPromptModelName: Optional[str] = None
+    shortPromptMaxTokens: Optional[int] = 2_000
+    # Model used when the prompt does not fit in the context of the main one
+    longContextModelName: Optional[str] = None
+    # Completion tokens reserved when maxTokens is not set
+    completionTokensReserve: Optional[int] = 1_024
+
+    # LLM calls in flight per batch request (/chat/batch)
+    batchConcurrency: Optional[int] = 8
+
+    # ===== Rate limits
+    rateLimit: RateLimit = RateLimit()
+    # Overrides of rateLimit by provider, e.g. {"deepseek": {"requestsPerMinute": 60}}
+    providerRateLimits: Optional[dict[str, RateLimit]] = {}
+
+    # ===== Prompts
+    # Template used when a request does not ask for one
+    promptTemplate: Optional[str] = "es"
+    # Directory with extra templates, one <name>.json file per tenant/language
+    promptTemplatesPath: Optional[str] = None
+
     @model_validator(mode="after")
     def set_provider(self):
         if not self.modelProvider:
@@ -36,5 +86,32 @@ class LLMSettings(BaseSettings):
                 raise LLMException(LLMException.ErrorCode.Model_Not_Found)
         return self
 
+    @model_validator(mode="after")
+    def check_routed_models(self):
+        routed_models = [self.shortPromptModelName, self.longContextModelName]
+        for model_name in [*(self.fallbackModels or []), *filter(None, routed_models)]:
+            if model_name not in SUPPORTED_MODELS:
+                logger.error(
+                    f"Model '{model_name}' not supported. Add it to SUPPORTED_MODELS."
+                )
+                raise LLMException(LLMException.ErrorCode.Model_Not_Found)
+        return self
+
+    @property
+    def modelNames(self) -> list[str]:
+        """Main model followed by the fallback ones, without duplicates."""
+        return list(dict.fromkeys([self.modelName, *(self.fallbackModels or [])]))
+
+    def get_provider(self, model_name: str) -> str | None:
+        if model_name == self.modelName:
+            return self.modelProvider
+        return SUPPORTED_MODELS.get(model_name)
+
+    def get_api_key(self, provider: str | None) -> str | None:
+        return (self.providerApiKeys or {}).get(provider or "", self.apiKey)
+
+    def get_rate_limit(self, provider: str | None) -> RateLimit:
+        return (self.providerRateLimits or {}).get(provider or "", self.rateLimit)
+
 
 llm_settings = LLMSettings()
@@ -1,4 +1,22 @@
+from typing import NamedTuple
+
 SUPPORTED_MODELS = {
     "gemini-2.0-flash": "google_genai",
+    "gemini-2.0-flash-lite": "google_genai",
     "deepseek-chat": "deepseek",
 }
+
+
+class ModelSpec(NamedTuple):
+    # Max tokens of prompt + completion
+    context_window: int
+    # USD per 1M tokens
+    input_price: float
+    output_price: float
+
+
+MODEL_SPECS = {
+    "gemini-2.0-flash": ModelSpec(1_048_576, 0.10, 0.40),
+    "gemini-2.0-flash-lite": ModelSpec(1_048_576, 0.075, 0.30),
+    "deepseek-chat": ModelSpec(65_536, 0.27, 1.10),
+}
@@ -14,6 +14,25 @@ class ProjectSettings(BaseSettings):
     Environment: Optional[str] = "Local"
     RootPath: Optional[str] = None
     CORSOrigins: Optional[list[str]] = ["*"]
+    # Server-Timing header with the duration of every stage of a request
+    ServerTiming: Optional[bool] = True
+    # Log every span, when no OpenTelemetry collector is configured
+    TraceLogSpans: Optional[bool] = False
+    # Prometheus /metrics endpoint
+    Metrics: Optional[bool] = True
+    # On-demand profiling, the middleware and /admin routes only exist if enabled
+    Profiling: Optional[bool] = False
+    # Expected in the X-Profile (per request) and X-Admin-Token headers
+    ProfilingToken: Optional[str] = None
+    ProfilingDir: Optional[str] = "profiles"
+    # Seconds between samples of pyinstrument
+    ProfilingInterval: Optional[float] = 0.001
+    # Loads the heavy dependencies at startup instead of on the first request
+    WarmUp: Optional[bool] = True
+    # Names in helpers.warmup.WARM_UP_STEPS, all of them if empty
+    WarmUpSteps: Optional[list[str]] = None
+    # Frames buffered per chat WebSocket, a slower client pauses the generation
+    WebSocketQueueSize: Optional[int] = 64
 
 
 project_settings = ProjectSettings()
@@ -0,0 +1,45 @@
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class RAGSettings(BaseSettings):
+    """
+    Settings for the RAG (Retrieval Augmented Generation) pipeline.
+    This class holds configuration options for the vector store index,
+    the maintenance of the indexed documents and the retrieval stages.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # FAISS index factory string. The index is always wrapped in an IDMap2 so
+    # every chunk keeps a stable label that can be removed later on.
+    faissIndexFactory: Optional[str] = "IDMap2,Flat"
+    # Ratio of tombstoned vectors over the index size that triggers a compaction
+    compactionThreshold: Optional[float] = 0.2
+
+    # ===== Ingestion
+    # Small chunks keep the embeddings precise, the neighbours are added back
+    # at retrieval time (see expansionWindow).
+    splitter: Optional[Literal["character", "token"]] = "character"
+    chunkSize: Optional[int] = 400
+    chunkOverlap: Optional[int] = 50
+    # Used by the token splitter, sizes are measured in tokens
+    tokenChunkSize: Optional[int] = 128
+    tokenChunkOverlap: Optional[int] = 16
+    # Model whose tokenizer is used, unknown models fall back to cl100k_base
+    tokenizerModel: Optional[str] = None
+
+    # ===== Retrieval
+    searchTopK: Optional[int] = 4
+    # Name of the reranker in RERANKERS, empty to disable the rerank stage
+    reranker: Optional[str] = "lexical"
+    # The vector search over-fetches k * rerankFetchFactor candidates
+    rerankFetchFactor: Optional[int] = 4
+    rerankTimeBudgetMs: Optional[float] = 50
+    rerankCacheSize: Optional[int] = 10_000
+    # Amount of chunks added at each side of a hit, 0 to disable the expansion
+    expansionWindow: Optional[int] = 1
+
+
+rag_settings = RAGSettings()
@@ -1,3 +1,10 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+
 def paginate(
     data: list, page: int = 1, page_size: int = 10, **kwargs: dict
 ) -> list[dict]:
@@ -19,3 +26,23 @@ def calc_offset(page: int, page_size: int) -> int:
     if page < 1 or page_size < 1:
         raise ValueError("Page and page_size must be greater than 0")
     return page_size * (page - 1)
+
+
+def encode_cursor(sort_value: Any, pk: Any) -> str:
+    """Opaque cursor of the last row of a page: its sort value and its id."""
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    payload = json.dumps([sort_value, pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    """Inverse of encode_cursor, raises ValueError if the cursor is not valid."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        sort_value, pk = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if isinstance(sort_value, dict) and "dt" in sort_value:
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return sort_value, pk
@@ -0,0 +1,52 @@
+import logging
+from functools import lru_cache
+from typing import Sequence
+
+import tiktoken
+from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+# Tokens added by the chat format around every message
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache
+def get_encoding(model_name: str | None = None) -> tiktoken.Encoding:
+    """
+    Gets the tiktoken encoding of a model, loaded only once per process.
+    Models unknown to tiktoken (e.g. gemini, deepseek) use the default encoding.
+    """
+    if model_name:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+@lru_cache
+def _get_encoding_or_none(model_name: str | None = None) -> tiktoken.Encoding | None:
+    try:
+        return get_encoding(model_name)
+    except Exception as e:
+        # e.g. the encoding file can not be downloaded, counts are estimated
+        logger.warning(f"Tokenizer not available, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model_name: str | None = None) -> int:
+    encoding = _get_encoding_or_none(model_name)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(
+    messages: Sequence[BaseMessage], model_name: str | None = None
+) -> int:
+    return sum(
+        count_tokens(str(message.content), model_name) + MESSAGE_OVERHEAD
+        for message in messages
+    )
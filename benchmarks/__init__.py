@@ -0,0 +1,11 @@
+"""
+Offline microbenchmarks, run from the repository root, e.g.:
+
+    python -m benchmarks.message_transformer
+"""
+
+import sys
+from pathlib import Path
+
+# Same import root as the application and the tests (pythonpath = . app)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
@@ -0,0 +1,99 @@
+"""Offline stand-ins for the LLM, the database and the uploaded PDFs."""
+
+import asyncio
+import time
+from typing import Any
+
+from db.base import Base
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import sessionmaker
+from utils.tokens import count_message_tokens
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Answers with a fixed amount of tokens after a time to first token plus
+    the generation time at `tokens_per_second`, like a real provider would.
+    """
+
+    latency: float = 0.2
+    tokens_per_second: float = 100
+    output_tokens: int = 50
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+
+    def _duration(self) -> float:
+        return self.latency + self.output_tokens / self.tokens_per_second
+
+    def _result(self, messages: list[BaseMessage]) -> ChatResult:
+        input_tokens = count_message_tokens(messages)
+        message = AIMessage(
+            " ".join(["token"] * self.output_tokens),
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[BaseMessage], *args: Any, **kwargs: Any):
+        time.sleep(self._duration())
+        return self._result(messages)
+
+    async def _agenerate(self, messages: list[BaseMessage], *args: Any, **kwargs: Any):
+        await asyncio.sleep(self._duration())
+        return self._result(messages)
+
+
+def session_factory(db_url: str | None = None) -> sessionmaker:
+    """In-memory SQLite by default, or any database (e.g. a local Postgres)."""
+    if db_url:
+        engine = create_engine(db_url)
+    else:
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Minimal PDF with one text page (Helvetica, 80 chars per line) per item."""
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+    ]
+    for i, text in enumerate(pages):
+        text = text.replace("\\", "").replace("(", "").replace(")", "")
+        lines = " ".join(f"({text[j : j + 80]}) '" for j in range(0, len(text), 80))
+        stream = f"BT /F1 10 Tf 20 800 Td 12 TL {lines} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842]"
+            f" /Contents {4 + 2 * i} 0 R"
+            f" /Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    ).encode()
+    return pdf
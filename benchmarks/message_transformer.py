@@ -0,0 +1,70 @@
+"""History conversion and system prompt construction of long chats."""
+
+import argparse
+import timeit
+
+from langchain_core import messages
+from langchain_core.documents import Document
+from models.chat_model import Message, MessageRole
+from services.message_transformer import MessageTransformer
+from services.prompt_builder import PromptBuilder
+
+
+def legacy_to_langchain_messages(db_messages: list[Message]) -> list:
+    """Conversion before the role lookup table, kept as the baseline."""
+    return [getattr(messages, msg.role.name)(msg.content) for msg in db_messages]
+
+
+def make_chat(size: int) -> list[Message]:
+    roles = [MessageRole.HumanMessage, MessageRole.AIMessage]
+    return [
+        Message(content=f"Mensaje {i} " + "lorem ipsum " * 20, role=roles[i % 2])
+        for i in range(size)
+    ]
+
+
+def report(name: str, fn, number: int, repeat: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+    print(f"{name:<32} {best * 1000:9.3f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_messages = make_chat(args.messages)
+    context = [
+        Document(f"Chunk {i} " * 50, metadata={"document_id": "doc", "chunk_index": i})
+        for i in range(4)
+    ]
+    transformer = MessageTransformer()
+    builder = PromptBuilder(transformer)
+
+    print(f"{args.messages} messages, best of {args.repeat} x {args.number} runs")
+    legacy = report(
+        "legacy getattr conversion",
+        lambda: legacy_to_langchain_messages(db_messages),
+        args.number,
+        args.repeat,
+    )
+    current = report(
+        "role lookup table conversion",
+        lambda: transformer.to_langchain_messages(db_messages),
+        args.number,
+        args.repeat,
+    )
+    report(
+        "full prompt build",
+        lambda: builder.build(db_messages, context=context),
+        args.number,
+        args.repeat,
+    )
+    print(f"speedup of the conversion: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Offset vs keyset pagination of the message table at deep pages."""
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from models.chat_model import Chat, Message, MessageRole
+from repositories.message_repository import MessageRepository
+from sqlalchemy import insert
+from utils.paginate import encode_cursor
+
+from benchmarks.fakes import session_factory
+
+
+def populate(session, rows: int, batch: int = 10_000) -> str:
+    chat = Chat(username="benchmark")
+    session.add(chat)
+    session.commit()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for first in range(0, rows, batch):
+        session.execute(
+            insert(Message),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "chat_id": chat.id,
+                    "role": MessageRole.HumanMessage,
+                    "content": f"Mensaje {i}",
+                    "created_at": start + timedelta(seconds=i),
+                }
+                for i in range(first, min(first + batch, rows))
+            ],
+        )
+    session.commit()
+    return chat.id
+
+
+def best_of(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", default="1,100,1000,3000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db-url", help="SQLAlchemy URL, in-memory SQLite if empty")
+    args = parser.parse_args()
+
+    session = session_factory(args.db_url)()
+    chat_id = populate(session, args.rows)
+    repository = MessageRepository(session)
+    # both go through the (chat_id, created_at, id) index of the messages
+    filters = [Message.chat_id == chat_id]
+    sort = {"sort_field": "created_at", "sort": "ASC"}
+
+    print(f"{args.rows} messages, {args.page_size} per page, best of {args.repeat}")
+    print(f"{'page':>6} {'offset ms':>10} {'cursor ms':>10}")
+    for page in (int(p) for p in args.pages.split(",")):
+        if (page - 1) * args.page_size >= args.rows:
+            continue
+        # cursor of the previous page, as a client walking the pages would have
+        cursor = None
+        if page > 1:
+            (last,) = repository.paginate(
+                filters, page=(page - 1) * args.page_size, page_size=1, **sort
+            )
+            cursor = encode_cursor(last.created_at, last.id)
+
+        offset = best_of(
+            lambda: repository.paginate(
+                filters, page=page, page_size=args.page_size, **sort
+            ),
+            args.repeat,
+        )
+        keyset = best_of(
+            lambda: repository.page_by_chat(
+                chat_id, cursor=cursor, page_size=args.page_size
+            ),
+            args.repeat,
+        )
+        print(f"{page:>6} {offset * 1000:>10.2f} {keyset * 1000:>10.2f}")
+
+    count = best_of(lambda: repository.filter_count(filters), args.repeat)
+    print(f"{'count':>6} {count * 1000:>10.2f}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
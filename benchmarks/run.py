@@ -0,0 +1,133 @@
+"""
+Offline benchmark suite: fake LLM and embeddings, SQLite (or --db-url).
+
+    python -m benchmarks.run --scenario all --baseline benchmarks/baseline.json
+    python -m benchmarks.run --scenario search --sizes 10000,100000,1000000
+
+Exits with 1 when a scenario regressed more than --tolerance over the baseline.
+Baselines depend on the machine, none is committed: create one with
+--save-baseline before comparing against it.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import scenarios
+from benchmarks.fakes import FakeChatModel, session_factory
+from benchmarks.stats import find_regressions, load_baseline, save_baseline
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenario", choices=["all", "chat", "ingest", "search"], default="all"
+    )
+    parser.add_argument("--db-url", help="SQLAlchemy URL, in-memory SQLite if empty")
+
+    chat = parser.add_argument_group("chat")
+    chat.add_argument("--history-lengths", type=int_list, default=[0, 10, 100])
+    chat.add_argument("--turns", type=int, default=20)
+    chat.add_argument("--concurrency", type=int, default=4)
+    chat.add_argument("--llm-latency", type=float, default=0.05)
+    chat.add_argument("--llm-tokens-per-second", type=float, default=1_000)
+    chat.add_argument("--llm-output-tokens", type=int, default=50)
+
+    ingest = parser.add_argument_group("ingest")
+    ingest.add_argument("--pages", type=int_list, default=[1, 10, 50])
+    ingest.add_argument("--documents", type=int, default=5)
+
+    search = parser.add_argument_group("search")
+    search.add_argument("--sizes", type=int_list, default=[10_000, 100_000])
+    search.add_argument("--dim", type=int, default=256)
+    search.add_argument("--queries", type=int, default=200)
+    search.add_argument("--k", type=int, default=16)
+    search.add_argument("--batch-size", type=int, default=32)
+    search.add_argument(
+        "--index-factory", help="FAISS factory, the settings one if empty"
+    )
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", type=Path, help="Writes the results as JSON")
+    output.add_argument(
+        "--baseline", type=Path, default=Path("benchmarks/baseline.json")
+    )
+    output.add_argument(
+        "--save-baseline", action="store_true", help="Stores the results as baseline"
+    )
+    output.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    # checked before running, a missing baseline would compare against nothing
+    if not args.save_baseline and not args.baseline.exists():
+        parser.error(
+            f"baseline {args.baseline} not found, create it with --save-baseline"
+        )
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    results: dict = {}
+
+    if args.scenario in ("all", "chat"):
+        llm = FakeChatModel(
+            latency=args.llm_latency,
+            tokens_per_second=args.llm_tokens_per_second,
+            output_tokens=args.llm_output_tokens,
+        )
+        results |= asyncio.run(
+            scenarios.chat_turns(
+                session_factory(args.db_url),
+                llm,
+                args.history_lengths,
+                args.turns,
+                args.concurrency,
+            )
+        )
+    if args.scenario in ("all", "ingest"):
+        results |= scenarios.ingestion(args.pages, args.documents)
+    if args.scenario in ("all", "search"):
+        results |= scenarios.vector_search(
+            args.sizes,
+            args.dim,
+            args.queries,
+            args.k,
+            args.batch_size,
+            args.index_factory,
+        )
+
+    print(f"{'scenario':<58} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<58} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}"
+            f" {result['p99_ms']:>9.2f} {result['throughput']:>10.2f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) if args.baseline.exists() else {}
+        baseline |= results
+        save_baseline(args.baseline, baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(
+        results, load_baseline(args.baseline), args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
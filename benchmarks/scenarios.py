@@ -0,0 +1,157 @@
+"""Benchmark scenarios, every one returns {scenario name: summary}."""
+
+import asyncio
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from models.chat_model import MessageRole
+from providers.llm_provider import LLMProvider
+from repositories.vector_store import FAISSVectorStore
+from services.chat_service import ChatService
+from services.rag_service import RAGService
+from settings.llm_settings import llm_settings
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fakes import FakeChatModel, make_pdf
+from benchmarks.stats import summarize
+
+LOREM = (
+    "El procesamiento de documentos permite responder preguntas sobre contratos,"
+    " manuales y reportes internos con el contexto recuperado del indice. "
+)
+
+
+def use_fake_llm(llm: FakeChatModel) -> None:
+    """Every configured model answers with the fake one."""
+    names = [
+        *llm_settings.modelNames,
+        llm_settings.shortPromptModelName,
+        llm_settings.longContextModelName,
+    ]
+    for name in filter(None, names):
+        LLMProvider._llms[name] = llm
+
+
+async def _chat(sessions: sessionmaker, history_length: int, turns: int) -> list[float]:
+    session = sessions()
+    try:
+        service = ChatService(session=session)
+        roles = [MessageRole.HumanMessage, MessageRole.AIMessage]
+        for i in range(history_length):
+            service.repository.create_message(
+                chat_id=service.chat_id, role=roles[i % 2], content=LOREM
+            )
+
+        samples = []
+        for turn in range(turns):
+            start = time.perf_counter()
+            await service.process_user_message(f"Pregunta {turn}: {LOREM}")
+            samples.append(time.perf_counter() - start)
+        return samples
+    finally:
+        session.close()
+
+
+async def _chats(
+    sessions: sessionmaker, history_length: int, turns: int, concurrency: int
+) -> list[list[float]]:
+    return await asyncio.gather(
+        *(_chat(sessions, history_length, turns) for _ in range(concurrency))
+    )
+
+
+async def chat_turns(
+    sessions: sessionmaker,
+    llm: FakeChatModel,
+    history_lengths: list[int],
+    turns: int,
+    concurrency: int,
+) -> dict:
+    """Chat turns (DB, RAG, prompt and fake LLM) over chats of growing history."""
+    use_fake_llm(llm)
+    results = {}
+    for history_length in history_lengths:
+        start = time.perf_counter()
+        chats = await _chats(sessions, history_length, turns, concurrency)
+        samples = [sample for chat in chats for sample in chat]
+        results[f"chat_turn[history={history_length}]"] = summarize(
+            samples, time.perf_counter() - start
+        )
+    return results
+
+
+def ingestion(page_counts: list[int], documents: int) -> dict:
+    """Split, embed and index of generated PDFs, throughput in pages/s."""
+    FAISSVectorStore.instance = None
+    rag_service = RAGService()
+    results = {}
+    for pages in page_counts:
+        pdf = make_pdf([f"Pagina {i}. " + LOREM * 12 for i in range(pages)])
+        samples = []
+        start = time.perf_counter()
+        for _ in range(documents):
+            doc_start = time.perf_counter()
+            rag_service.add_pdf_to_vector_store(pdf)
+            samples.append(time.perf_counter() - doc_start)
+        results[f"ingest_pdf[pages={pages}]"] = summarize(
+            samples, time.perf_counter() - start, units=pages * documents
+        )
+    FAISSVectorStore.instance = None
+    return results
+
+
+def build_store(
+    size: int, dim: int, index_factory: str | None, batch: int = 10_000
+) -> FAISSVectorStore:
+    """Store of `size` chunks with random vectors, indexed in batches."""
+    store = FAISSVectorStore(
+        DeterministicFakeEmbedding(size=dim), index_factory=index_factory
+    )
+    rng = np.random.default_rng(42)
+    for first in range(0, size, batch):
+        count = min(batch, size - first)
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        documents = [Document(f"chunk {first + i}") for i in range(count)]
+        store.add_documents(f"bench-{first}", documents, vectors=vectors)
+    return store
+
+
+def vector_search(
+    sizes: list[int],
+    dim: int,
+    queries: int,
+    k: int,
+    batch_size: int,
+    index_factory: str | None,
+) -> dict:
+    """Single and batched similarity searches, embeddings of the queries included."""
+    results = {}
+    for size in sizes:
+        store = build_store(size, dim, index_factory)
+        texts = [f"consulta {i} {LOREM}" for i in range(queries)]
+
+        samples = []
+        start = time.perf_counter()
+        for text in texts:
+            query_start = time.perf_counter()
+            store.similarity_search_with_score(text, k)
+            samples.append(time.perf_counter() - query_start)
+        results[f"vector_search[size={size},dim={dim}]"] = summarize(
+            samples, time.perf_counter() - start
+        )
+
+        samples = []
+        start = time.perf_counter()
+        for first in range(0, queries, batch_size):
+            batch_start = time.perf_counter()
+            store.batch_similarity_search_with_score(
+                texts[first : first + batch_size], k
+            )
+            samples.append(time.perf_counter() - batch_start)
+        results[f"vector_search_batch[size={size},dim={dim},batch={batch_size}]"] = (
+            summarize(samples, time.perf_counter() - start, units=queries)
+        )
+        del store
+    return results
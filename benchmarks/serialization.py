@@ -0,0 +1,109 @@
+"""Serialization of large chat payloads, from the schema to the response body."""
+
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from humps import camelize
+from pydantic import BaseModel, ConfigDict
+from schemas.base import CamelModel
+from schemas.external.chat_schema import ChatRead
+
+
+def make_chat(size: int) -> ChatRead:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    chat_id = str(uuid.uuid4())
+    return ChatRead(
+        id=chat_id,
+        username="john_doe",
+        messages=[
+            {
+                "id": str(uuid.uuid4()),
+                "content": f"Mensaje {i} " + "lorem ipsum dolor sit amet " * 10,
+                "role": "user" if i % 2 else "assistant",
+                "chat_id": chat_id,
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(size)
+        ],
+    )
+
+
+def report(name: str, fn, number: int, repeat: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+    print(f"{name:<40} {best * 1000:9.3f} ms")
+    return best
+
+
+def alias_generation(fields: int) -> tuple:
+    """Schema class creation with humps and with the cached generator."""
+    names = {f"field_name_{i}": (str, "") for i in range(fields)}
+    annotations = {name: annotation for name, (annotation, _) in names.items()}
+    defaults = {name: default for name, (_, default) in names.items()}
+
+    def build(generator) -> type:
+        namespace = {
+            "__annotations__": annotations,
+            "model_config": ConfigDict(alias_generator=generator),
+            **defaults,
+        }
+        return type("Schema", (BaseModel,), namespace)
+
+    return (
+        lambda: build(camelize),
+        lambda: build(CamelModel.model_config["alias_generator"]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chat = make_chat(args.messages)
+    print(f"ChatRead of {args.messages} messages, best of {args.repeat} runs")
+
+    # What FastAPI does without and with a response_model: jsonable_encoder
+    # of the model, or the pydantic serializer, then the response class
+    legacy = report(
+        "jsonable_encoder + JSONResponse",
+        lambda: JSONResponse(jsonable_encoder(chat, by_alias=True)),
+        args.number,
+        args.repeat,
+    )
+    stdlib = report(
+        "model_dump + JSONResponse",
+        lambda: JSONResponse(chat.model_dump(mode="json", by_alias=True)),
+        args.number,
+        args.repeat,
+    )
+    current = report(
+        "model_dump + ORJSONResponse",
+        lambda: ORJSONResponse(chat.model_dump(mode="json", by_alias=True)),
+        args.number,
+        args.repeat,
+    )
+    report(
+        "model_dump_json (reference)",
+        lambda: chat.model_dump_json(by_alias=True),
+        args.number,
+        args.repeat,
+    )
+    print(
+        f"speedup of orjson: {legacy / current:.2f}x without response_model,"
+        f" {stdlib / current:.2f}x with it"
+    )
+
+    humps_build, cached_build = alias_generation(50)
+    print("\nSchema of 50 fields, aliases are generated once per class")
+    report("humps camelize", humps_build, args.number * 10, args.repeat)
+    report("cached to_camel", cached_build, args.number * 10, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Latency percentiles, throughput and comparison against a baseline."""
+
+import json
+from pathlib import Path
+
+# Lower is better for these keys, higher is better for the throughput
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = percent / 100 * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[float], elapsed: float, units: float | None = None) -> dict:
+    """
+    :param samples: seconds of every operation
+    :param elapsed: wall time of the whole run, for the throughput
+    :param units: amount of work done (pages, turns...), defaults to the samples
+    """
+    ordered = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "throughput": round((units or len(samples)) / elapsed, 3) if elapsed else 0,
+    }
+
+
+def load_baseline(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Scenarios slower (or with less throughput) than baseline +- tolerance."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        for key in LATENCY_KEYS:
+            if expected.get(key) and result[key] > expected[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {key}: {result[key]} > {expected[key]} (+{tolerance:.0%})"
+                )
+        if expected.get("throughput") and result["throughput"] < expected[
+            "throughput"
+        ] * (1 - tolerance):
+            regressions.append(
+                f"{name} throughput: {result['throughput']} < {expected['throughput']}"
+                f" (-{tolerance:.0%})"
+            )
+    return regressions
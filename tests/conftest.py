@@ -1,11 +1,11 @@
-from functools import wraps
 from typing import Any
 from unittest import mock
 
 import pytest
 
 pytest_plugins = [
-    "tests.unit",
+    "tests.fixtures",
+    "tests.unit.fixtures",
 ]
 
 
@@ -37,18 +37,3 @@ def patches(
             _patch.stop()
 
     request.addfinalizer(teardown)
-
-
-# We need to disable the @cache decorator during testing
-def mock_cache(*args, **kwargs):
-    def wrapper(func):
-        @wraps(func)
-        async def inner(*args, **kwargs):
-            return await func(*args, **kwargs)
-
-        return inner
-
-    return wrapper
-
-
-mock.patch("fastapi_cache.decorator.cache", mock_cache).start()
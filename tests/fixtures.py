@@ -1,17 +1,105 @@
+import asyncio
+from typing import Any, AsyncIterator, Iterator
+
 import pytest
-from db.base_class import Base
+from db.base import Base
+from db.session import SingletonDB
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from providers.llm_provider import LLMProvider
+from repositories.chat_cache import chat_cache
+from settings.llm_settings import llm_settings
 from sqlalchemy import StaticPool, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 
+class FakeChatModel(FakeListChatModel):
+    """Fake chat model that counts its calls and can answer slowly."""
+
+    delay: float = 0
+    calls: int = 0
+
+    async def _agenerate(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return await super()._agenerate(*args, **kwargs)
+
+
+class FailingChatModel(FakeChatModel):
+    """Fails the first `failures` calls, then answers."""
+
+    failures: int = 1_000
+
+    async def _agenerate(self, *args: Any, **kwargs: Any) -> Any:
+        self._fail()
+        return await super(FakeChatModel, self)._agenerate(*args, **kwargs)
+
+    async def _astream(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        self._fail()
+        async for chunk in super()._astream(*args, **kwargs):
+            yield chunk
+
+    def _fail(self) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("provider error")
+
+
 @pytest.fixture
-def temp_session() -> Session:
-    SQLALCHEMY_DATABASE_URL = "sqlite://"
+def session_factory() -> sessionmaker:
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
+        "sqlite://",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
-    return TestingSessionLocal()
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def temp_session(session_factory: sessionmaker) -> Iterator[Session]:
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_chat_cache() -> Iterator[None]:
+    chat_cache.clear()
+    yield
+    chat_cache.clear()
+
+
+@pytest.fixture
+def fake_llm() -> Iterator[FakeChatModel]:
+    """Answers "respuesta" for every configured model."""
+    llm = FakeChatModel(responses=["respuesta"])
+    llms = dict(LLMProvider._llms)
+    for name in llm_settings.modelNames:
+        LLMProvider._llms[name] = llm
+    yield llm
+    LLMProvider._llms.clear()
+    LLMProvider._llms.update(llms)
+
+
+@pytest.fixture
+def vector_store() -> Iterator[Any]:
+    """A new, empty, process vector store."""
+    from repositories.vector_store import FAISSVectorStore
+    from services.rag_service import get_embeddings
+
+    FAISSVectorStore.instance = FAISSVectorStore(embeddings=get_embeddings())
+    yield FAISSVectorStore.instance
+    FAISSVectorStore.instance = None
+
+
+@pytest.fixture
+def client(session_factory: sessionmaker) -> Iterator[TestClient]:
+    """The app on an in-memory database, without the startup warm-up."""
+    from main import app
+
+    sessions = SingletonDB.session_instance, SingletonDB.session_ro_instance
+    SingletonDB.session_instance = session_factory
+    SingletonDB.session_ro_instance = session_factory
+    yield TestClient(app)
+    SingletonDB.session_instance, SingletonDB.session_ro_instance = sessions
@@ -0,0 +1,91 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.fixtures import FakeChatModel
+
+# [{"dt": 123}, "id"], a TypeError while decoding the datetime
+FORGED_CURSOR = "W3siZHQiOjEyM30sImlkIl0"
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", FORGED_CURSOR])
+def test_invalid_cursors_are_rejected_with_422(client: TestClient, cursor: str) -> None:
+    response = client.get("/v1_0/chats", params={"username": "user", "cursor": cursor})
+
+    assert response.status_code == 422
+
+
+def new_chat(client: TestClient, username: str = "user") -> str:
+    response = client.post("/v1_0/chat", json={"message": "hola", "username": username})
+    return response.json()["chat_id"]
+
+
+def test_chats_of_a_user_are_paged_newest_first(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    chat_ids = [new_chat(client) for _ in range(3)]
+    new_chat(client, username="other")
+
+    pages, cursor = [], None
+    while True:
+        params = {"username": "user", "pageSize": 2, "total": "exact"}
+        response = client.get("/v1_0/chats", params={**params, "cursor": cursor})
+        body = response.json()
+        pages.append([chat["id"] for chat in body["data"]])
+        assert body["total"] == 3
+        if not (cursor := body["nextCursor"]):
+            break
+
+    assert sum(pages, []) == chat_ids[::-1]
+    assert [len(page) for page in pages] == [2, 1]
+
+
+def test_unchanged_chats_page_is_not_modified(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    new_chat(client)
+    first = client.get("/v1_0/chats", params={"username": "user"})
+    etag = first.headers["ETag"]
+
+    cached = client.get(
+        "/v1_0/chats", params={"username": "user"}, headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    new_chat(client)
+    changed = client.get(
+        "/v1_0/chats", params={"username": "user"}, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_messages_of_a_chat_are_paged_oldest_first(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    chat_id = new_chat(client)
+    client.post("/v1_0/chat", json={"message": "otra", "chatId": chat_id})
+    url = f"/v1_0/chats/{chat_id}/messages"
+
+    first = client.get(url, params={"pageSize": 3})
+    second = client.get(url, params={"cursor": first.json()["nextCursor"]})
+
+    contents = [m["content"] for m in first.json()["data"] + second.json()["data"]]
+    assert contents == ["hola", "respuesta", "otra", "respuesta"]
+    assert second.json()["nextCursor"] is None
+
+
+def test_messages_page_etag_changes_with_a_new_message(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    chat_id = new_chat(client)
+    url = f"/v1_0/chats/{chat_id}/messages"
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": etag.removeprefix("W/")}).status_code == 304
+
+    client.post("/v1_0/chat", json={"message": "otra", "chatId": chat_id})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
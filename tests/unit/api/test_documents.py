@@ -0,0 +1,47 @@
+from benchmarks.fakes import make_pdf
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from repositories.vector_store import FAISSVectorStore
+
+
+def test_replace_document_compacts_the_index(
+    client: TestClient, vector_store: FAISSVectorStore, monkeypatch
+) -> None:
+    compactions = []
+    monkeypatch.setattr(
+        vector_store, "compact_if_needed", lambda: compactions.append(True)
+    )
+    upload = client.post(
+        "/v1_0/chat/upload-pdf",
+        files={"file": ("a.pdf", make_pdf(["primera version"]), "application/pdf")},
+    )
+    document_id = upload.json()["document_id"]
+
+    response = client.put(
+        f"/v1_0/documents/{document_id}",
+        files={"file": ("a.pdf", make_pdf(["segunda version"]), "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    assert compactions == [True]
+
+
+def test_batch_search_answers_every_query_in_order(
+    client: TestClient, vector_store: FAISSVectorStore
+) -> None:
+    vector_store.add_documents(
+        "doc",
+        [
+            Document(page_content=text, metadata={"document_id": "doc"})
+            for text in ("uno", "dos", "tres")
+        ],
+    )
+
+    response = client.post(
+        "/v1_0/documents/search/batch", json={"queries": ["tres", "uno"], "k": 1}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r[0]["content"] for r in results] == ["tres", "uno"]
+    assert results[0][0]["documentId"] == "doc"
@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from api.admin_api import api_router
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_exceptionshandler import APIExceptionMiddleware
+from helpers.profiling import Profiler, ProfilingMiddleware, is_authorized
+from settings.project_settings import project_settings
+
+TOKEN = "secret"
+
+
+@pytest.fixture
+def admin(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[TestClient]:
+    """An app with the profiling routes and middleware, as with Profiling on."""
+    monkeypatch.setattr(project_settings, "ProfilingToken", TOKEN)
+    monkeypatch.setattr(project_settings, "ProfilingDir", str(tmp_path))
+    app = FastAPI()
+    app.include_router(api_router)
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"pong": True}
+
+    app.add_middleware(APIExceptionMiddleware, capture_unhandled=True)
+    app.add_middleware(ProfilingMiddleware)
+    yield TestClient(app)
+    Profiler.active = False
+
+
+def test_profiling_needs_the_configured_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(project_settings, "ProfilingToken", None)
+    assert not is_authorized(None)
+    assert not is_authorized("")
+
+    monkeypatch.setattr(project_settings, "ProfilingToken", TOKEN)
+    assert not is_authorized(None)
+    assert not is_authorized("wrong")
+    assert is_authorized(TOKEN)
+
+
+def test_admin_routes_reject_missing_and_wrong_tokens(admin: TestClient) -> None:
+    assert admin.get("/admin/profiles").status_code == 401
+    wrong = admin.get("/admin/profiles", headers={"X-Admin-Token": "wrong"})
+    assert wrong.status_code == 403
+
+
+def test_requests_with_the_token_are_profiled(admin: TestClient) -> None:
+    response = admin.get("/ping", headers={"X-Profile": TOKEN})
+    name = response.headers["X-Profile-Name"]
+
+    profiles = admin.get("/admin/profiles", headers={"X-Admin-Token": TOKEN})
+    assert profiles.json() == {"profiles": [name]}
+    download = admin.get(f"/admin/profiles/{name}", headers={"X-Admin-Token": TOKEN})
+    assert download.status_code == 200
+    assert not Profiler.active
+
+
+def test_requests_without_the_token_are_not_profiled(admin: TestClient) -> None:
+    for headers in ({}, {"X-Profile": "wrong"}):
+        response = admin.get("/ping", headers=headers)
+        assert "X-Profile-Name" not in response.headers
+
+    profiles = admin.get("/admin/profiles", headers={"X-Admin-Token": TOKEN})
+    assert profiles.json() == {"profiles": []}
+
+
+def test_only_stored_profiles_can_be_downloaded(admin: TestClient) -> None:
+    response = admin.get(
+        "/admin/profiles/..%2F..%2Fetc%2Fpasswd", headers={"X-Admin-Token": TOKEN}
+    )
+
+    assert response.status_code == 404
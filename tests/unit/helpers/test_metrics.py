@@ -0,0 +1,82 @@
+from typing import Any
+
+import pytest
+from exceptions.chat import ChatException
+from fastapi.testclient import TestClient
+from helpers.metrics import ErrorMetricsMiddleware
+from langchain_core.documents import Document
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+
+from tests.fixtures import FakeChatModel
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_timed_by_route_template(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    labels = {"method": "POST", "route": "/chat", "version": "1_0"}
+    before = sample("http_request_duration_seconds_count", status="200", **labels)
+    invalid = sample("http_request_duration_seconds_count", status="422", **labels)
+
+    client.post("/v1_0/chat", json={"message": "hola"})
+    client.post("/v1_0/chat", json={})
+
+    assert sample("http_request_duration_seconds_count", status="200", **labels) == (
+        before + 1
+    )
+    assert sample("http_request_duration_seconds_count", status="422", **labels) == (
+        invalid + 1
+    )
+
+
+def test_scrape_reports_the_state_gauges(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    vector_store.add_documents("a", [Document("uno"), Document("dos")])
+    vector_store.delete_document("a")
+    vector_store.add_documents("b", [Document("tres")])
+    client.post("/v1_0/chat", json={"message": "hola"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "vector_store_chunks 1.0" in response.text
+    assert "vector_store_documents 1.0" in response.text
+    assert "vector_store_tombstones " in response.text
+    assert "chat_cache_entries 1.0" in response.text
+    assert 'llm_request_duration_seconds_count{model="' in response.text
+
+
+def test_endpoint_errors_are_counted_by_error_code() -> None:
+    async def fail(request: Request) -> None:
+        raise ChatException(ChatException.ErrorCode.Chat_Not_Found)
+
+    async def crash(request: Request) -> None:
+        raise RuntimeError("bug")
+
+    app = ErrorMetricsMiddleware(
+        Starlette(routes=[Route("/fail", fail), Route("/crash", crash)])
+    )
+    client = TestClient(app, raise_server_exceptions=False)
+    before = sample(
+        "app_errors_total", exception="ChatException", error_code="Chat_Not_Found"
+    )
+    unhandled = sample(
+        "app_errors_total", exception="RuntimeError", error_code="Unhandled"
+    )
+
+    client.get("/fail")
+    client.get("/crash")
+
+    assert sample(
+        "app_errors_total", exception="ChatException", error_code="Chat_Not_Found"
+    ) == pytest.approx(before + 1)
+    assert sample(
+        "app_errors_total", exception="RuntimeError", error_code="Unhandled"
+    ) == pytest.approx(unhandled + 1)
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from helpers.single_flight import SingleFlight
+from prometheus_client import REGISTRY
+
+
+class Upstream:
+    """Slow call that counts how many times it runs."""
+
+    def __init__(self, result: str = "respuesta", error: bool = False) -> None:
+        self.result = result
+        self.error = error
+        self.started = 0
+        self.cancelled = False
+
+    async def __call__(self) -> str:
+        self.started += 1
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise RuntimeError("upstream error")
+        return self.result
+
+
+def test_identical_calls_run_once() -> None:
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(flight.do("k", upstream) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["respuesta"] * 5
+    assert upstream.started == 1
+    assert (flight.executed, flight.shared) == (1, 4)
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately() -> None:
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main() -> list[str]:
+        return await asyncio.gather(flight.do("a", upstream), flight.do("b", upstream))
+
+    asyncio.run(main())
+    assert upstream.started == 2
+
+
+def test_errors_are_shared() -> None:
+    flight = SingleFlight("test")
+    upstream = Upstream(error=True)
+
+    async def main() -> list:
+        return await asyncio.gather(
+            flight.do("k", upstream), flight.do("k", upstream), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert [type(e) for e in errors] == [RuntimeError, RuntimeError]
+    assert upstream.started == 1
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others() -> None:
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main() -> str:
+        leader = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "respuesta"
+    assert upstream.started == 1
+    assert not upstream.cancelled
+
+
+def test_the_call_is_cancelled_when_every_caller_left() -> None:
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main() -> None:
+        callers = [asyncio.create_task(flight.do("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert upstream.cancelled
+    assert flight.in_flight() == 0
+
+
+def test_counters_are_exported() -> None:
+    flight = SingleFlight("exported")
+    upstream = Upstream()
+
+    async def main() -> None:
+        await asyncio.gather(flight.do("k", upstream), flight.do("k", upstream))
+
+    asyncio.run(main())
+    sample = REGISTRY.get_sample_value
+    assert (
+        sample("single_flight_calls_total", {"name": "exported", "result": "executed"})
+        == 1
+    )
+    assert (
+        sample("single_flight_calls_total", {"name": "exported", "result": "shared"})
+        == 1
+    )
+    assert sample("single_flight_in_flight", {"name": "exported"}) == 0
@@ -0,0 +1,42 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from helpers.tracing import Span, request_spans, server_timing, trace_span
+from settings.llm_settings import llm_settings
+
+from tests.fixtures import FakeChatModel
+
+
+def parse_server_timing(header: str) -> dict[str, str]:
+    entries = {}
+    for entry in header.split(", "):
+        name, _, params = entry.partition(";")
+        entries[name] = params
+    return entries
+
+
+def test_chat_turn_reports_the_duration_of_every_stage(
+    client: TestClient, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    response = client.post("/v1_0/chat", json={"message": "hola"})
+
+    assert response.status_code == 200
+    timing = parse_server_timing(response.headers["Server-Timing"])
+    for stage in ("db.user_message", "rag.search", "llm.call", "llm", "total"):
+        assert timing[stage].startswith("dur=")
+    assert f'desc="{llm_settings.modelName}"' in timing["llm.call"]
+
+
+def test_server_timing_format() -> None:
+    spans = [Span("rag.search", 1.234), Span("llm.call", 10, {"llm.model": "m"})]
+
+    assert server_timing(spans) == 'rag.search;dur=1.23, llm.call;dur=10.00;desc="m"'
+
+
+def test_spans_outside_a_request_are_not_kept() -> None:
+    with trace_span("job", items=3) as span:
+        span.set_attributes(done=True)
+
+    assert span.duration > 0
+    assert {"items": 3, "done": True}.items() <= span.attributes.items()
+    assert request_spans() == []
@@ -0,0 +1,31 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+from providers.cache_control import apply_cache_control, stable_prefix_length
+
+PROMPT = [
+    SystemMessage("instrucciones"),
+    SystemMessage("contexto"),
+    HumanMessage("hola"),
+]
+
+
+def test_stable_prefix_is_the_leading_system_messages() -> None:
+    assert stable_prefix_length(PROMPT) == 2
+    assert stable_prefix_length([HumanMessage("hola")]) == 0
+
+
+def test_explicit_breakpoint_marks_the_end_of_the_prefix() -> None:
+    marked = apply_cache_control("anthropic", PROMPT)
+
+    assert marked[0] is PROMPT[0]
+    assert marked[1].content == [
+        {"type": "text", "text": "contexto", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert marked[2] is PROMPT[2]
+    # the original prompt is not modified, other models may get it
+    assert PROMPT[1].content == "contexto"
+
+
+def test_implicit_caching_providers_get_the_prompt_as_is() -> None:
+    assert apply_cache_control("google_genai", PROMPT) is PROMPT
+    assert apply_cache_control(None, PROMPT) is PROMPT
+    assert apply_cache_control("anthropic", [HumanMessage("hola")])[0].content == "hola"
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from providers.llm_provider import LLMProvider
+from settings.llm_settings import llm_settings
+
+from tests.fixtures import FakeChatModel
+
+MAIN = "deepseek-chat"
+SHORT = "gemini-2.0-flash-lite"
+LONG = "gemini-2.0-flash"
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> LLMProvider:
+    monkeypatch.setattr(llm_settings, "shortPromptModelName", SHORT)
+    monkeypatch.setattr(llm_settings, "shortPromptMaxTokens", 2_000)
+    monkeypatch.setattr(llm_settings, "longContextModelName", LONG)
+    monkeypatch.setattr(llm_settings, "maxTokens", None)
+    monkeypatch.setattr(llm_settings, "completionTokensReserve", 1_000)
+    return LLMProvider(
+        llms=[(name, FakeChatModel(responses=[name])) for name in (MAIN, SHORT, LONG)]
+    )
+
+
+def test_short_prompts_use_the_cheap_model(provider: LLMProvider) -> None:
+    assert provider.select_model(500) == SHORT
+
+
+def test_prompts_that_fit_use_the_main_model(provider: LLMProvider) -> None:
+    assert provider.select_model(10_000) == MAIN
+
+
+def test_long_prompts_use_the_long_context_model(provider: LLMProvider) -> None:
+    # deepseek-chat has a 65_536 tokens context, minus the completion reserve
+    assert provider.select_model(65_000) == LONG
+
+
+def test_models_not_injected_are_not_selected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_settings, "shortPromptModelName", SHORT)
+    monkeypatch.setattr(llm_settings, "longContextModelName", LONG)
+    provider = LLMProvider(llms=[(MAIN, FakeChatModel(responses=[MAIN]))])
+
+    assert provider.select_model(500) == MAIN
+    assert provider.select_model(100_000) == MAIN
+
+
+def test_the_selected_model_answers_and_is_billed(provider: LLMProvider) -> None:
+    response = asyncio.run(
+        provider.aget_message_response([HumanMessage(content="hola")])
+    )
+
+    assert response.content == SHORT
+    assert provider.last_usage is not None
+    assert provider.last_usage.model_name == SHORT
+    assert provider.last_usage.estimated
+    assert provider.last_usage.cost is not None
+
+
+def test_reported_usage_is_preferred_to_the_estimate(provider: LLMProvider) -> None:
+    response = AIMessage(
+        content="respuesta",
+        usage_metadata={
+            "input_tokens": 1_000_000,
+            "output_tokens": 0,
+            "total_tokens": 1_000_000,
+            "input_token_details": {"cache_read": 10},
+        },
+    )
+
+    usage = provider._get_usage(MAIN, 5, response)
+
+    assert (usage.input_tokens, usage.cached_tokens) == (1_000_000, 10)
+    assert not usage.estimated
+    assert usage.cost == pytest.approx(0.27)
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Iterator
+
+import pytest
+from exceptions.llm import LLMException
+from langchain_core.messages import HumanMessage
+from providers.llm_router import LLMRouter
+from settings.llm_settings import llm_settings
+
+from tests.fixtures import FailingChatModel, FakeChatModel
+
+HISTORY = [HumanMessage(content="hola")]
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(llm_settings, "timeout", 0.2)
+    monkeypatch.setattr(llm_settings, "maxRetries", 2)
+    monkeypatch.setattr(llm_settings, "retryBackoff", 0)
+    monkeypatch.setattr(llm_settings, "hedgeRequests", False)
+    LLMRouter.latencies.clear()
+    yield
+    LLMRouter.latencies.clear()
+
+
+def ainvoke(router: LLMRouter) -> str:
+    return str(asyncio.run(router.ainvoke(HISTORY)).content)
+
+
+def test_router_retries_a_failed_call() -> None:
+    llm = FailingChatModel(responses=["primary"], failures=2)
+    router = LLMRouter([("primary", llm)])
+
+    assert ainvoke(router) == "primary"
+    assert llm.calls == 3
+    assert router.model_name == "primary"
+
+
+def test_router_fails_over_after_the_retries() -> None:
+    primary = FailingChatModel(responses=["primary"])
+    secondary = FakeChatModel(responses=["secondary"])
+    router = LLMRouter([("primary", primary), ("secondary", secondary)])
+
+    assert ainvoke(router) == "secondary"
+    assert primary.calls == 3
+    assert router.model_name == "secondary"
+
+
+def test_router_times_out_a_slow_model() -> None:
+    slow = FakeChatModel(responses=["slow"], delay=1)
+    router = LLMRouter([("slow", slow)])
+
+    with pytest.raises(LLMException) as error:
+        ainvoke(router)
+    assert error.value.get_error_code() == "LLM_Timeout"
+    assert slow.calls == 3
+
+
+def test_router_raises_when_every_model_fails() -> None:
+    router = LLMRouter(
+        [
+            ("primary", FailingChatModel(responses=["primary"])),
+            ("secondary", FailingChatModel(responses=["secondary"])),
+        ]
+    )
+
+    with pytest.raises(LLMException) as error:
+        ainvoke(router)
+    assert error.value.get_error_code() == "LLM_Internal_Error"
+
+
+def test_router_hedges_a_slow_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_settings, "hedgeRequests", True)
+    monkeypatch.setattr(llm_settings, "hedgeDefaultDelay", 0.02)
+    monkeypatch.setattr(llm_settings, "timeout", 5)
+    primary = FakeChatModel(responses=["primary"], delay=1)
+    secondary = FakeChatModel(responses=["secondary"])
+    router = LLMRouter([("primary", primary), ("secondary", secondary)])
+
+    assert ainvoke(router) == "secondary"
+    assert (primary.calls, secondary.calls) == (1, 1)
+    assert router.model_name == "secondary"
+
+
+def test_router_does_not_hedge_a_fast_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_settings, "hedgeRequests", True)
+    monkeypatch.setattr(llm_settings, "hedgeDefaultDelay", 0.5)
+    primary = FakeChatModel(responses=["primary"])
+    secondary = FakeChatModel(responses=["secondary"])
+    router = LLMRouter([("primary", primary), ("secondary", secondary)])
+
+    assert ainvoke(router) == "primary"
+    assert secondary.calls == 0
+
+
+def test_router_prepares_the_messages_of_every_model() -> None:
+    prepared: list[str] = []
+
+    def prepare(name: str, history: list) -> list:
+        prepared.append(name)
+        return history
+
+    router = LLMRouter(
+        [
+            ("primary", FailingChatModel(responses=["primary"])),
+            ("secondary", FakeChatModel(responses=["secondary"])),
+        ],
+        prepare=prepare,
+    )
+
+    assert ainvoke(router) == "secondary"
+    assert prepared == ["primary", "secondary"]
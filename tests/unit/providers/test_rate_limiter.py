@@ -0,0 +1,145 @@
+import asyncio
+from typing import Iterator
+
+import pytest
+from exceptions.llm import LLMException
+from langchain_core.messages import HumanMessage
+from prometheus_client import REGISTRY
+from providers.llm_provider import LLMProvider
+from providers.llm_router import LLMRouter
+from providers.rate_limiter import ProviderRateLimiter
+from settings.llm_settings import RateLimit, llm_settings
+
+from tests.fixtures import FailingChatModel, FakeChatModel
+
+HISTORY = [HumanMessage(content="hola")]
+# Models of two providers
+GEMINI = "gemini-2.0-flash"
+DEEPSEEK = "deepseek-chat"
+
+
+@pytest.fixture(autouse=True)
+def limiters(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(llm_settings, "modelName", GEMINI)
+    monkeypatch.setattr(llm_settings, "modelProvider", "google_genai")
+    monkeypatch.setattr(llm_settings, "shortPromptModelName", None)
+    monkeypatch.setattr(llm_settings, "longContextModelName", None)
+    monkeypatch.setattr(llm_settings, "maxRetries", 2)
+    monkeypatch.setattr(llm_settings, "retryBackoff", 0)
+    monkeypatch.setattr(llm_settings, "hedgeRequests", False)
+    ProviderRateLimiter.instances.clear()
+    LLMRouter.latencies.clear()
+    yield
+    ProviderRateLimiter.instances.clear()
+
+
+def stats(provider: str) -> tuple[int, int]:
+    limiter = ProviderRateLimiter.instances[provider]
+    return limiter.stats.acquired, limiter.stats.rejected
+
+
+def test_limiter_bounds_the_concurrent_calls() -> None:
+    limiter = ProviderRateLimiter("test", RateLimit(maxConcurrency=2))
+    running = peak = 0
+
+    async def call() -> None:
+        nonlocal running, peak
+        async with limiter.acquire(10):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.stats.acquired == 6
+    assert limiter.stats.max_queue_depth == 6
+
+
+def test_limiter_rejects_over_the_queue_size() -> None:
+    limiter = ProviderRateLimiter("test", RateLimit(maxQueueSize=0))
+
+    async def call() -> None:
+        async with limiter.acquire(10):
+            pass
+
+    with pytest.raises(LLMException) as error:
+        asyncio.run(call())
+    assert error.value.get_error_code() == "Rate_Limit_Exceeded"
+    assert limiter.stats.rejected == 1
+
+
+def test_every_retry_spends_the_rate_limit() -> None:
+    provider = LLMProvider(
+        llms=[(GEMINI, FailingChatModel(responses=["gemini"], failures=2))]
+    )
+
+    asyncio.run(provider.aget_message_response(HISTORY))
+
+    assert stats("google_genai") == (3, 0)
+
+
+def test_failover_uses_the_limiter_of_the_fallback_provider() -> None:
+    provider = LLMProvider(
+        llms=[
+            (GEMINI, FailingChatModel(responses=["gemini"])),
+            (DEEPSEEK, FakeChatModel(responses=["deepseek"])),
+        ]
+    )
+
+    response = asyncio.run(provider.aget_message_response(HISTORY))
+
+    assert response.content == "deepseek"
+    assert stats("google_genai") == (3, 0)
+    assert stats("deepseek") == (1, 0)
+
+
+def test_rejected_provider_fails_over_without_retries(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        llm_settings, "providerRateLimits", {"google_genai": RateLimit(maxQueueSize=0)}
+    )
+    gemini = FakeChatModel(responses=["gemini"])
+    provider = LLMProvider(
+        llms=[(GEMINI, gemini), (DEEPSEEK, FakeChatModel(responses=["deepseek"]))]
+    )
+
+    response = asyncio.run(provider.aget_message_response(HISTORY))
+
+    assert response.content == "deepseek"
+    assert gemini.calls == 0
+    assert stats("google_genai") == (0, 1)
+
+
+def test_streams_are_rate_limited_per_provider() -> None:
+    provider = LLMProvider(
+        llms=[
+            (GEMINI, FailingChatModel(responses=["gemini"])),
+            (DEEPSEEK, FakeChatModel(responses=["deepseek"])),
+        ]
+    )
+
+    async def stream() -> str:
+        return "".join(
+            [c.text() async for c in provider.astream_message_response(HISTORY)]
+        )
+
+    assert asyncio.run(stream()) == "deepseek"
+    assert stats("google_genai") == (3, 0)
+    assert stats("deepseek") == (1, 0)
+
+
+def test_limiter_stats_are_exported() -> None:
+    provider = LLMProvider(llms=[(GEMINI, FakeChatModel(responses=["gemini"]))])
+
+    asyncio.run(provider.aget_message_response(HISTORY))
+
+    labels = {"provider": "google_genai"}
+    assert REGISTRY.get_sample_value("llm_limiter_acquired_total", labels) == 1
+    assert REGISTRY.get_sample_value("llm_limiter_rejected_total", labels) == 0
+    assert REGISTRY.get_sample_value("llm_limiter_queue_depth", labels) == 0
+    assert REGISTRY.get_sample_value("llm_limiter_wait_seconds_total", labels) >= 0
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from models.chat_model import Chat, Message, MessageRole
+from repositories.message_repository import MessageRepository
+from sqlalchemy.orm import Session
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def messages(temp_session: Session) -> list[Message]:
+    """Ten messages of a chat, in pairs that share the creation date."""
+    chat = Chat(id="chat", username="user")
+    rows = [
+        Message(
+            id=f"m{i}",
+            chat_id=chat.id,
+            role=MessageRole.HumanMessage,
+            content=str(i),
+            created_at=START + timedelta(seconds=i // 2),
+        )
+        for i in range(10)
+    ]
+    temp_session.add_all([chat, *rows])
+    temp_session.commit()
+    return rows
+
+
+def walk(repository: MessageRepository, sort: str) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        page, cursor = repository.page_by_chat("chat", cursor, 4, sort)
+        pages.append([m.id for m in page])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_walk_every_message_once(
+    temp_session: Session, messages: list[Message]
+) -> None:
+    repository = MessageRepository(temp_session)
+
+    assert walk(repository, "ASC") == [
+        ["m0", "m1", "m2", "m3"],
+        ["m4", "m5", "m6", "m7"],
+        ["m8", "m9"],
+    ]
+    assert walk(repository, "DESC") == [
+        ["m9", "m8", "m7", "m6"],
+        ["m5", "m4", "m3", "m2"],
+        ["m1", "m0"],
+    ]
+
+
+def test_last_full_page_has_no_next_cursor(
+    temp_session: Session, messages: list[Message]
+) -> None:
+    page, cursor = MessageRepository(temp_session).page_by_chat("chat", None, 10)
+
+    assert len(page) == 10
+    assert cursor is None
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from repositories.vector_store import FAISSVectorStore
+from settings.rag_settings import rag_settings
+
+
+def chunks(*texts: str) -> list[Document]:
+    return [Document(page_content=text) for text in texts]
+
+
+@pytest.fixture
+def store() -> FAISSVectorStore:
+    return FAISSVectorStore(embeddings=DeterministicFakeEmbedding(size=16))
+
+
+def test_delete_document_removes_its_chunks(store: FAISSVectorStore) -> None:
+    store.add_documents("a", chunks("uno", "dos"))
+    store.add_documents("b", chunks("tres"))
+
+    assert store.delete_document("a") == 2
+    assert store.delete_document("a") == 0
+    assert not store.has_document("a")
+    assert store.get_chunks("a", [0, 1]) == {}
+    found = store.similarity_search("uno", k=3)
+    assert [doc.page_content for doc in found] == ["tres"]
+
+
+def test_replace_document_swaps_its_chunks(store: FAISSVectorStore) -> None:
+    store.add_documents("a", chunks("viejo"))
+
+    store.replace_document("a", chunks("nuevo", "otro"))
+
+    assert store.index.ntotal == 2
+    assert store.similarity_search("nuevo", k=1)[0].page_content == "nuevo"
+    assert "viejo" not in [d.page_content for d in store.similarity_search("viejo")]
+
+
+def test_tombstones_are_skipped_and_compacted(
+    store: FAISSVectorStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # HNSW does not support remove_ids, the deleted vectors are tombstoned
+    store = FAISSVectorStore(store.embeddings, index_factory="IDMap2,HNSW32")
+    monkeypatch.setattr(rag_settings, "compactionThreshold", 0.3)
+    store.add_documents("a", chunks("uno", "dos"))
+    store.add_documents("b", chunks("tres"))
+
+    store.replace_document("a", chunks("cuatro", "cinco"))
+
+    assert len(store.tombstones) == 2
+    assert "uno" not in [d.page_content for d in store.similarity_search("uno", 5)]
+    assert store.needs_compaction()
+    store.compact_if_needed()
+    assert not store.tombstones
+    assert store.index.ntotal == 3
+
+
+def test_get_instance_builds_a_single_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FAISSVectorStore, "instance", None)
+    embeddings = DeterministicFakeEmbedding(size=16)
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def get() -> None:
+        barrier.wait()
+        instances.append(FAISSVectorStore.get_instance(embeddings))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(instance) for instance in instances}) == 1
+
+
+def test_batch_search_matches_the_single_searches(store: FAISSVectorStore) -> None:
+    store.add_documents("a", chunks("uno", "dos", "tres", "cuatro"))
+    queries = ["dos", "cuatro", "cinco"]
+
+    batch = store.batch_similarity_search_with_score(queries, k=2)
+
+    assert batch == [store.similarity_search_with_score(q, k=2) for q in queries]
+    assert batch[0][0][0].page_content == "dos"
+    assert store.batch_similarity_search_with_score([], k=2) == []
@@ -0,0 +1,21 @@
+import pytest
+from fastapi.exceptions import RequestValidationError
+from schemas.external.pagination import CursorInputPagination
+from utils.paginate import encode_cursor
+
+# [{"dt": 123}, "id"], a TypeError while decoding the datetime
+FORGED_CURSOR = "W3siZHQiOjEyM30sImlkIl0"
+
+
+def test_issued_cursors_are_accepted() -> None:
+    cursor = encode_cursor("2026-01-01", "id")
+
+    assert CursorInputPagination(cursor=cursor).cursor == cursor
+    assert CursorInputPagination(cursor="").cursor is None
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", FORGED_CURSOR])
+def test_invalid_cursors_are_a_request_validation_error(cursor: str) -> None:
+    with pytest.raises(RequestValidationError) as error:
+        CursorInputPagination(cursor=cursor)
+    assert error.value.errors()[0]["loc"] == ("query", "cursor")
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any
+
+from services.chat_service import ChatService
+from sqlalchemy.orm import Session, sessionmaker
+
+from tests.fixtures import FakeChatModel
+
+
+def test_identical_first_prompts_share_the_llm_call(
+    session_factory: sessionmaker, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    fake_llm.delay = 0.05
+    sessions: list[Session] = [session_factory() for _ in range(3)]
+    services = [ChatService(session=s, username="user") for s in sessions]
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(service.process_user_message("hola") for service in services)
+        )
+
+    responses = asyncio.run(main())
+    for session in sessions:
+        session.close()
+
+    assert [r.content for r in responses] == ["respuesta"] * 3
+    assert fake_llm.calls == 1
+    # every chat keeps its own answer
+    for service in services:
+        messages = service.repository.get_chat_messages_by_id(service.chat_id)
+        assert [m.content for m in messages] == ["hola", "respuesta"]
+
+
+def test_follow_up_prompts_are_not_shared(
+    temp_session: Session, fake_llm: FakeChatModel, vector_store: Any
+) -> None:
+    services = [ChatService(session=temp_session, username="user") for _ in range(2)]
+    for service in services:
+        asyncio.run(service.process_user_message("hola"))
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(service.process_user_message("otra") for service in services)
+        )
+
+    asyncio.run(main())
+    assert fake_llm.calls == 4
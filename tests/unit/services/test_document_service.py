@@ -0,0 +1,52 @@
+import pytest
+import tiktoken
+from langchain_core.documents import Document
+from services import document_service
+from services.document_service import DocumentService
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding(monkeypatch: pytest.MonkeyPatch) -> tiktoken.Encoding:
+    """One token per byte, built locally instead of downloading an encoding."""
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(document_service, "get_encoding", lambda _: encoding)
+    return encoding
+
+
+def test_token_windows_have_the_size_and_overlap_in_tokens() -> None:
+    page = Document(page_content="abcdefghijklmnopqrst", metadata={"page": 3})
+
+    chunks = DocumentService()._split_documents_by_tokens([page], 8, 2)
+
+    assert [c.page_content for c in chunks] == ["abcdefgh", "ghijklmn", "mnopqrst"]
+    assert [c.metadata["start_index"] for c in chunks] == [0, 6, 12]
+    assert all(c.metadata["page"] == 3 for c in chunks)
+
+
+def test_token_windows_start_index_points_into_the_page() -> None:
+    page = Document(page_content="año número árbol canción", metadata={})
+
+    chunks = DocumentService()._split_documents_by_tokens([page], 6, 1)
+
+    for chunk in chunks:
+        start = chunk.metadata["start_index"]
+        assert page.page_content[start : start + len(chunk.page_content)] == (
+            chunk.page_content
+        )
+    assert page.page_content.endswith(chunks[-1].page_content)
+
+
+def test_token_windows_skip_empty_pages() -> None:
+    pages = [Document(page_content=""), Document(page_content="   ")]
+
+    assert DocumentService()._split_documents_by_tokens(pages, 8, 2) == []
+
+
+def test_token_overlap_must_be_smaller_than_the_size() -> None:
+    with pytest.raises(ValueError):
+        DocumentService()._split_documents_by_tokens([Document("abc")], 4, 4)
@@ -0,0 +1,21 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from models.chat_model import Message, MessageRole
+from services.message_transformer import MessageTransformer
+
+
+def test_roles_map_to_langchain_messages() -> None:
+    messages = [
+        Message(role=MessageRole.HumanMessage, content="hola"),
+        # as loaded from the database
+        Message(role="assistant", content="respuesta"),
+    ]
+
+    converted = MessageTransformer().to_langchain_messages(messages)
+
+    assert converted == [HumanMessage("hola"), AIMessage("respuesta")]
+
+
+def test_unknown_roles_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        MessageTransformer().to_langchain_messages([Message(role="tool", content="x")])
@@ -0,0 +1,48 @@
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from models.chat_model import Message, MessageRole
+from services.prompt_builder import PromptBuilder
+from services.prompt_templates import prompt_templates
+
+
+def chunk(text: str, document_id: str, index: int) -> Document:
+    return Document(
+        page_content=text, metadata={"document_id": document_id, "chunk_index": index}
+    )
+
+
+def messages(*contents: str) -> list[Message]:
+    roles = [MessageRole.HumanMessage, MessageRole.AIMessage]
+    return [
+        Message(role=roles[i % 2], content=content)
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_prompt_goes_from_the_instructions_to_the_query() -> None:
+    template = prompt_templates.get("es")
+
+    history = PromptBuilder(template=template).build(
+        messages("hola", "respuesta", "otra"), context=[chunk("texto", "a", 0)]
+    )
+
+    assert history[0] is template.instructions_message
+    assert history[1] == SystemMessage(template.context_prompt + "texto")
+    assert [type(m) for m in history[2:]] == [HumanMessage, AIMessage, HumanMessage]
+    assert history[-1].content == "otra"
+
+
+def test_context_is_laid_out_in_document_order() -> None:
+    builder = PromptBuilder()
+    ranked = [chunk("b1", "b", 1), chunk("a0", "a", 0), chunk("b0", "b", 0)]
+
+    assert builder.context_text(ranked) == "a0\n\nb0\n\nb1"
+    assert builder.context_text(ranked) == builder.context_text(ranked[::-1])
+
+
+def test_prompt_without_context_reuses_the_template_message() -> None:
+    template = prompt_templates.get("en")
+
+    history = PromptBuilder(template=template).build(messages("hi"), context=[])
+
+    assert history[1] is template.no_context_message
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+import pytest
+from exceptions.chat import ChatException
+from services.prompt_templates import BUILTIN_TEMPLATES, PromptTemplateRegistry
+
+
+def test_templates_are_loaded_from_a_directory(tmp_path: Path) -> None:
+    template = {
+        "instructions": "Answer like a pirate.",
+        "context_prompt": "Context: ",
+        "no_context_prompt": "No context.",
+    }
+    (tmp_path / "pirate.json").write_text(json.dumps(template), encoding="utf-8")
+    registry = PromptTemplateRegistry(
+        [*BUILTIN_TEMPLATES, *PromptTemplateRegistry.load_dir(tmp_path)], default="es"
+    )
+
+    pirate = registry.get("pirate")
+    assert pirate.instructions_message.content == "Answer like a pirate."
+    assert pirate.context_message("mapa").content == "Context: mapa"
+    assert pirate.context_message("") is pirate.no_context_message
+    assert registry.get().name == "es"
+
+
+def test_unknown_template_is_rejected() -> None:
+    registry = PromptTemplateRegistry(BUILTIN_TEMPLATES, default="es")
+
+    with pytest.raises(ChatException) as error:
+        registry.get("klingon")
+    assert error.value.get_error_code() == "Prompt_Template_Not_Found"
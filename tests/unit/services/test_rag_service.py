@@ -0,0 +1,102 @@
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from services.rag_service import RAGService
+from settings.rag_settings import rag_settings
+
+TEXT = "uno dos tres cuatro cinco seis siete ocho nueve diez"
+
+
+def split(document_id: str, size: int = 12, overlap: int = 4) -> list[Document]:
+    """TEXT in overlapping chunks, with the metadata of the PDF ingestion."""
+    chunks = []
+    for ordinal, start in enumerate(range(0, len(TEXT) - overlap, size - overlap)):
+        chunks.append(
+            Document(
+                page_content=TEXT[start : start + size],
+                metadata={
+                    "document_id": document_id,
+                    "chunk_index": ordinal,
+                    "start_index": start,
+                    "page": 0,
+                },
+            )
+        )
+    return chunks
+
+
+@pytest.fixture
+def rag_service(vector_store: Any) -> RAGService:
+    return RAGService()
+
+
+def test_expansion_merges_the_neighbours_without_the_overlap(
+    rag_service: RAGService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rag_settings, "expansionWindow", 1)
+    chunks = split("a")
+    rag_service.vector_store.add_documents("a", chunks)
+
+    spans = rag_service._expand_neighbours([chunks[2]])
+
+    assert len(spans) == 1
+    start = chunks[1].metadata["start_index"]
+    end = chunks[3].metadata["start_index"] + len(chunks[3].page_content)
+    assert spans[0].page_content == TEXT[start:end]
+    assert spans[0].metadata["chunk_index"] == 1
+    assert spans[0].metadata["chunk_end_index"] == 3
+
+
+def test_expansion_keeps_separate_spans_in_rank_order(
+    rag_service: RAGService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rag_settings, "expansionWindow", 1)
+    chunks = split("a")
+    rag_service.vector_store.add_documents("a", chunks)
+    last = len(chunks) - 1
+
+    spans = rag_service._expand_neighbours([chunks[last], chunks[0]])
+
+    assert [s.metadata["chunk_index"] for s in spans] == [last - 1, 0]
+    assert [s.metadata["chunk_end_index"] for s in spans] == [last, 1]
+
+
+def test_expansion_joins_overlapping_windows_once(
+    rag_service: RAGService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rag_settings, "expansionWindow", 1)
+    chunks = split("a")
+    rag_service.vector_store.add_documents("a", chunks)
+
+    spans = rag_service._expand_neighbours([chunks[1], chunks[3]])
+
+    assert len(spans) == 1
+    assert (spans[0].metadata["chunk_index"], spans[0].metadata["chunk_end_index"]) == (
+        0,
+        4,
+    )
+
+
+def test_expansion_disabled_returns_the_hits(
+    rag_service: RAGService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rag_settings, "expansionWindow", 0)
+    chunks = split("a")
+    rag_service.vector_store.add_documents("a", chunks)
+
+    assert rag_service._expand_neighbours([chunks[2]]) == [chunks[2]]
+
+
+def test_search_returns_the_span_around_the_hit(
+    rag_service: RAGService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rag_settings, "expansionWindow", 1)
+    chunks = split("a")
+    rag_service.vector_store.add_documents("a", chunks)
+
+    found = rag_service.search_documents(chunks[2].page_content, k=1)
+
+    assert len(found) == 1
+    assert chunks[2].page_content in found[0].page_content
+    assert found[0].metadata["chunk_index"] == 1
@@ -0,0 +1,86 @@
+from typing import Iterator
+
+import pytest
+from langchain_core.documents import Document
+from services.rerank_service import LexicalReranker, Reranker, RerankService
+from settings.rag_settings import rag_settings
+
+
+class CountingReranker(Reranker):
+    """Scores by the length of the chunk and counts the scored chunks."""
+
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.scored: list[str] = []
+
+    def score(self, query: str, documents: list[Document]) -> list[float]:
+        self.scored += [document.page_content for document in documents]
+        return [float(len(document.page_content)) for document in documents]
+
+
+@pytest.fixture(autouse=True)
+def clear_rerank_cache() -> Iterator[None]:
+    RerankService._cache.clear()
+    yield
+    RerankService._cache.clear()
+
+
+def test_reranker_must_implement_score() -> None:
+    with pytest.raises(TypeError):
+        Reranker()  # type: ignore[abstract]
+
+
+def test_lexical_reranker_ranks_the_matching_chunk_first() -> None:
+    documents = [
+        Document(page_content="el horario de la biblioteca"),
+        Document(page_content="Matrícula: el plazo de matricula acaba en julio"),
+        Document(page_content="el comedor abre a las doce"),
+    ]
+
+    found = RerankService(LexicalReranker()).rerank("plazo de matrícula", documents, 2)
+
+    assert found[0] is documents[1]
+    assert len(found) == 2
+
+
+def test_rerank_keeps_the_vector_order_over_the_time_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(rag_settings, "rerankTimeBudgetMs", -1)
+    documents = [Document(page_content=text) for text in ("a", "bbb", "cc")]
+
+    found = RerankService(CountingReranker()).rerank("query", documents, 3)
+
+    assert found == documents
+
+
+def test_rerank_reuses_the_cached_scores() -> None:
+    reranker = CountingReranker()
+    documents = [Document(page_content=text) for text in ("a", "bbb", "cc")]
+
+    RerankService(reranker).rerank("query", documents, 3)
+    found = RerankService(reranker).rerank("query", documents, 3)
+
+    assert [doc.page_content for doc in found] == ["bbb", "cc", "a"]
+    assert reranker.scored == ["a", "bbb", "cc"]
+
+
+def test_rerank_scores_a_replaced_chunk_again() -> None:
+    reranker = CountingReranker()
+    service = RerankService(reranker)
+    old = [
+        Document(id="doc:0", page_content="a"),
+        Document(id="doc:1", page_content="bb"),
+    ]
+    service.rerank("query", old, 2)
+
+    # replace_document reuses the chunk ids for the new content
+    new = [
+        Document(id="doc:0", page_content="ccc"),
+        Document(id="doc:1", page_content="bb"),
+    ]
+    found = service.rerank("query", new, 2)
+
+    assert [doc.page_content for doc in found] == ["ccc", "bb"]
+    assert reranker.scored == ["a", "bb", "ccc"]
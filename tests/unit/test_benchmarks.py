@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+from benchmarks.run import parse_args
+from benchmarks.stats import find_regressions
+
+RESULT = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "throughput": 100.0}
+
+
+def test_comparing_without_a_baseline_is_an_error(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--baseline", str(tmp_path / "missing.json")])
+    assert exit_info.value.code == 2
+
+
+def test_a_missing_baseline_can_be_created(tmp_path: Path) -> None:
+    args = parse_args(["--baseline", str(tmp_path / "new.json"), "--save-baseline"])
+
+    assert args.save_baseline
+
+
+def test_regressions_over_the_tolerance_are_reported() -> None:
+    slower = {**RESULT, "p95_ms": 25.0, "throughput": 70.0}
+
+    regressions = find_regressions({"chat": slower}, {"chat": RESULT}, 0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("chat p95_ms")
+    assert regressions[1].startswith("chat throughput")
+
+
+def test_changes_within_the_tolerance_pass() -> None:
+    noisy = {**RESULT, "p50_ms": 11.0, "throughput": 90.0}
+
+    assert find_regressions({"chat": noisy, "new": RESULT}, {"chat": RESULT}, 0.2) == []
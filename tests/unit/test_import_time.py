@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[2] / "app"
+
+# Loaded on first use or by the warm-up, never when the app is imported
+LAZY_MODULES = [
+    "faiss",
+    "langchain_community",
+    "pypdf",
+    "langchain.chat_models",
+    "langchain_core.language_models",
+]
+
+# Seconds, about 0.75 when measured, with room for slower machines
+IMPORT_BUDGET = 2.0
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Cumulative seconds of every module imported by ``import <module>``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        env={**os.environ, "PYTHONPATH": str(APP_DIR), "DEBUG": "false"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def test_main_does_not_import_heavy_dependencies() -> None:
+    times = import_times("main")
+    assert "main" in times
+    assert [module for module in LAZY_MODULES if module in times] == []
+
+
+def test_main_import_time_is_within_budget() -> None:
+    assert import_times("main")["main"] < IMPORT_BUDGET
@@ -0,0 +1,33 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+from utils.paginate import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload: object) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip_keeps_datetimes() -> None:
+    created_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(created_at, "id-1")) == (created_at, "id-1")
+    assert decode_cursor(encode_cursor("name", 7)) == ("name", 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        raw_cursor(["only one value"]),
+        raw_cursor({"dt": 123}),
+        raw_cursor([{"dt": 123}, "id"]),
+        raw_cursor([{"dt": "yesterday"}, "id"]),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_invalid_cursors_raise_value_error(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)